@@ -1,5 +1,8 @@
+from typing import Any, Dict, List, Optional
+from config.settings import Config
 from config.state import TrialState
 from utils.llm_clients import llm_clients
+from utils.prompt_batcher import PromptBatcher, batching_enabled, format_items, parse_items
 import json
 
 CLAIM_EXTRACTOR_PROMPT = """You are a claim extraction specialist. Break down the following content into atomic, independently verifiable claims.
@@ -16,6 +19,76 @@ Return ONLY a JSON array of claims in this exact format:
 [{{"text": "claim text", "category": "factual", "verifiability_score": 85, "priority": 90}}]
 """
 
+CLAIM_EXTRACTOR_BATCH_PROMPT = """You are a claim extraction specialist. Below are {count} independent pieces of content, each marked with an ID. Break each one down into atomic, independently verifiable claims. Treat every item on its own and never move claims between items.
+
+{items}
+
+For each claim, provide:
+1. text: The exact claim statement
+2. category: The type of claim (factual, opinion, prediction, etc.)
+3. verifiability_score: 0-100 score on how verifiable this claim is
+4. priority: 0-100 score on importance (based on potential harm if false and virality risk)
+
+Return ONLY a JSON object mapping every ID to its array of claims, in this exact format:
+{{"item_1": [{{"text": "claim text", "category": "factual", "verifiability_score": 85, "priority": 90}}], "item_2": []}}
+"""
+
+
+def _valid_claims(value: Any) -> Optional[List[Dict]]:
+    """`value` as a claims list, or None if it is not one"""
+    if not isinstance(value, list):
+        return None
+    claims = []
+    for claim in value:
+        if not isinstance(claim, dict) or not isinstance(claim.get("text"), str) or not claim["text"].strip():
+            return None
+        claims.append({
+            "text": claim["text"],
+            "category": claim.get("category") if isinstance(claim.get("category"), str) else "factual",
+            "verifiability_score": claim.get("verifiability_score") if isinstance(claim.get("verifiability_score"), (int, float)) else 50,
+            "priority": claim.get("priority") if isinstance(claim.get("priority"), (int, float)) else 50,
+        })
+    return claims
+
+
+def _parse_claims(response: str, raw_input: str) -> List[Dict]:
+    try:
+        # Extract JSON from response
+        json_start = response.find('[')
+        json_end = response.rfind(']') + 1
+        claims = json.loads(response[json_start:json_end])
+        print(f"[CLAIM EXTRACTOR] Extracted {len(claims)} claims")
+    except Exception as e:
+        print(f"[CLAIM EXTRACTOR] Error parsing claims: {e}")
+        claims = [{"text": raw_input[:200], "category": "factual", "verifiability_score": 50, "priority": 50}]
+    return claims
+
+
+async def _extract_text_claims(content: str) -> List[Dict]:
+    prompt = CLAIM_EXTRACTOR_PROMPT.format(content=content)
+    response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3, stage="claim_extractor")
+    return _parse_claims(response, content)
+
+
+async def _extract_claims_batch(contents: List[str]) -> List[Optional[List[Dict]]]:
+    """Claims of several texts from one prompt; None for items to retry on their own"""
+    prompt = CLAIM_EXTRACTOR_BATCH_PROMPT.format(count=len(contents), items=format_items(contents))
+    response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3)
+    results = [_valid_claims(value) for value in parse_items(response, len(contents))]
+    for content, claims in zip(contents, results):
+        if claims is not None:
+            await llm_clients.cache_batch_item(
+                CLAIM_EXTRACTOR_PROMPT.format(content=content), 0.3, "claim_extractor", json.dumps(claims)
+            )
+    print(f"[CLAIM EXTRACTOR] Batch of {len(contents)}: {sum(r is not None for r in results)} valid")
+    return results
+
+
+extraction_batcher = PromptBatcher(
+    "claim_extractor", _extract_claims_batch, _extract_text_claims,
+    Config.PROMPT_BATCH_SIZE, Config.PROMPT_BATCH_MAX_WAIT
+)
+
 async def claim_extractor(state: TrialState) -> TrialState:
     """Extract atomic claims from input content"""
     input_type = state["input_type"]
@@ -33,48 +106,49 @@ async def claim_extractor(state: TrialState) -> TrialState:
         # Extract content from URL using Gemini
         content = await llm_clients.analyze_url_content(
             raw_input,
-            "Extract the main text content from this article or webpage. Return only the article text, including the headline and main body. Do not include navigation, ads, or other non-content elements."
+            "Extract the main text content from this article or webpage. Return only the article text, including the headline and main body. Do not include navigation, ads, or other non-content elements.",
+            stage="url_content"
         )
         print(f"[CLAIM EXTRACTOR] Extracted {len(content)} characters from URL")
         # Now extract claims from the content
         prompt = CLAIM_EXTRACTOR_PROMPT.format(content=content)
-        response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3)
+        response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3, stage="claim_extractor")
     elif input_type == "video":
         print(f"[CLAIM EXTRACTOR] Processing video: {raw_input}")
-        # Analyze video and extract claims directly
-        # Store the video file for later reuse by investigator
-        response, video_file = await llm_clients.analyze_video_with_file(
+        # Analyze video and extract claims directly (cached by content hash for re-uploads)
+        response = await llm_clients.analyze_video(
             raw_input,
             CLAIM_EXTRACTOR_PROMPT.format(
                 content="Analyze this video comprehensively. Extract all factual claims made in the video, including both spoken statements and visual information presented."
-            )
+            ),
+            content_hash=state.get("content_hash"),
+            stage="claim_extractor"
         )
-        # Store video file in state for investigator to reuse
-        state["uploaded_video_file"] = video_file
     elif input_type == "image":
         print(f"[CLAIM EXTRACTOR] Processing image: {raw_input}")
-        # Analyze image and extract claims
+        # Analyze image and extract claims (cached by content hash for re-uploads)
         response = await llm_clients.analyze_image(
             raw_input,
             CLAIM_EXTRACTOR_PROMPT.format(
                 content="Analyze this image comprehensively. Extract all factual claims visible in the image, including text, graphics, charts, and any other information presented."
-            )
+            ),
+            content_hash=state.get("content_hash"),
+            stage="claim_extractor"
         )
     else:  # text, social_post
         print(f"[CLAIM EXTRACTOR] Processing {input_type} input")
-        # Existing logic for text-based inputs
         prompt = CLAIM_EXTRACTOR_PROMPT.format(content=raw_input)
-        response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3)
-    
-    try:
-        # Extract JSON from response
-        json_start = response.find('[')
-        json_end = response.rfind(']') + 1
-        claims = json.loads(response[json_start:json_end])
-        print(f"[CLAIM EXTRACTOR] Extracted {len(claims)} claims")
-    except Exception as e:
-        print(f"[CLAIM EXTRACTOR] Error parsing claims: {e}")
-        claims = [{"text": raw_input[:200], "category": "factual", "verifiability_score": 50, "priority": 50}]
+        if (batching_enabled.get() and extraction_batcher.batch_size > 1
+                and len(raw_input) <= Config.PROMPT_BATCH_ITEM_MAX_CHARS):
+            # Short texts from bulk runs share one prompt with other items
+            cached = await llm_clients.cached_batch_item(prompt, 0.3, "claim_extractor")
+            if cached is not None:
+                state["claims"] = _parse_claims(cached, raw_input)
+            else:
+                state["claims"] = await extraction_batcher.submit(raw_input)
+            return state
+        # Existing logic for text-based inputs
+        response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3, stage="claim_extractor")
     
-    state["claims"] = claims
+    state["claims"] = _parse_claims(response, raw_input)
     return state
@@ -1,7 +1,9 @@
 from config.state import TrialState
 from utils.llm_clients import llm_clients
+from utils.llm_scheduler import Priority
 from utils.blackboard import blackboard
 import json
+from typing import Dict, List, Optional
 
 DEFENDANT_PROMPT = """You are the Defense Attorney. Argue that the content is LEGITIMATE.
 
@@ -34,38 +36,133 @@ For each round, you should have a different argument which adds to your initial
 Be specific. Include dates, names, numbers. No vague statements.
 """
 
-async def defendant_turn(state: TrialState) -> TrialState:
-    """Generate defendant rebuttal"""
+# Speculative mode (Config.SPECULATIVE_DEFENSE): draft while the prosecutor is
+# still speaking, then a short refinement call writes an opening that answers
+# their actual argument (a few dozen output tokens instead of a full rebuttal)
+DEFENDANT_DRAFT_PROMPT = """You are the Defense Attorney. Argue that the content is LEGITIMATE.
+
+Claims: {claims}
+Evidence: {investigator_evidence}
+Earlier prosecution arguments: {prosecutor_context}
+
+The prosecutor is presenting a new argument right now. Prepare your rebuttal in advance (max 150 words):
+1. Anticipate and counter the strongest attack on these claims
+2. Present supporting evidence
+3. HONEST confidence score (0-100) - Be realistic. If you have strong corroborating sources, score higher. Don't be overly defensive.
+
+Return JSON:
+{{
+  "argument": "brief rebuttal",
+  "confidence_score": <identified score>,
+  "evidence_to_reveal": [{{"source": "url", "text": "excerpt", "credibility_score": <identified score>}}]
+}}
+
+INSTRUCTIONS
+The response should be a normal JSON like the template given above. Don't give json response with triple back ticks.
+Be specific. Include dates, names, numbers. No vague statements.
+"""
+
+DEFENDANT_REFINE_PROMPT = """You are the Defense Attorney. You drafted this rebuttal before hearing the prosecutor:
+{draft_argument}
+
+The prosecutor's actual argument:
+{prosecutor_argument}
+
+Write 1-2 sentences (max 40 words) that open your rebuttal by directly countering the prosecutor's main point; the draft follows them unchanged. Adjust your confidence score (draft: {draft_confidence}) only if the prosecutor's argument changes it.
+
+Return JSON:
+{{"opening": "1-2 sentences", "confidence_score": <score>}}
+Don't give json response with triple back ticks.
+"""
+
+def _parse_json_object(response: str) -> Optional[Dict]:
+    try:
+        result = json.loads(response[response.find('{'):response.rfind('}') + 1])
+    except (ValueError, AttributeError):
+        return None
+    return result if isinstance(result, dict) else None
+
+def parse_defendant_response(response: str) -> Optional[Dict]:
+    """The response's JSON object if it has an argument and confidence score, else None"""
+    result = _parse_json_object(response)
+    if not result or not result.get("argument") or "confidence_score" not in result:
+        return None
+    return result
+
+def apply_refinement(draft: str, refinement: str) -> Optional[str]:
+    """Defense response JSON: the draft opened by the refinement, or None if either is invalid"""
+    draft_result = parse_defendant_response(draft)
+    refined = _parse_json_object(refinement)
+    if draft_result is None or not refined or not str(refined.get("opening", "")).strip():
+        return None
+    draft_result["argument"] = f"{refined['opening'].strip()} {draft_result['argument']}"
+    if isinstance(refined.get("confidence_score"), (int, float)):
+        draft_result["confidence_score"] = refined["confidence_score"]
+    return json.dumps(draft_result)
+
+def _latest_prosecutor_argument(state: TrialState) -> str:
+    for t in reversed(state["trial_transcript"]):
+        if t["agent"] == "prosecutor":
+            return t["argument_text"]
+    return ""
+
+async def gather_draft_evidence(state: TrialState) -> Dict[str, List]:
+    """Blackboard context for the draft, read before the prosecutor's turn can add to it"""
+    claims_text = "\n".join([f"- {c['text']}" for c in state["selected_claims"]])
+    investigator_context = await blackboard.query_namespace(
+        state["case_id"], "investigator",
+        f"evidence supporting claims {claims_text}", top_k=5
+    )
+    prosecutor_context = await blackboard.query_namespace(
+        state["case_id"], "prosecutor",
+        f"prosecution arguments {claims_text}", top_k=3
+    )
+    return {"investigator": investigator_context, "prosecutor": prosecutor_context}
+
+def build_defendant_draft_prompt(state: TrialState, evidence: Dict[str, List]) -> str:
+    """Defendant prompt from investigator evidence and earlier rounds only (see gather_draft_evidence)"""
+    claims_text = "\n".join([f"- {c['text']}" for c in state["selected_claims"]])
+    return DEFENDANT_DRAFT_PROMPT.format(
+        claims=claims_text,
+        investigator_evidence=str(evidence["investigator"]),
+        prosecutor_context=str(evidence["prosecutor"])
+    )
+
+def build_defendant_refine_prompt(state: TrialState, draft: str) -> str:
+    draft_result = parse_defendant_response(draft) or {}
+    return DEFENDANT_REFINE_PROMPT.format(
+        draft_argument=draft_result.get("argument", draft.strip()),
+        draft_confidence=draft_result.get("confidence_score", 50),
+        prosecutor_argument=_latest_prosecutor_argument(state)
+    )
+
+async def build_defendant_prompt(state: TrialState) -> str:
+    """Gather blackboard context and build the defendant prompt"""
     claims_text = "\n".join([f"- {c['text']}" for c in state["selected_claims"]])
     
     # Query investigator namespace
     investigator_context = await blackboard.query_namespace(
         state["case_id"], "investigator",
-        "evidence supporting claims", top_k=5
+        f"evidence supporting claims {claims_text}", top_k=5
     )
     
     # Query prosecutor namespace
     prosecutor_context = await blackboard.query_namespace(
         state["case_id"], "prosecutor",
-        "prosecution arguments", top_k=3
+        f"prosecution arguments {claims_text}", top_k=3
     )
     
     # Get latest prosecutor argument
-    prosecutor_arg = ""
-    if state["trial_transcript"]:
-        for t in reversed(state["trial_transcript"]):
-            if t["agent"] == "prosecutor":
-                prosecutor_arg = t["argument_text"]
-                break
+    prosecutor_arg = _latest_prosecutor_argument(state)
     
-    prompt = DEFENDANT_PROMPT.format(
+    return DEFENDANT_PROMPT.format(
         claims=claims_text,
         investigator_evidence=str(investigator_context),
         prosecutor_argument=prosecutor_arg
     )
-    
-    response = await llm_clients.generate_gemini_pro(prompt, temperature=0.7)
-    
+
+async def record_defendant_argument(state: TrialState, response: str) -> TrialState:
+    """Parse the defendant response and record it on the blackboard and transcript"""
     try:
         json_start = response.find('{')
         json_end = response.rfind('}') + 1
@@ -104,3 +201,9 @@ async def defendant_turn(state: TrialState) -> TrialState:
     })
     
     return state
+
+async def defendant_turn(state: TrialState) -> TrialState:
+    """Generate defendant rebuttal"""
+    prompt = await build_defendant_prompt(state)
+    response = await llm_clients.generate_gemini_pro(prompt, temperature=0.7, priority=Priority.INTERACTIVE)
+    return await record_defendant_argument(state, response)
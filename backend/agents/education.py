@@ -1,5 +1,6 @@
 from config.state import TrialState
 from utils.llm_clients import llm_clients
+from utils.llm_scheduler import Priority
 import json
 
 EDUCATION_PROMPT = """Based on this misinformation trial, generate an educational breakdown for the user.
@@ -57,7 +58,7 @@ async def education_generator(state: TrialState) -> TrialState:
         transcript_summary=transcript_summary
     )
     
-    response = await llm_clients.generate_gemini_flash(prompt, temperature=0.5)
+    response = await llm_clients.generate_gemini_flash(prompt, temperature=0.5, stage="education")
     
     try:
         json_start = response.find('{')
@@ -96,7 +97,7 @@ async def report_generator(state: TrialState) -> TrialState:
         evidence_against="; ".join(evidence_against[:2])
     )
     
-    response = await llm_clients.generate_gemini_flash(prompt, temperature=0.5)
+    response = await llm_clients.generate_gemini_flash(prompt, temperature=0.5, priority=Priority.BACKGROUND)
     
     try:
         json_start = response.find('{')
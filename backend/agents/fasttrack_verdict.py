@@ -1,6 +1,11 @@
+from typing import Any, Dict, List, Optional
+from config.settings import Config
 from config.state import TrialState
 from utils.llm_clients import llm_clients
 from utils.blackboard import blackboard
+from utils.claim_index import claim_index
+from utils.prompt_batcher import PromptBatcher, batching_enabled, format_items, parse_items
+import asyncio
 import json
 
 FASTTRACK_VERDICT_PROMPT = """You are an AI fact-checker delivering a verdict on submitted content.
@@ -28,25 +33,56 @@ Deliver your verdict as JSON:
 Score: 0-20=Confirmed Misinformation, 20-40=Likely False, 40-60=Uncertain, 60-80=Likely True, 80-100=Verified True
 """
 
-async def fasttrack_verdict(state: TrialState) -> TrialState:
-    """Generate instant verdict using only investigator evidence"""
-    print("\n=== FAST-TRACK VERDICT ===")
-    
-    claims_text = "\n".join([f"- {c['text']}" for c in state.get("selected_claims", [])])
-    
-    # Get investigator evidence from blackboard
-    investigator_evidence = await blackboard.query_namespace(
-        state["case_id"], "investigator", "all evidence", top_k=10
-    )
-    
-    prompt = FASTTRACK_VERDICT_PROMPT.format(
-        claims=claims_text,
-        investigator_evidence=str(investigator_evidence)
-    )
-    
+FASTTRACK_VERDICT_BATCH_PROMPT = """You are an AI fact-checker delivering verdicts on {count} independent submissions, each marked with an ID. Judge every submission only on its own claims and evidence.
+
+{items}
+
+Base each judgment on EVIDENCE QUALITY and LOGICAL REASONING:
+- Evidence Grounding (35%): Are claims backed by verified sources?
+- Logical Validity (25%): Is the reasoning chain valid? Any fallacies?
+- Factual Accuracy (25%): Do stated facts match the evidence?
+- Source Quality (15%): Peer-reviewed > news > blog > social > anonymous
+
+Return ONLY a JSON object mapping every ID to its verdict, in this exact format:
+{{"item_1": {{
+  "confidence_score": 35,
+  "verdict_category": "Likely False",
+  "top_3_reasons": ["reason 1", "reason 2", "reason 3"],
+  "key_evidence": "most decisive evidence"
+}}}}
+
+Score: 0-20=Confirmed Misinformation, 20-40=Likely False, 40-60=Uncertain, 60-80=Likely True, 80-100=Verified True
+"""
+
+BATCH_ITEM = """Claims being evaluated:
+{claims}
+
+Investigation Evidence:
+{investigator_evidence}"""
+
+
+def _valid_verdict(value: Any) -> Optional[Dict]:
+    """`value` as a verdict, or None if it is not one"""
+    if not isinstance(value, dict):
+        return None
+    score = value.get("confidence_score")
+    category = value.get("verdict_category")
+    if not isinstance(score, (int, float)) or not 0 <= score <= 100 or not isinstance(category, str) or not category:
+        return None
+    reasons = value.get("top_3_reasons")
+    return {
+        "confidence_score": score,
+        "verdict_category": category,
+        "top_3_reasons": [r for r in reasons if isinstance(r, str)] if isinstance(reasons, list) else [],
+        "key_evidence": value.get("key_evidence") if isinstance(value.get("key_evidence"), str) else "",
+    }
+
+
+async def _single_verdict(item: Dict) -> Dict:
+    prompt = FASTTRACK_VERDICT_PROMPT.format(**item)
     print("[Gemini API] Generating verdict...")
     try:
-        response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3)
+        response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3, stage="fasttrack_verdict")
     except Exception as e:
         print(f"[Gemini API] Failed: {e}")
         print("[Groq API] Falling back to Groq...")
@@ -55,18 +91,76 @@ async def fasttrack_verdict(state: TrialState) -> TrialState:
         except Exception as e2:
             print(f"[Groq API] Failed: {e2}")
             response = '{"confidence_score": 50, "verdict_category": "Uncertain", "top_3_reasons": ["API error"], "key_evidence": "N/A"}'
-    
+    return _parse_verdict(response)
+
+
+def _parse_verdict(response: str) -> Dict:
+    """A model answer as a verdict (normalized like batched ones); Uncertain if it is not one"""
     try:
         json_start = response.find('{')
         json_end = response.rfind('}') + 1
-        verdict = json.loads(response[json_start:json_end])
-    except:
-        verdict = {
+        verdict = _valid_verdict(json.loads(response[json_start:json_end]))
+    except ValueError:
+        verdict = None
+    if verdict is None:
+        return {
             "confidence_score": 50,
             "verdict_category": "Uncertain",
             "top_3_reasons": ["Unable to parse verdict"],
             "key_evidence": ""
         }
+    return verdict
+
+
+async def _verdicts_batch(items: List[Dict]) -> List[Optional[Dict]]:
+    """Verdicts for several items from one prompt; None for items to retry on their own"""
+    prompt = FASTTRACK_VERDICT_BATCH_PROMPT.format(
+        count=len(items), items=format_items([BATCH_ITEM.format(**item) for item in items])
+    )
+    response = await llm_clients.generate_gemini_pro(prompt, temperature=0.3)
+    results = [_valid_verdict(value) for value in parse_items(response, len(items))]
+    for item, verdict in zip(items, results):
+        if verdict is not None:
+            await llm_clients.cache_batch_item(
+                FASTTRACK_VERDICT_PROMPT.format(**item), 0.3, "fasttrack_verdict", json.dumps(verdict)
+            )
+    print(f"[FAST-TRACK VERDICT] Batch of {len(items)}: {sum(r is not None for r in results)} valid")
+    return results
+
+
+verdict_batcher = PromptBatcher(
+    "fasttrack_verdict", _verdicts_batch, _single_verdict,
+    Config.PROMPT_BATCH_SIZE, Config.PROMPT_BATCH_MAX_WAIT
+)
+
+
+async def fasttrack_verdict(state: TrialState) -> TrialState:
+    """Generate instant verdict using only investigator evidence"""
+    print("\n=== FAST-TRACK VERDICT ===")
+    
+    claims_text = "\n".join([f"- {c['text']}" for c in state.get("selected_claims", [])])
+    
+    # Get investigator evidence from blackboard
+    investigator_evidence = await blackboard.query_namespace(
+        state["case_id"], "investigator", "all evidence", top_k=10
+    )
+    
+    # Drop per-run timestamps so identical evidence yields an identical
+    # (and therefore cacheable) prompt
+    investigator_evidence = [
+        {k: v for k, v in e.items() if k != "timestamp"} for e in investigator_evidence
+    ]
+    
+    item = {"claims": claims_text, "investigator_evidence": str(investigator_evidence)}
+    if batching_enabled.get() and verdict_batcher.batch_size > 1:
+        # Bulk runs share one verdict prompt with other items
+        cached = await llm_clients.cached_batch_item(FASTTRACK_VERDICT_PROMPT.format(**item), 0.3, "fasttrack_verdict")
+        if cached is not None:
+            verdict = _parse_verdict(cached)
+        else:
+            verdict = await verdict_batcher.submit(item)
+    else:
+        verdict = await _single_verdict(item)
     
     print(f"Verdict: {verdict['verdict_category']} (Score: {verdict['confidence_score']})")
     
@@ -85,5 +179,8 @@ async def fasttrack_verdict(state: TrialState) -> TrialState:
     }
     state["should_terminate"] = True
     
+    for claim in state.get("selected_claims", []):
+        await asyncio.to_thread(claim_index.record_verdict, claim["text"], verdict["confidence_score"])
+    
     print("=== FAST-TRACK COMPLETE ===\n")
     return state
@@ -1,8 +1,14 @@
+from config.settings import Config
 from config.state import TrialState
 from utils.llm_clients import llm_clients
 from utils.blackboard import blackboard
+from utils.claim_index import claim_index
+import asyncio
 import json
+import math
 from datetime import datetime
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 INVESTIGATOR_PROMPT = """You are the Court Investigator in a misinformation trial. Your role is NEUTRAL evidence gathering.
 
@@ -14,91 +20,225 @@ Search the web for REAL, CURRENT information about these claims. For each piece
 - Extract specific facts, dates, quotes
 - Rate source credibility (1-10)
 - Note if it supports or contradicts the claim
+- Note which claim (by number) it addresses
 
 Return ONLY a JSON array:
-[{{"source_url": "actual_url", "text": "specific excerpt with facts/dates", "credibility_score": 8, "supports_claim": true}}]
+[{{"claim_id": 1, "source_url": "actual_url", "text": "specific excerpt with facts/dates", "credibility_score": 8, "supports_claim": true}}]
 
 INSTRUCTIONS
 The response should be a normal JSON like the template given above. Don't give json response with triple back ticks.
 """
 
-async def investigator(state: TrialState) -> TrialState:
-    """Gather neutral baseline evidence using Gemini's grounding"""
-    claims_text = "\n".join([f"- {c['text']}" for c in state["selected_claims"]])
-    
-    evidence = []
-    
-    # NEW: If input is video, analyze for manipulation (minimal token usage)
-    if state.get("input_type") == "video":
-        print(f"[INVESTIGATOR] Running video forensics")
-        try:
-            # Reuse uploaded video file from claim extraction
-            video_file = state.get("uploaded_video_file")
-            if video_file:
-                # print(f"[INVESTIGATOR] Reusing uploaded video file: {video_file.name}")
-                # Analyze using existing file
-                response = llm_clients.client.models.generate_content(
-                    model='gemini-2.0-flash',
-                    contents=[video_file, """Briefly analyze this video for AI manipulation signs:
+FORENSICS_PROMPT = """Briefly analyze this video for AI manipulation signs:
 - Unnatural facial movements or lip-sync issues?
 - Synthetic voice or audio artifacts?
 - Visual glitches or inconsistencies?
 Return: "AUTHENTIC" or "SUSPICIOUS: [brief reason]"
-Keep response under 50 words."""],
-                    config={'temperature': 0.3}
-                )
-                forensics = response.text
-                print(f"[INVESTIGATOR] Video forensics result: {forensics}")
-                evidence.append({
-                    "source_url": "video_forensics_analysis",
-                    "text": f"Video Forensics Analysis: {forensics}",
-                    "credibility_score": 10,
-                    "supports_claim": "SUSPICIOUS" not in forensics.upper(),
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-                # Clean up video file after forensics
-                try:
-                    llm_clients.client.files.delete(name=video_file.name)
-                    # print(f"[INVESTIGATOR] Cleaned up video file: {video_file.name}")
-                except:
-                    pass
-            else:
-                print("[INVESTIGATOR] No uploaded video file found in state")
-        except Exception as e:
-            print(f"[INVESTIGATOR] Video forensics failed: {e}")
-            import traceback
-            traceback.print_exc()
+Keep response under 50 words."""
+
+
+async def investigator(state: TrialState) -> TrialState:
+    """Gather neutral baseline evidence using Gemini's grounding"""
+    async for _ in investigate(state):
+        pass
+    return state
+
+
+async def investigate(state: TrialState, quorum: float = 1.0) -> AsyncIterator[Dict]:
+    """Run the investigation, yielding an `investigation` SSE payload as each claim's evidence lands.
+
+    With Config.INVESTIGATOR_PER_CLAIM every claim gets its own grounded
+    search, so one slow or malformed response only costs that claim;
+    otherwise all claims share one search and nothing is yielded. Video
+    forensics runs alongside either way. Per-claim searches stop once
+    `quorum` (a share of the claims) have evidence; the rest are cancelled.
+    """
+    claims = state["selected_claims"]
+    forensics = asyncio.create_task(video_forensics(state))
+    evidence = []
+    try:
+        if Config.INVESTIGATOR_PER_CLAIM:
+            needed = min(len(claims), max(1, math.ceil(len(claims) * quorum)))
+            completed = 0
+            async with aclosing(iter_claim_evidence(claims, Config.INVESTIGATOR_CLAIM_CONCURRENCY)) as results:
+                async for claim, items in results:
+                    completed += 1
+                    yield claim_evidence_event(claim, merge_evidence(evidence, items), completed, len(claims))
+                    if completed >= needed:
+                        # Leaving the block cancels the remaining searches
+                        break
+            if completed < len(claims):
+                print(f"[INVESTIGATOR] Quorum reached ({completed}/{len(claims)} claims), cancelled the remaining searches")
+        else:
+            merge_evidence(evidence, await gather_claim_evidence(claims))
+        forensics_item = await forensics
+    finally:
+        if not forensics.done():
+            forensics.cancel()
+    await record_investigation(state, ([forensics_item] if forensics_item else []) + evidence)
+
+
+async def iter_claim_evidence(claims: List[Dict], concurrency: int) -> AsyncIterator[Tuple[Dict, List[Dict]]]:
+    """Investigate claims separately (at most `concurrency` at once), yielding (claim, evidence) as each finishes.
+
+    Closing the generator early cancels the searches still running.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def search(claim_id: int, claim: Dict) -> Tuple[Dict, List[Dict]]:
+        async with semaphore:
+            try:
+                return claim, await gather_claim_evidence([claim], [claim_id])
+            except Exception as e:
+                print(f"[INVESTIGATOR] Search failed for claim '{claim['text'][:60]}': {e}")
+                return claim, []
+
+    tasks = [asyncio.create_task(search(i, claim)) for i, claim in enumerate(claims, 1)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def merge_evidence(evidence: List[Dict], new_items: List[Dict]) -> List[Dict]:
+    """Append `new_items` to `evidence`, skipping sources already present; returns the items added"""
+    seen = {e.get("source_url") for e in evidence if e.get("source_url")}
+    added = []
+    for e in new_items:
+        url = e.get("source_url")
+        if url and url in seen:
+            continue
+        if url:
+            seen.add(url)
+        evidence.append(e)
+        added.append(e)
+    return added
+
+
+def evidence_card(e: Dict) -> Dict:
+    """Evidence in the shape the investigation panel renders"""
+    return {"source": e.get("source_url", ""), "summary": str(e.get("text", ""))[:300], "score": e.get("credibility_score", 5)}
+
+
+def claim_evidence_event(claim: Dict, added: List[Dict], completed: int, total: int) -> Dict:
+    return {
+        'phase': 'investigation',
+        'status': 'claim_investigated',
+        'claim_text': claim['text'],
+        'new_evidence': [evidence_card(e) for e in added],
+        'completed': completed,
+        'total': total
+    }
+
+
+async def video_forensics(state: TrialState) -> Optional[Dict]:
+    """Manipulation check for video input (minimal token usage); None otherwise or on failure"""
+    if state.get("input_type") != "video":
+        return None
+    print(f"[INVESTIGATOR] Running video forensics")
+    try:
+        # The remote file registry reuses the upload from claim extraction
+        forensics = await llm_clients.analyze_video(
+            state["raw_input"], FORENSICS_PROMPT, content_hash=state.get("content_hash")
+        )
+    except Exception as e:
+        print(f"[INVESTIGATOR] Video forensics failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+    print(f"[INVESTIGATOR] Video forensics result: {forensics}")
+    return {
+        "source_url": "video_forensics_analysis",
+        "text": f"Video Forensics Analysis: {forensics}",
+        "credibility_score": 10,
+        "supports_claim": "SUSPICIOUS" not in forensics.upper(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+async def gather_claim_evidence(claims: List[Dict], claim_ids: Optional[List[int]] = None) -> List[Dict]:
+    """Evidence for `claims`: claim index hits, plus one grounded search for the rest.
+
+    Evidence `claim_id`s are `claim_ids`, the claims' 1-based positions in
+    the case (default: their positions in `claims`).
+    """
+    evidence = []
+    # Reuse fresh evidence for claims we have already investigated recently
+    claims_to_search, search_ids = [], []
+    for claim_id, claim in zip(claim_ids or range(1, len(claims) + 1), claims):
+        hit = await asyncio.to_thread(claim_index.lookup, claim["text"])
+        if hit:
+            print(f"[INVESTIGATOR] Reusing {len(hit['evidence'])} indexed evidence items for claim: {claim['text'][:60]}")
+            for e in hit["evidence"]:
+                # Re-attributed to this claim; support is unknown unless the match was exact
+                e["claim_id"] = claim_id
+                e.setdefault("supports_claim", None)
+                evidence.append(e)
+        else:
+            claims_to_search.append(claim)
+            search_ids.append(claim_id)
+    
+    if claims_to_search:
+        evidence.extend(await _search_claims(claims_to_search, search_ids))
+    elif claims:
+        print("[INVESTIGATOR] All claims served from claim index, skipping grounded search")
+    return evidence
+
+
+async def record_investigation(state: TrialState, evidence: List[Dict]):
+    """Timestamp evidence and store it on the blackboard and in state"""
+    # Add timestamp to evidence that doesn't have it
+    for e in evidence:
+        if "timestamp" not in e:
+            e["timestamp"] = datetime.now().isoformat()
+    
+    # Store in investigator namespace
+    for e in evidence:
+        await blackboard.store_evidence(state["case_id"], "investigator", e)
+    
+    state["investigator_evidence"] = evidence
+
+
+async def _search_claims(claims, claim_ids):
+    """Grounded web search for `claims`; indexes the evidence found per claim"""
+    claims_text = "\n".join([f"{i}. {c['text']}" for i, c in enumerate(claims, 1)])
     
     # Use Gemini with Google Search grounding for web evidence
     prompt = INVESTIGATOR_PROMPT.format(claims=claims_text)
     
     # Gemini will search the web and cite real sources
-    response = await llm_clients.generate_gemini_grounded(prompt)
+    response = await llm_clients.generate_gemini_grounded(prompt, stage="investigator")
     
     try:
         json_start = response.find('[')
         json_end = response.rfind(']') + 1
         web_evidence = json.loads(response[json_start:json_end])
-        evidence.extend(web_evidence)
     except:
-        # Fallback: create basic evidence structure
-        evidence.append({
+        # Fallback: create basic evidence structure (not indexed)
+        return [{
             "source_url": "web_search",
             "text": response[:500],
             "credibility_score": 5,
             "supports_claim": False,
             "timestamp": datetime.now().isoformat()
-        })
-    
-    # Add timestamp to evidence that doesn't have it
-    for e in evidence:
-        if "timestamp" not in e:
-            e["timestamp"] = datetime.now().isoformat()
+        }]
     
-    # Store in investigator namespace
-    for e in evidence:
-        await blackboard.store_evidence(state["case_id"], "investigator", e)
+    # Attribute evidence to claims; items without a valid claim_id count for every claim
+    per_claim = {i: [] for i in range(1, len(claims) + 1)}
+    for e in web_evidence:
+        e.setdefault("timestamp", datetime.now().isoformat())
+        claim_id = e.get("claim_id")
+        if claim_id in per_claim:
+            per_claim[claim_id].append(e)
+            # The prompt numbers only the claims searched; map back to the case's numbering
+            e["claim_id"] = claim_ids[claim_id - 1]
+        else:
+            for items in per_claim.values():
+                items.append(e)
+    for i, claim in enumerate(claims, 1):
+        await asyncio.to_thread(claim_index.record_evidence, claim["text"], per_claim[i])
     
-    state["investigator_evidence"] = evidence
-    return state
+    return web_evidence
@@ -1,8 +1,11 @@
 from config.state import TrialState
 from utils.llm_clients import llm_clients
+from utils.llm_scheduler import Priority
 from utils.blackboard import blackboard
+import copy
 import json
 import asyncio
+from typing import Dict, List, Optional
 
 JUROR_PROMPT = """You are Juror {juror_id} in a misinformation trial. You are evaluating whether submitted content is real or fake based on the evidence and arguments presented.
 
@@ -85,15 +88,15 @@ async def jury_update(state: TrialState) -> TrialState:
         
         # Use different models for different jurors
         if juror["model_name"] == "gemini-pro":
-            response = await llm_clients.generate_gemini_pro(prompt, temperature=0.5)
+            response = await llm_clients.generate_gemini_pro(prompt, temperature=0.5, priority=Priority.BACKGROUND)
         elif juror["model_name"] == "claude":
-            response = await llm_clients.generate_claude(prompt, temperature=0.5)
+            response = await llm_clients.generate_claude(prompt, temperature=0.5, priority=Priority.BACKGROUND)
         elif juror["model_name"] == "gemini-flash":
-            response = await llm_clients.generate_gemini_flash(prompt, temperature=0.5)
+            response = await llm_clients.generate_gemini_flash(prompt, temperature=0.5, priority=Priority.BACKGROUND)
         elif juror["model_name"] == "groq":
-            response = await llm_clients.generate_groq(prompt, temperature=0.5)
+            response = await llm_clients.generate_groq(prompt, temperature=0.5, priority=Priority.BACKGROUND)
         else:
-            response = await llm_clients.generate_gemini_flash(prompt, temperature=0.5)
+            response = await llm_clients.generate_gemini_flash(prompt, temperature=0.5, priority=Priority.BACKGROUND)
         
         try:
             json_start = response.find('{')
@@ -117,6 +120,50 @@ async def jury_update(state: TrialState) -> TrialState:
     
     return state
 
+def start_jury_update(state: TrialState, previous: Optional[asyncio.Task] = None) -> asyncio.Task:
+    """Run jury_update for the round just argued as a detached task.
+
+    The trial does not wait for it: the next round and the user's judgment
+    go ahead while jurors write their notes. Updates are chained, so this
+    one starts after `previous` from the jurors it left behind. The task's
+    result is the updated jury_members, or None if the update failed (the
+    previous jurors then carry over).
+    """
+    # Freeze the round; the trial moves on without us
+    round_number = state["current_round"]
+    snapshot = {
+        **state,
+        "trial_transcript": list(state["trial_transcript"]),
+        "jury_members": copy.deepcopy(state["jury_members"]),
+    }
+
+    async def run() -> Optional[List[Dict]]:
+        if previous is not None:
+            if not previous.done():
+                await asyncio.gather(previous, return_exceptions=True)
+            carried = jury_update_result(previous)
+            if carried is not None:
+                snapshot["jury_members"] = copy.deepcopy(carried)
+        try:
+            await jury_update(snapshot)
+        except Exception as e:
+            print(f"[JURY] Note update for round {round_number} failed: {e}")
+            return jury_update_result(previous) if previous is not None else None
+        for juror in snapshot["jury_members"]:
+            juror["notes_round"] = round_number
+        print(f"[JURY] Notes updated for round {round_number}")
+        return snapshot["jury_members"]
+
+    return asyncio.create_task(run())
+
+
+def jury_update_result(task: asyncio.Task) -> Optional[List[Dict]]:
+    """Jurors from a finished start_jury_update task; None if it failed or is still running"""
+    if not task.done() or task.cancelled() or task.exception() is not None:
+        return None
+    return task.result()
+
+
 async def jury_verdict(state: TrialState) -> TrialState:
     """Generate final verdicts from all jurors"""
     claims_text = "\n".join([f"- {c['text']}" for c in state["selected_claims"]])
@@ -1,5 +1,6 @@
 from config.state import TrialState
 from utils.llm_clients import llm_clients
+from utils.llm_scheduler import Priority
 from utils.blackboard import blackboard
 import json
 
@@ -36,14 +37,14 @@ DO NOT repeat the same points from your first round argument. Build upon it with
 Be specific. Include dates, names, numbers. No vague statements.
 """
 
-async def prosecutor_turn(state: TrialState) -> TrialState:
-    """Generate prosecutor argument"""
+async def build_prosecutor_prompt(state: TrialState) -> str:
+    """Gather blackboard context and build the prosecutor prompt"""
     claims_text = "\n".join([f"- {c['text']}" for c in state["selected_claims"]])
     
     # Query investigator namespace
     investigator_context = await blackboard.query_namespace(
         state["case_id"], "investigator", 
-        "evidence against claims", top_k=5
+        f"evidence against claims {claims_text}", top_k=5
     )
     
     # Query defendant namespace for rebuttals
@@ -51,7 +52,7 @@ async def prosecutor_turn(state: TrialState) -> TrialState:
     if state["current_round"] > 1:
         defendant_context = await blackboard.query_namespace(
             state["case_id"], "defendant",
-            "defense arguments", top_k=3
+            f"defense arguments {claims_text}", top_k=3
         )
     
     # Build previous arguments context
@@ -68,15 +69,15 @@ async def prosecutor_turn(state: TrialState) -> TrialState:
                 first_round_arg = t["argument_text"]
                 break
     
-    prompt = PROSECUTOR_PROMPT.format(
+    return PROSECUTOR_PROMPT.format(
         claims=claims_text,
         investigator_evidence=str(investigator_context),
         previous_arguments=f"\n\nPrevious arguments:\n{previous_args}" if previous_args else "",
         first_round_argument=f"\n\nYour first round argument (DO NOT REPEAT):\n{first_round_arg}" if first_round_arg else ""
     )
-    
-    response = await llm_clients.generate_gemini_pro(prompt, temperature=0.7)
-    
+
+async def record_prosecutor_argument(state: TrialState, response: str) -> TrialState:
+    """Parse the prosecutor response and record it on the blackboard and transcript"""
     try:
         json_start = response.find('{')
         json_end = response.rfind('}') + 1
@@ -115,3 +116,9 @@ async def prosecutor_turn(state: TrialState) -> TrialState:
     })
     
     return state
+
+async def prosecutor_turn(state: TrialState) -> TrialState:
+    """Generate prosecutor argument"""
+    prompt = await build_prosecutor_prompt(state)
+    response = await llm_clients.generate_gemini_pro(prompt, temperature=0.7, priority=Priority.INTERACTIVE)
+    return await record_prosecutor_argument(state, response)
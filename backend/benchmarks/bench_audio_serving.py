@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes served for one replay-heavy listening session of a TTS clip.
+
+The session is one initial play, then --replays replays that revalidate with
+If-None-Match (what media elements do with a cached clip), and --seeks seeks
+sent as Range requests. The current audio endpoint is compared with the old
+handler (plain FileResponse, one-hour max-age, no conditional GET handling).
+
+Runs in-process over ASGI; no server or API keys needed.
+
+Usage:
+    python benchmarks/bench_audio_serving.py [--replays 20] [--seeks 20] [--size-kb 240]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ["TTS_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_audio_")
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import FileResponse
+from main import app
+from utils.tts_service import tts_service
+
+FILENAME = "0123456789abcdef0123456789abcdef.mp3"
+
+
+def legacy_app() -> FastAPI:
+    legacy = FastAPI()
+
+    @legacy.get("/api/trial/{case_id}/audio/{filename}")
+    async def serve_audio(case_id: str, filename: str):
+        return FileResponse(
+            str(tts_service.cache.path_for(filename)),
+            media_type="audio/mpeg",
+            headers={"Cache-Control": "public, max-age=3600"}
+        )
+
+    return legacy
+
+
+async def session(asgi_app, size: int, replays: int, seeks: int) -> dict:
+    url = f"http://bench/api/trial/case/audio/{FILENAME}"
+    rng = random.Random(0)
+    served = {"initial": 0, "replays": 0, "seeks": 0}
+    statuses = set()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app)) as client:
+        first = await client.get(url)
+        served["initial"] += len(first.content)
+        etag = first.headers.get("etag")
+        for _ in range(replays):
+            response = await client.get(url, headers={"If-None-Match": etag} if etag else {})
+            served["replays"] += len(response.content)
+            statuses.add(response.status_code)
+        for _ in range(seeks):
+            start = rng.randrange(size)
+            response = await client.get(url, headers={"Range": f"bytes={start}-{min(start + 16383, size - 1)}"})
+            served["seeks"] += len(response.content)
+            statuses.add(response.status_code)
+    served["total"] = sum(served.values())
+    served["statuses"] = sorted(statuses)
+    return served
+
+
+async def run(replays: int, seeks: int, size_kb: int):
+    size = size_kb * 1024
+    await tts_service.cache.put(FILENAME, os.urandom(size))
+    print(f"{'endpoint':<10} {'initial':>10} {'replays':>10} {'seeks':>10} {'total':>11}  statuses")
+    for label, asgi_app in (("legacy", legacy_app()), ("current", app)):
+        s = await session(asgi_app, size, replays, seeks)
+        print(f"{label:<10} {s['initial']:>10} {s['replays']:>10} {s['seeks']:>10} {s['total']:>11}  {s['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replays", type=int, default=20)
+    parser.add_argument("--seeks", type=int, default=20)
+    parser.add_argument("--size-kb", type=int, default=240, help="clip size (240 KB ~ 15 s at 128 kbps)")
+    args = parser.parse_args()
+    asyncio.run(run(args.replays, args.seeks, args.size_kb))
+
+
+if __name__ == "__main__":
+    main()
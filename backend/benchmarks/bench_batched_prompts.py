@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batched claim extraction / verdict prompts in bulk runs, K=1,4,8,16.
+
+Runs bulk_factcheck.run_bulk over short posts against a stand-in Gemini, so
+no API keys are needed. A call costs time-to-first-token plus a per-token
+cost for prompt and output (lognormal jitter); grounded searches add
+--search-latency. Gemini admits --provider-slots calls at a time, as the
+scheduler does under a real quota. --invalid-rate of batched items come back
+malformed and are retried alone.
+
+  calls/item   - LLM round-trips per item (searches included)
+  tokens/item  - prompt + output tokens of extraction and verdict calls
+  throughput   - items per simulated minute
+
+Usage:
+    python benchmarks/bench_batched_prompts.py [--items 256] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_MAX_CONCURRENCY", "100000")
+os.environ.setdefault("GEMINI_RPM", "100000000")
+os.environ.setdefault("GEMINI_TPM", "100000000000")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("CLAIM_INDEX_ENABLED", "false")
+
+from agents.claim_extractor import extraction_batcher
+from agents.fasttrack_verdict import verdict_batcher
+from bulk_factcheck import parse_json_array, run_bulk
+from utils.llm_clients import llm_clients
+
+CLAIMS = [
+    {"text": "The city council approved the new budget on Monday", "category": "factual", "verifiability_score": 85, "priority": 80},
+    {"text": "Public transport fares will double next year", "category": "prediction", "verifiability_score": 60, "priority": 70},
+]
+VERDICT = {"confidence_score": 30, "verdict_category": "Likely False",
+           "top_3_reasons": ["No council record of the vote", "Fare plan not published", "Source is an anonymous account"],
+           "key_evidence": "Council minutes for the week list no budget vote"}
+POST = ("BREAKING: the council just approved the budget and bus fares are going to double next year. "
+        "They tried to hide it but the documents leaked. Share before it's deleted! #{i}")
+
+
+class _StandInModels:
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.slots = asyncio.Semaphore(args.provider_slots)
+        self.calls = 0
+        self.tokens = 0  # extraction and verdict calls only
+
+    def _items(self, text: str, value):
+        count = len(re.findall(r"^\[item_\d+\]$", text, re.MULTILINE))
+        return json.dumps({
+            f"item_{i}": value if self.rng.random() >= self.args.invalid_rate else "malformed"
+            for i in range(1, count + 1)
+        })
+
+    async def generate_content(self, model, contents, config=None):
+        text = contents if isinstance(contents, str) else str(contents)
+        latency = self.args.ttft
+        if "independent pieces of content" in text:
+            body = self._items(text, CLAIMS)
+        elif "claim extraction specialist" in text:
+            body = json.dumps(CLAIMS)
+        elif "Court Investigator" in text:
+            claims = len(re.findall(r"^\d+\. ", text, re.MULTILINE))
+            body = json.dumps([{"claim_id": i, "source_url": f"https://example.com/{i}", "text": "Council minutes, week 12",
+                                "credibility_score": 8, "supports_claim": False} for i in range(1, claims + 1)])
+            latency += self.args.search_latency
+        elif "independent submissions" in text:
+            body = self._items(text, VERDICT)
+        else:
+            body = json.dumps(VERDICT)
+        prompt_tokens, output_tokens = len(text) // 4, len(body) // 4
+        if "Court Investigator" not in text:
+            self.tokens += prompt_tokens + output_tokens
+        latency += prompt_tokens * self.args.prompt_token_ms / 1000 + output_tokens * self.args.output_token_ms / 1000
+        latency *= self.rng.lognormvariate(-self.args.sigma ** 2 / 2, self.args.sigma)
+        async with self.slots:
+            self.calls += 1
+            await asyncio.sleep(latency * self.args.time_scale)
+        return SimpleNamespace(text=body, candidates=[])
+
+
+async def run(args, batch_size: int):
+    models = _StandInModels(args, random.Random(0))
+    llm_clients.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    for batcher in (extraction_batcher, verdict_batcher):
+        batcher.batch_size = batch_size
+        batcher.max_wait = args.max_wait * args.time_scale
+    retried_before = extraction_batcher.retried + verdict_batcher.retried
+    items = parse_json_array(json.dumps([POST.format(i=i) for i in range(args.items)]).encode())
+    start = time.perf_counter()
+    results = [r async for r in run_bulk(items, args.concurrency)]
+    elapsed = (time.perf_counter() - start) / args.time_scale
+    ok = sum(r.get("status") == "ok" for r in results)
+    retried = extraction_batcher.retried + verdict_batcher.retried - retried_before
+    return models.calls / args.items, models.tokens / args.items, ok / elapsed * 60, retried
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=64, help="bulk items in flight")
+    parser.add_argument("--provider-slots", type=int, default=16, help="Gemini calls in flight")
+    parser.add_argument("--ttft", type=float, default=0.6, help="seconds to first token")
+    parser.add_argument("--prompt-token-ms", type=float, default=0.2, help="ms per prompt token")
+    parser.add_argument("--output-token-ms", type=float, default=8.0, help="ms per output token")
+    parser.add_argument("--search-latency", type=float, default=2.5, help="extra seconds per grounded search")
+    parser.add_argument("--max-wait", type=float, default=1.0, help="batch window, simulated seconds")
+    parser.add_argument("--invalid-rate", type=float, default=0.02, help="share of batched items answered malformed")
+    parser.add_argument("--sigma", type=float, default=0.3)
+    parser.add_argument("--time-scale", type=float, default=0.01, help="real seconds per simulated second")
+    args = parser.parse_args()
+
+    real_stdout = sys.stdout
+    rows = []
+    for batch_size in (1, 4, 8, 16):
+        sys.stdout = open(os.devnull, "w")
+        try:
+            rows.append((batch_size, *asyncio.run(run(args, batch_size))))
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+
+    print(f"{'K':>3} {'calls/item':>11} {'tokens/item':>12} {'saved':>7} {'items/min':>10} {'gain':>6} {'retried':>8}"
+          f"   ({args.items} items, {args.concurrency} in flight, {args.provider_slots} provider slots)")
+    _, _, base_tokens, base_rate, _ = rows[0]
+    for batch_size, calls, tokens, rate, retried in rows:
+        print(f"{batch_size:>3} {calls:>11.2f} {tokens:>12.0f} {(1 - tokens / base_tokens) * 100:>6.0f}% "
+              f"{rate:>10.0f} {rate / base_rate:>5.2f}x {retried:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N concurrent fast-track trials against a simulated Gemini backend.
+
+Gemini is replaced by a stand-in that takes a fixed amount of time per call, so
+no API keys or network are needed. Two stand-ins are compared:
+
+  blocking - sleeps with time.sleep() inside the coroutine, which is what the
+             old synchronous SDK calls did to the event loop
+  async    - sleeps with asyncio.sleep(), like the native async clients
+
+With the async provider layer, N concurrent trials should finish in roughly
+the time of one.
+
+Usage:
+    python benchmarks/bench_concurrent_trials.py [--trials 10] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+# Measure the event loop, not the scheduler's provider limits
+os.environ.setdefault("GEMINI_MAX_CONCURRENCY", "1000")
+os.environ.setdefault("GEMINI_RPM", "100000")
+# Every trial should pay the full provider cost
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("CLAIM_INDEX_ENABLED", "false")
+
+from utils.llm_clients import llm_clients
+from workflow import create_initial_state
+from agents.claim_extractor import claim_extractor
+from agents.claim_triage import claim_triage
+from agents.investigator import investigator
+from agents.fasttrack_verdict import fasttrack_verdict
+
+CLAIMS_JSON = '[{"text": "The moon is made of cheese", "category": "factual", "verifiability_score": 90, "priority": 90}]'
+EVIDENCE_JSON = '[{"source_url": "https://example.com", "text": "Lunar samples are rock", "credibility_score": 9, "supports_claim": false}]'
+VERDICT_JSON = '{"confidence_score": 5, "verdict_category": "Confirmed Misinformation", "top_3_reasons": ["a", "b", "c"], "key_evidence": "samples"}'
+
+
+def _fake_response(prompt) -> SimpleNamespace:
+    text = prompt if isinstance(prompt, str) else str(prompt)
+    if "claim extraction specialist" in text:
+        body = CLAIMS_JSON
+    elif "Court Investigator" in text:
+        body = EVIDENCE_JSON
+    else:
+        body = VERDICT_JSON
+    return SimpleNamespace(text=body, candidates=[])
+
+
+class _StandInModels:
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+
+    async def generate_content(self, model, contents, config=None):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        return _fake_response(contents)
+
+
+def install_stand_in(latency: float, blocking: bool):
+    models = _StandInModels(latency, blocking)
+    llm_clients.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+
+
+async def run_trial(i: int):
+    state = create_initial_state(f"Viral post #{i}: the moon is made of cheese", "text")
+    state = await claim_extractor(state)
+    state = await claim_triage(state)
+    state = await investigator(state)
+    state = await fasttrack_verdict(state)
+    return state["aggregated_verdict"]
+
+
+async def run_batch(n: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[run_trial(i) for i in range(n)])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated seconds per provider call")
+    args = parser.parse_args()
+
+    # Silence the agents' progress prints so the table is readable
+    real_stdout = sys.stdout
+    results = []
+    for label, blocking in (("blocking", True), ("async", False)):
+        install_stand_in(args.latency, blocking)
+        sys.stdout = open(os.devnull, "w")
+        try:
+            one = asyncio.run(run_batch(1))
+            many = asyncio.run(run_batch(args.trials))
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        results.append((label, one, many))
+
+    print(f"{'provider':<10} {'1 trial':>10} {f'{args.trials} trials':>12} {'ratio':>8}")
+    for label, one, many in results:
+        print(f"{label:<10} {one:>9.2f}s {many:>11.2f}s {many / one:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
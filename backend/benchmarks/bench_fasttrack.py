@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fast-track latency (p50/p95), serial pipeline vs the DAG.
+
+Gemini is replaced by a stand-in with lognormal latency, so no API keys or
+network are needed. A grounded search costs --search-base plus
+--search-per-claim for every claim in the prompt; other calls cost
+--call-latency. Each trial extracts three claims.
+
+  serial - claim_extractor -> claim_triage -> investigator (one grounded
+           prompt for all claims) -> fasttrack_verdict
+  dag    - fasttrack_pipeline.run_fasttrack: one search per claim in
+           parallel, verdict at quorum
+
+Latencies are simulated seconds; --time-scale compresses the real sleeps.
+
+Usage:
+    python benchmarks/bench_fasttrack.py [--trials 100] [--sigma 0.5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_MAX_CONCURRENCY", "100000")
+os.environ.setdefault("GEMINI_RPM", "10000000")
+os.environ.setdefault("GEMINI_TPM", "100000000000")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("CLAIM_INDEX_ENABLED", "false")
+
+from utils.llm_clients import llm_clients
+from workflow import create_initial_state
+from agents.claim_extractor import claim_extractor
+from agents.claim_triage import claim_triage
+from agents.investigator import investigator
+from agents.fasttrack_verdict import fasttrack_verdict
+from fasttrack_pipeline import run_fasttrack
+
+CLAIMS_JSON = (
+    '[{"text": "Claim A", "category": "factual", "verifiability_score": 90, "priority": 90},'
+    ' {"text": "Claim B", "category": "factual", "verifiability_score": 80, "priority": 80},'
+    ' {"text": "Claim C", "category": "factual", "verifiability_score": 70, "priority": 70}]'
+)
+VERDICT_JSON = '{"confidence_score": 30, "verdict_category": "Likely False", "top_3_reasons": ["a", "b", "c"], "key_evidence": "x"}'
+
+
+class _StandInModels:
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+
+    def _latency(self, mean: float) -> float:
+        # Lognormal with the given mean
+        sigma = self.args.sigma
+        return mean * self.rng.lognormvariate(-sigma ** 2 / 2, sigma)
+
+    async def generate_content(self, model, contents, config=None):
+        text = contents if isinstance(contents, str) else str(contents)
+        if "claim extraction specialist" in text:
+            latency, body = self._latency(self.args.call_latency), CLAIMS_JSON
+        elif "Court Investigator" in text:
+            claims = len(re.findall(r"^\d+\. ", text, re.MULTILINE))
+            latency = self._latency(self.args.search_base + self.args.search_per_claim * claims)
+            body = "[" + ", ".join(
+                f'{{"claim_id": {i}, "source_url": "https://example.com/{i}", "text": "evidence", '
+                f'"credibility_score": 8, "supports_claim": false}}'
+                for i in range(1, claims + 1)
+            ) + "]"
+        else:
+            latency, body = self._latency(self.args.call_latency), VERDICT_JSON
+        await asyncio.sleep(latency * self.args.time_scale)
+        return SimpleNamespace(text=body, candidates=[])
+
+
+async def serial(state):
+    state = await claim_extractor(state)
+    state = await claim_triage(state)
+    state = await investigator(state)
+    await fasttrack_verdict(state)
+
+
+async def dag(state):
+    async for _ in run_fasttrack(state):
+        pass
+
+
+async def run_trials(pipeline, n: int, parallel: int, time_scale: float):
+    # Trials run one at a time by default so event-loop overhead stays out of the scaled numbers
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def one(i):
+        async with semaphore:
+            state = create_initial_state(f"Viral post #{i}", "text")
+            start = time.perf_counter()
+            await pipeline(state)
+            return (time.perf_counter() - start) / time_scale
+    return sorted(await asyncio.gather(*[one(i) for i in range(n)]))
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=100)
+    parser.add_argument("--call-latency", type=float, default=1.5, help="mean seconds for extraction/verdict calls")
+    parser.add_argument("--search-base", type=float, default=3.0, help="mean seconds per grounded search")
+    parser.add_argument("--search-per-claim", type=float, default=2.0, help="extra mean seconds per claim in the prompt")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal sigma (tail heaviness)")
+    parser.add_argument("--parallel", type=int, default=1, help="trials in flight at once")
+    parser.add_argument("--time-scale", type=float, default=0.02, help="real seconds per simulated second")
+    args = parser.parse_args()
+
+    real_stdout = sys.stdout
+    rows = []
+    for label, pipeline in (("serial", serial), ("dag", dag)):
+        llm_clients.client = SimpleNamespace(aio=SimpleNamespace(models=_StandInModels(args, random.Random(0))))
+        sys.stdout = open(os.devnull, "w")
+        try:
+            latencies = asyncio.run(run_trials(pipeline, args.trials, args.parallel, args.time_scale))
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        rows.append((label, percentile(latencies, 50), percentile(latencies, 95)))
+
+    print(f"{'pipeline':<10} {'p50':>8} {'p95':>8}   ({args.trials} trials, 3 claims, simulated seconds)")
+    for label, p50, p95 in rows:
+        print(f"{label:<10} {p50:>7.2f}s {p95:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
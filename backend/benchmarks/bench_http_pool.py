@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call latency of a fresh httpx.AsyncClient per request (the old
+web_search/TTS behaviour) vs the shared keep-alive pool.
+
+A stub HTTP/1.1 server runs on localhost. Real providers sit behind TLS, so
+the stub can add a fixed delay to every *new* connection (--handshake-ms) to
+stand in for the TCP+TLS setup cost that the pool avoids.
+
+Usage:
+    python benchmarks/bench_http_pool.py [--calls 200] [--handshake-ms 30]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+import httpx
+from utils.http_pool import HTTPPool
+
+BODY = b'{"results": []}'
+
+
+async def start_stub_server(handshake_ms: float):
+    connections = 0
+
+    async def handle(reader, writer):
+        nonlocal connections
+        connections += 1
+        await asyncio.sleep(handshake_ms / 1000)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/search/web", lambda: connections
+
+
+async def fresh_client_call(url: str):
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        (await client.post(url, json={"query": "q"})).raise_for_status()
+
+
+async def measure(call, calls: int):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def run(calls: int, handshake_ms: float):
+    server, url, connections = await start_stub_server(handshake_ms)
+    pool = HTTPPool(http2=False)
+    await pool.start()
+    try:
+        before = connections()
+        fresh = await measure(lambda: fresh_client_call(url), calls)
+        fresh_connections = connections() - before
+
+        before = connections()
+        pooled = await measure(lambda: pool.post(url, json={"query": "q"}), calls)
+        pooled_connections = connections() - before
+    finally:
+        await pool.close()
+        server.close()
+        await server.wait_closed()
+
+    print(f"{'client':<8} {'p50 ms':>8} {'p95 ms':>8} {'connections':>12}")
+    for label, latencies, conns in (("fresh", fresh, fresh_connections), ("pooled", pooled, pooled_connections)):
+        p95 = statistics.quantiles(latencies, n=20)[18]
+        print(f"{label:<8} {statistics.median(latencies):>8.2f} {p95:>8.2f} {conns:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=30.0, help="simulated TCP+TLS setup per new connection")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.handshake_ms))
+
+
+if __name__ == "__main__":
+    main()
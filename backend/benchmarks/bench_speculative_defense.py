@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-round latency and token cost, serial vs speculative defense.
+
+Runs round_executor.run_round with the real prompts and blackboard against a
+stand-in Gemini whose latency is time-to-first-token plus a per-token cost
+for prompt and output (lognormal jitter), so no API keys are needed. TTS is
+stubbed out.
+
+  round latency  - prosecutor start to the defendant's `trial` event
+  defense wait   - prosecutor's argument to the defendant's (critical path)
+  tokens/round   - prompt + output tokens of every LLM call in the round
+
+Usage:
+    python benchmarks/bench_speculative_defense.py [--rounds 30] [--ttft 0.6]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_RPM", "1000000")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+os.environ["STREAM_ARGUMENTS"] = "false"
+os.environ["TTS_CHUNKED"] = "false"
+
+import round_executor
+from round_executor import run_round, speculation_metrics
+from utils.blackboard import blackboard
+from utils.llm_clients import llm_clients
+from utils.tts_service import tts_service
+
+ARGUMENT = ("The cited report was published on 3 March 2024 by the national statistics office and "
+            "its figures match the claim within rounding; two independent outlets reproduced them. ") * 4
+
+
+def _response(confidence: int) -> str:
+    return ('{"argument": "%s", "confidence_score": %d, "evidence_to_reveal": '
+            '[{"source": "https://example.com/report", "text": "Table 2, page 14", "credibility_score": 8}]}'
+            % (ARGUMENT.strip(), confidence))
+
+
+class _StandInModels:
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.tokens = 0
+
+    async def generate_content(self, model, contents, config=None):
+        prompt = contents if isinstance(contents, str) else str(contents)
+        if "before hearing the prosecutor" in prompt:
+            body = '{"opening": "The prosecutor never engages with the March 2024 release, which settles the figure.", "confidence_score": 58}'
+        else:
+            body = _response(70 if "Prosecutor" in prompt.split("\n", 1)[0] else 55)
+        prompt_tokens, output_tokens = len(prompt) // 4, len(body) // 4
+        self.tokens += prompt_tokens + output_tokens
+        latency = (self.args.ttft + prompt_tokens * self.args.prompt_token_ms / 1000
+                   + output_tokens * self.args.output_token_ms / 1000)
+        latency *= self.rng.lognormvariate(-self.args.sigma ** 2 / 2, self.args.sigma)
+        await asyncio.sleep(latency * self.args.time_scale)
+        return SimpleNamespace(text=body, candidates=[])
+
+
+async def run(args, speculative: bool):
+    round_executor.Config.SPECULATIVE_DEFENSE = speculative
+    models = _StandInModels(args, random.Random(0))
+    llm_clients.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+
+    async def no_speech(text, agent):
+        return None
+    tts_service.generate_speech = no_speech
+
+    state = {
+        "case_id": f"bench-{speculative}", "current_round": 1, "trial_transcript": [],
+        "selected_claims": [{"text": "Unemployment fell to 3.9% in February 2024"}],
+        "prosecutor_revealed_evidence": [], "defendant_revealed_evidence": [],
+        "prosecutor_confidence": 50.0, "defendant_confidence": 50.0,
+    }
+    await blackboard.create_collection(state["case_id"])
+    await blackboard.store_evidence(state["case_id"], "investigator", {
+        "source_url": "https://example.com/report", "text": "Statistics office release, March 2024", "credibility_score": 9
+    })
+    latencies = []
+    mode = "speculative" if speculative else "serial"
+    waits_before = speculation_metrics.modes[mode]["defense_wait_seconds"]
+    for i in range(args.rounds):
+        state["current_round"] = i + 1
+        start = time.perf_counter()
+        async for event in run_round(state):
+            if event["phase"] == "trial" and event["agent"] == "defendant":
+                latencies.append((time.perf_counter() - start) / args.time_scale)
+    wait = (speculation_metrics.modes[mode]["defense_wait_seconds"] - waits_before) / args.rounds / args.time_scale
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95) - 1], wait, models.tokens / args.rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--ttft", type=float, default=0.6, help="seconds to first token")
+    parser.add_argument("--prompt-token-ms", type=float, default=0.5, help="ms per prompt token")
+    parser.add_argument("--output-token-ms", type=float, default=12.0, help="ms per output token")
+    parser.add_argument("--sigma", type=float, default=0.3)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="real seconds per simulated second")
+    args = parser.parse_args()
+
+    real_stdout = sys.stdout
+    rows = []
+    for label, speculative in (("serial", False), ("speculative", True)):
+        sys.stdout = open(os.devnull, "w")
+        try:
+            rows.append((label, *asyncio.run(run(args, speculative))))
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+
+    print(f"{'mode':<12} {'round p50':>10} {'round p95':>10} {'defense wait':>13} {'tokens/round':>13}   (simulated seconds)")
+    for label, p50, p95, wait, tokens in rows:
+        print(f"{label:<12} {p50:>9.2f}s {p95:>9.2f}s {wait:>12.2f}s {tokens:>13.0f}")
+    (_, s50, _, swait, stokens), (_, p50, _, pwait, ptokens) = rows
+    print(f"\nspeculation saves {swait - pwait:.2f}s of defense wait per round "
+          f"for {ptokens - stokens:+.0f} tokens ({(ptokens / stokens - 1) * 100:+.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Bulk fact-checking: many items through the fast-track pipeline at once.
+
+The body is NDJSON or one JSON array of items, each `{"id": ...,
+"content": ..., "input_type": "text" | "url"}` or a bare string; a missing id
+defaults to the item's position. At most `concurrency` items run at a time
+and items are parsed only as slots free up. Results come back in completion
+order, one JSON object per item, followed by a summary. A bad item yields an
+error result; it never fails the batch.
+
+Bulk items run their LLM calls at BACKGROUND priority so a batch never
+queues ahead of interactive trials, and share claim extraction and verdict
+prompts with other items in flight (Config.PROMPT_BATCH_SIZE per prompt).
+"""
+import asyncio
+import json
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Union
+from config.settings import Config
+from fasttrack_pipeline import run_fasttrack
+from utils.blackboard import blackboard
+from utils.llm_scheduler import Priority, priority_floor
+from utils.prompt_batcher import batching_enabled
+from workflow import create_initial_state
+
+INPUT_TYPES = ("text", "url")
+
+
+class BulkInputError(ValueError):
+    """The request body is not NDJSON or a JSON array of items"""
+
+
+def normalize_item(index: int, raw: Any) -> Dict:
+    """Turn one raw item into {"id", "content", "input_type"}; raises ValueError"""
+    if isinstance(raw, str):
+        raw = {"content": raw}
+    if not isinstance(raw, dict):
+        raise ValueError("item must be an object or a string")
+    content = raw.get("content")
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError("content must be a non-empty string")
+    if len(content) > Config.BULK_MAX_CONTENT_CHARS:
+        raise ValueError(f"content exceeds {Config.BULK_MAX_CONTENT_CHARS} characters")
+    input_type = raw.get("input_type", "text")
+    if input_type not in INPUT_TYPES:
+        raise ValueError(f"input_type must be one of {', '.join(INPUT_TYPES)}")
+    return {"id": raw.get("id", index), "content": content, "input_type": input_type}
+
+
+def _item_id(index: int, raw: Any):
+    return raw.get("id", index) if isinstance(raw, dict) else index
+
+
+async def _items(raws: AsyncIterator[Union[Any, Exception]]) -> AsyncIterator[Dict]:
+    """Number, validate and cap raw items; invalid ones become error results"""
+    index = 0
+    async for raw in raws:
+        if index >= Config.BULK_MAX_ITEMS:
+            yield {"id": index, "status": "error", "error": f"batch exceeds {Config.BULK_MAX_ITEMS} items; the rest were skipped"}
+            return
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            yield normalize_item(index, raw)
+        except ValueError as e:
+            yield {"id": _item_id(index, raw), "status": "error", "error": str(e)}
+        index += 1
+
+
+def parse_ndjson(body: bytes) -> AsyncIterator[Dict]:
+    """Items of an NDJSON body; blank lines are skipped, bad lines become error results"""
+    async def raws():
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"invalid JSON line: {e}")
+    return _items(raws())
+
+
+def parse_json_array(body: bytes) -> AsyncIterator[Dict]:
+    """Items of a JSON array body (also accepts {"items": [...]}); raises BulkInputError"""
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        raise BulkInputError(f"invalid JSON: {e}")
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise BulkInputError("body must be a JSON array of items")
+
+    async def raws():
+        for value in data:
+            yield value
+    return _items(raws())
+
+
+async def check_item(item: Dict) -> Dict:
+    """Fact-check one item through the fast-track pipeline"""
+    # Set inside the item's own task, so they only affect this item's calls
+    priority_floor.set(Priority.BACKGROUND)
+    batching_enabled.set(True)
+    state = create_initial_state(item["content"], item["input_type"])
+    state["mode"] = "fasttrack"
+    start = time.perf_counter()
+    try:
+        async with asyncio.timeout(Config.BULK_ITEM_TIMEOUT):
+            async with aclosing(run_fasttrack(state)) as events:
+                async for _ in events:
+                    pass
+        return {
+            "id": item["id"],
+            "status": "ok",
+            "verdict": state.get("aggregated_verdict"),
+            "claims": [c["text"] for c in state.get("selected_claims", [])],
+            "elapsed_ms": round((time.perf_counter() - start) * 1000),
+        }
+    except TimeoutError:
+        return {"id": item["id"], "status": "error", "error": f"timed out after {Config.BULK_ITEM_TIMEOUT}s"}
+    except Exception as e:
+        print(f"[BULK] Item {item['id']} failed: {e}")
+        return {"id": item["id"], "status": "error", "error": str(e)}
+    finally:
+        await blackboard.delete_collection(state["case_id"])
+
+
+async def run_bulk(items: AsyncIterator[Dict], concurrency: int) -> AsyncIterator[Dict]:
+    """Check `items` with at most `concurrency` in flight, yielding results as they complete.
+
+    Ends with {"summary": {...}}. Closing the generator cancels the work
+    still running.
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(concurrency)
+    running = set()
+
+    async def check(item):
+        try:
+            await results.put(await check_item(item))
+        finally:
+            slots.release()
+
+    async def feed():
+        try:
+            async for item in items:
+                if item.get("status") == "error":
+                    await results.put(item)
+                    continue
+                # Wait for a free slot before taking the next item
+                await slots.acquire()
+                task = asyncio.create_task(check(item))
+                running.add(task)
+                task.add_done_callback(running.discard)
+        except Exception as e:
+            print(f"[BULK] Reading items failed: {e}")
+            await results.put({"id": None, "status": "error", "error": f"reading items failed: {e}"})
+        while running:
+            await asyncio.gather(*running)
+        await results.put(None)
+
+    feeder = asyncio.create_task(feed())
+    start = time.perf_counter()
+    counts = {"ok": 0, "error": 0}
+    try:
+        while (result := await results.get()) is not None:
+            counts[result["status"]] += 1
+            yield result
+    finally:
+        feeder.cancel()
+        for task in list(running):
+            task.cancel()
+        await asyncio.gather(feeder, *running, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    print(f"[BULK] {counts['ok']} ok, {counts['error']} failed in {elapsed:.1f}s")
+    yield {"summary": {
+        "items": counts["ok"] + counts["error"], **counts,
+        "elapsed_ms": round(elapsed * 1000),
+    }}
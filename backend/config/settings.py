@@ -20,3 +20,139 @@ class Config:
     PORT = int(os.getenv("PORT", 8000))
     FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
     MAX_ROUNDS = 2
+
+    # LLM admission control: per-provider concurrency, requests/min and tokens/min
+    LLM_PROVIDER_LIMITS = {
+        "gemini": {
+            "max_concurrency": int(os.getenv("GEMINI_MAX_CONCURRENCY", 8)),
+            "rpm": float(os.getenv("GEMINI_RPM", 60)),
+            "tpm": float(os.getenv("GEMINI_TPM", 1000000)),
+        },
+        "groq": {
+            "max_concurrency": int(os.getenv("GROQ_MAX_CONCURRENCY", 4)),
+            "rpm": float(os.getenv("GROQ_RPM", 30)),
+            "tpm": float(os.getenv("GROQ_TPM", 6000)),
+        },
+        "anthropic": {
+            "max_concurrency": int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", 4)),
+            "rpm": float(os.getenv("ANTHROPIC_RPM", 50)),
+            "tpm": float(os.getenv("ANTHROPIC_TPM", 40000)),
+        },
+        "openai": {
+            "max_concurrency": int(os.getenv("OPENAI_MAX_CONCURRENCY", 4)),
+            "rpm": float(os.getenv("OPENAI_RPM", 500)),
+            "tpm": float(os.getenv("OPENAI_TPM", 30000)),
+        },
+        "together": {
+            "max_concurrency": int(os.getenv("TOGETHER_MAX_CONCURRENCY", 4)),
+            "rpm": float(os.getenv("TOGETHER_RPM", 60)),
+            "tpm": float(os.getenv("TOGETHER_TPM", 60000)),
+        },
+    }
+    LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", 2))
+    LLM_RATE_LIMIT_BACKOFF = float(os.getenv("LLM_RATE_LIMIT_BACKOFF", 2.0))
+
+    # Response cache for deterministic LLM stages (memory LRU + SQLite on disk)
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "/tmp/unreliable_narrator_llm_cache.sqlite3")
+    RESPONSE_CACHE_MEMORY_ENTRIES = int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", 1024))
+    RESPONSE_CACHE_MEMORY_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MEMORY_MAX_BYTES", 32 * 1024 * 1024))
+    RESPONSE_CACHE_DISK_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024))
+    # Seconds to keep responses per stage; stages not listed are never cached
+    RESPONSE_CACHE_STAGE_TTLS = {
+        "url_content": 24 * 3600,
+        "claim_extractor": 24 * 3600,
+        "investigator": 6 * 3600,
+        "fasttrack_verdict": 6 * 3600,
+        "education": 24 * 3600,
+        # Batched-prompt items (see LLMClients.cached_batch_item)
+        "claim_extractor_batched": 24 * 3600,
+        "fasttrack_verdict_batched": 6 * 3600,
+    }
+
+    # Claim index: reuse investigator evidence for recently seen (near-duplicate) claims
+    CLAIM_INDEX_ENABLED = os.getenv("CLAIM_INDEX_ENABLED", "true").lower() == "true"
+    CLAIM_INDEX_PATH = os.getenv("CLAIM_INDEX_PATH", "/tmp/unreliable_narrator_claim_index.sqlite3")
+    CLAIM_INDEX_FRESHNESS_SECONDS = int(os.getenv("CLAIM_INDEX_FRESHNESS_SECONDS", 6 * 3600))
+    CLAIM_INDEX_SIMILARITY = float(os.getenv("CLAIM_INDEX_SIMILARITY", 0.8))
+
+    # Trial state store: "memory" (single worker) or "sqlite" (shared across workers)
+    TRIAL_STORE_BACKEND = os.getenv("TRIAL_STORE_BACKEND", "memory").lower()
+    TRIAL_STORE_PATH = os.getenv("TRIAL_STORE_PATH", "/tmp/unreliable_narrator_trials.sqlite3")
+    TRIAL_TTL_SECONDS = int(os.getenv("TRIAL_TTL_SECONDS", 2 * 3600))
+    TRIAL_STORE_SWEEP_INTERVAL = int(os.getenv("TRIAL_STORE_SWEEP_INTERVAL", 60))
+    WORKERS = int(os.getenv("WORKERS", 1))
+    # A trial's run lease expires unless renewed within this many seconds (crashed workers)
+    STREAM_LEASE_SECONDS = float(os.getenv("STREAM_LEASE_SECONDS", 30))
+    # SSE: comment heartbeats on idle streams, client reconnect delay
+    SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+    SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", 3000))
+    # LangGraph checkpoints of courtroom trials (shared by workers on the host)
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "/tmp/unreliable_narrator_checkpoints.sqlite3")
+
+    # In-process blackboard (per-case evidence) bounds
+    BLACKBOARD_COLLECTION_TTL_SECONDS = int(os.getenv("BLACKBOARD_COLLECTION_TTL_SECONDS", 3600))
+    BLACKBOARD_MAX_BYTES = int(os.getenv("BLACKBOARD_MAX_BYTES", 64 * 1024 * 1024))
+    BLACKBOARD_SWEEP_INTERVAL = int(os.getenv("BLACKBOARD_SWEEP_INTERVAL", 60))
+    # Add hashed-embedding cosine similarity to BM25 when ranking blackboard queries
+    BLACKBOARD_DENSE_RETRIEVAL = os.getenv("BLACKBOARD_DENSE_RETRIEVAL", "false").lower() == "true"
+    BLACKBOARD_EMBEDDING_DIM = int(os.getenv("BLACKBOARD_EMBEDDING_DIM", 256))
+
+    # Shared outbound HTTP pool (web search, TTS)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 30.0))
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+    # Investigator: one grounded search per claim (streamed as each lands) instead of one for all claims
+    INVESTIGATOR_PER_CLAIM = os.getenv("INVESTIGATOR_PER_CLAIM", "true").lower() == "true"
+    INVESTIGATOR_CLAIM_CONCURRENCY = int(os.getenv("INVESTIGATOR_CLAIM_CONCURRENCY", 3))
+    # Fast-track: share of claims with evidence needed to start the verdict
+    FASTTRACK_VERDICT_QUORUM = float(os.getenv("FASTTRACK_VERDICT_QUORUM", 0.6))
+    # Bulk fact-check API: items in flight, per-request caps, per-item deadline.
+    # Keep concurrency a few times PROMPT_BATCH_SIZE so batches fill
+    BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", 32))
+    BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 5000))
+    BULK_MAX_BODY_BYTES = int(os.getenv("BULK_MAX_BODY_BYTES", 10 * 1024 * 1024))
+    BULK_MAX_CONTENT_CHARS = int(os.getenv("BULK_MAX_CONTENT_CHARS", 20000))
+    BULK_ITEM_TIMEOUT = float(os.getenv("BULK_ITEM_TIMEOUT", 120.0))
+    # Batched prompting in bulk runs: up to K items per claim extraction/verdict prompt
+    # (1 disables), sent when full or this many seconds after the first item; longer
+    # texts are extracted on their own
+    PROMPT_BATCH_SIZE = int(os.getenv("PROMPT_BATCH_SIZE", 8))
+    PROMPT_BATCH_MAX_WAIT = float(os.getenv("PROMPT_BATCH_MAX_WAIT", 1.0))
+    PROMPT_BATCH_ITEM_MAX_CHARS = int(os.getenv("PROMPT_BATCH_ITEM_MAX_CHARS", 2000))
+
+    # Speculative defense: draft the rebuttal while the prosecutor speaks, then refine it.
+    # Fallback when the draft/refinement fails: "serial" (strict defendant turn) or "draft" (unrefined)
+    SPECULATIVE_DEFENSE = os.getenv("SPECULATIVE_DEFENSE", "false").lower() == "true"
+    SPECULATIVE_DEFENSE_FALLBACK = os.getenv("SPECULATIVE_DEFENSE_FALLBACK", "serial")
+    SPECULATIVE_REFINE_TIMEOUT = float(os.getenv("SPECULATIVE_REFINE_TIMEOUT", 20.0))
+
+    # Stream prosecutor/defendant arguments to the client as trial_delta events
+    STREAM_ARGUMENTS = os.getenv("STREAM_ARGUMENTS", "true").lower() == "true"
+
+    # File uploads (streamed to disk, stored by SHA-256)
+    UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/tmp/unreliable_narrator_uploads")
+    MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 500 * 1024 * 1024))
+    # Gemini File API uploads are reused across cases; unreferenced ones are deleted after this idle time
+    REMOTE_FILE_IDLE_SECONDS = int(os.getenv("REMOTE_FILE_IDLE_SECONDS", 3600))
+    # Stop reusing a remote file this long before Gemini expires it (48 h after upload)
+    REMOTE_FILE_EXPIRY_MARGIN_SECONDS = int(os.getenv("REMOTE_FILE_EXPIRY_MARGIN_SECONDS", 600))
+    REMOTE_FILE_JANITOR_INTERVAL = int(os.getenv("REMOTE_FILE_JANITOR_INTERVAL", 300))
+    # Waiting for Gemini file processing: exponential backoff with jitter, batched status checks
+    FILE_POLL_INITIAL_DELAY = float(os.getenv("FILE_POLL_INITIAL_DELAY", 0.5))
+    FILE_POLL_MAX_DELAY = float(os.getenv("FILE_POLL_MAX_DELAY", 8.0))
+    FILE_PROCESSING_DEADLINE = float(os.getenv("FILE_PROCESSING_DEADLINE", 600))
+    FILE_POLL_BATCH_MIN = int(os.getenv("FILE_POLL_BATCH_MIN", 3))
+
+    # Text-to-speech
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "/tmp/unreliable_narrator_tts_cache")
+    # Synthesize arguments sentence by sentence and stream audio progressively
+    TTS_CHUNKED = os.getenv("TTS_CHUNKED", "true").lower() == "true"
+    TTS_CHUNK_CONCURRENCY = int(os.getenv("TTS_CHUNK_CONCURRENCY", 3))
+    TTS_CHUNK_MIN_CHARS = int(os.getenv("TTS_CHUNK_MIN_CHARS", 40))
+    TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    TTS_CACHE_MAX_AGE_SECONDS = int(os.getenv("TTS_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600))
+    TTS_CACHE_SWEEP_INTERVAL = int(os.getenv("TTS_CACHE_SWEEP_INTERVAL", 600))
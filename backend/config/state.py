@@ -5,6 +5,8 @@ class TrialState(TypedDict):
     case_id: str
     input_type: str  # "url", "text", "image", "social_post"
     raw_input: str
+    mode: str  # "courtroom" or "fasttrack"
+    content_hash: Optional[str]  # SHA-256 of uploaded files (keys cached claim extraction)
     
     # Claim extraction
     claims: List[Dict]  # [{text, category, verifiability_score, priority}]
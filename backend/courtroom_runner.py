@@ -0,0 +1,138 @@
+"""
+Runs courtroom trials through the LangGraph trial graph (workflow.py).
+
+Every step is checkpointed to SQLite, keyed by case_id. A round ends at the
+graph's user_judgment interrupt, and the run suspends there after an
+`awaiting_judgment` event, so an idle user holds no coroutine or state.
+The next run (trial_runner starts one when the judgment is posted) resumes
+with Command(resume=...), on any worker sharing the checkpoint file. A
+judgment not posted within JUDGMENT_TIMEOUT counts as "neutral"; trial_runner
+starts that run when the timeout expires. Runs that die mid-round resume
+from the last checkpoint too.
+"""
+import asyncio
+import time
+import aiosqlite
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.types import Command
+from config.settings import Config
+from config.state import TrialState
+from utils.blackboard import blackboard
+from utils.trial_store import trial_store
+from workflow import cancel_jury_notes, create_trial_graph, restore_blackboard
+
+JUDGMENT_TIMEOUT = 300.0
+
+
+class CourtroomRunner:
+    def __init__(self, path: str):
+        self.path = path
+        self.graph = None
+        self.checkpointer: Optional[AsyncSqliteSaver] = None
+        self._conn = None
+
+    async def start(self):
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = await aiosqlite.connect(self.path)
+        self.checkpointer = AsyncSqliteSaver(self._conn)
+        await self.checkpointer.setup()
+        self.graph = create_trial_graph(self.checkpointer)
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _config(case_id: str) -> Dict:
+        return {"configurable": {"thread_id": case_id}}
+
+    async def _take_judgment(self, case_id: str, snapshot) -> Optional[str]:
+        """The judgment posted for the pending checkpoint, without waiting"""
+        current_round = snapshot.values["current_round"]
+        judgement = await trial_store.pop_judgment(case_id, timeout=0)
+        if judgement is not None:
+            print(f"[JUDGMENT] Received for round {current_round}: {judgement}")
+            return judgement
+        paused_at = datetime.fromisoformat(snapshot.created_at).timestamp()
+        if time.time() - paused_at > JUDGMENT_TIMEOUT:
+            print(f"[JUDGMENT] Timeout waiting for judgment in round {current_round}, using 'neutral'")
+            return "neutral"
+        return None
+
+    async def run(self, state: TrialState) -> AsyncIterator[Dict]:
+        """Run or resume the trial for `state["case_id"]`, yielding SSE payloads.
+
+        Ends after `complete`, or suspended after `awaiting_judgment`. A
+        trial still waiting for its judgment yields nothing. `state` is only
+        used to start a new trial; an existing checkpoint always wins.
+        """
+        case_id = state["case_id"]
+        config = self._config(case_id)
+        snapshot = await self.graph.aget_state(config)
+
+        if not snapshot.values:
+            graph_input = state
+        elif not snapshot.next:
+            yield {'phase': 'complete', 'status': 'finished'}
+            return
+        else:
+            graph_input = None
+            if snapshot.interrupts:
+                judgement = await self._take_judgment(case_id, snapshot)
+                if judgement is None:
+                    # Still waiting for the user: stay suspended
+                    return
+                graph_input = Command(resume=judgement)
+            print(f"[COURTROOM] Resuming case {case_id} at {', '.join(snapshot.next)}")
+            if not blackboard.has_collection(case_id):
+                await restore_blackboard(snapshot.values)
+
+        # durability="sync": a step is on disk before the next one starts,
+        # so a dropped stream never loses finished work
+        prompted = False
+        async for mode, chunk in self.graph.astream(graph_input, config, stream_mode=["custom", "updates"],
+                                                    durability="sync"):
+            if mode == "custom":
+                yield chunk
+            elif "__interrupt__" in chunk and not prompted:
+                # Prompt the user as soon as the interrupt is raised, not when the step ends
+                prompted = True
+                yield chunk["__interrupt__"][0].value
+
+        snapshot = await self.graph.aget_state(config)
+        await trial_store.save_state(case_id, snapshot.values)
+        if snapshot.next:
+            print(f"[COURTROOM] Case {case_id} suspended for judgment in round {snapshot.values['current_round']}")
+            if not prompted:
+                yield snapshot.interrupts[0].value
+            return
+        yield {'phase': 'complete', 'status': 'finished'}
+
+    async def sweep(self) -> int:
+        """Delete checkpoints of trials the trial store no longer has"""
+        async with self._conn.execute("SELECT DISTINCT thread_id FROM checkpoints") as cursor:
+            thread_ids = [row[0] for row in await cursor.fetchall()]
+        removed = 0
+        for thread_id in thread_ids:
+            if await trial_store.get(thread_id) is None:
+                cancel_jury_notes(thread_id)
+                await self.checkpointer.adelete_thread(thread_id)
+                removed += 1
+        return removed
+
+    async def run_sweeper(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.sweep()
+                if removed:
+                    print(f"[COURTROOM] Deleted checkpoints of {removed} expired trials")
+            except Exception as e:
+                print(f"[COURTROOM] Checkpoint sweep failed: {e}")
+
+
+courtroom_runner = CourtroomRunner(Config.CHECKPOINT_PATH)
@@ -0,0 +1,41 @@
+"""
+Fast-track pipeline as a small DAG.
+
+    claim_extractor -> claim_triage -> { video forensics, search(claim 1..n) } -> verdict
+
+Forensics and the web searches are independent and run concurrently
+(investigator.investigate, as in the courtroom). With per-claim searches
+the verdict starts as soon as forensics is done and
+Config.FASTTRACK_VERDICT_QUORUM of the claims have evidence; searches
+still running then are cancelled.
+"""
+from contextlib import aclosing
+from typing import AsyncIterator, Dict
+from config.settings import Config
+from config.state import TrialState
+from agents.claim_extractor import claim_extractor
+from agents.claim_triage import claim_triage
+from agents.investigator import investigate
+from agents.fasttrack_verdict import fasttrack_verdict
+
+
+async def run_fasttrack(state: TrialState) -> AsyncIterator[Dict]:
+    """Run the fast-track pipeline, yielding SSE payloads.
+
+    `state` is updated in place and holds the verdict once the generator is
+    exhausted.
+    """
+    yield {'phase': 'claim_extraction', 'status': 'running'}
+    await claim_extractor(state)
+
+    yield {'phase': 'claim_triage', 'status': 'running'}
+    await claim_triage(state)
+
+    yield {'phase': 'investigation', 'status': 'running'}
+    async with aclosing(investigate(state, quorum=Config.FASTTRACK_VERDICT_QUORUM)) as events:
+        async for event in events:
+            yield event
+
+    yield {'phase': 'fasttrack', 'status': 'analyzing'}
+    await fasttrack_verdict(state)
+    yield {'phase': 'verdict', 'verdict': state.get('aggregated_verdict')}
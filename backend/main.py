@@ -1,17 +1,54 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse, FileResponse, Response
 from pydantic import BaseModel
 from typing import Optional
+from contextlib import asynccontextmanager, aclosing
 import json
 import asyncio
 import os
+import re
 from pathlib import Path
-from workflow import trial_graph, create_initial_state
+from workflow import create_initial_state
+from courtroom_runner import courtroom_runner
+from round_executor import speculation_metrics
+from trial_runner import ensure_running, is_running, cancel_all
+from bulk_factcheck import BulkInputError, parse_ndjson, parse_json_array, run_bulk
+from agents.claim_extractor import extraction_batcher
+from agents.fasttrack_verdict import verdict_batcher
 from config.settings import Config
 from utils.tts_service import tts_service
+from utils.llm_clients import llm_clients
+from utils.claim_index import claim_index
+from utils.trial_store import trial_store
+from utils.event_log import event_log
+from utils.blackboard import blackboard
+from utils.http_pool import http_pool
+from utils.uploads import upload_store, UploadError, UploadTooLarge
+from python_multipart.exceptions import MultipartParseError
 
-app = FastAPI(title="Unreliable Narrator API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Periodically evict expired trials so memory/disk does not grow with every case
+    sweepers = [
+        asyncio.create_task(trial_store.run_sweeper(Config.TRIAL_STORE_SWEEP_INTERVAL)),
+        asyncio.create_task(blackboard.run_sweeper(Config.BLACKBOARD_SWEEP_INTERVAL)),
+        asyncio.create_task(tts_service.cache.run_sweeper(Config.TTS_CACHE_SWEEP_INTERVAL)),
+        asyncio.create_task(llm_clients.files.run_janitor(Config.REMOTE_FILE_JANITOR_INTERVAL)),
+    ]
+    # One pooled, keep-alive HTTP client for outbound search/TTS calls
+    await http_pool.start()
+    await courtroom_runner.start()
+    sweepers.append(asyncio.create_task(courtroom_runner.run_sweeper(Config.TRIAL_STORE_SWEEP_INTERVAL)))
+    sweepers.append(asyncio.create_task(event_log.run_sweeper(Config.TRIAL_STORE_SWEEP_INTERVAL)))
+    yield
+    for sweeper in sweepers:
+        sweeper.cancel()
+    await cancel_all()
+    await http_pool.close()
+    await courtroom_runner.close()
+
+app = FastAPI(title="Unreliable Narrator API", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -36,10 +73,9 @@ class JudgementInput(BaseModel):
     case_id: str
     judgement: str  # "plausible", "misleading", "not sure", "neutral"
 
-# Store active trials in memory (for demo purposes)
-active_trials = {}
-# Store judgment queues for synchronization
-judgment_queues = {}  # case_id -> asyncio.Queue
+class ClaimIndexInvalidation(BaseModel):
+    claim: Optional[str] = None  # drop this claim and its near-duplicates
+    older_than_seconds: Optional[int] = None  # drop entries with evidence older than this
 
 @app.get("/")
 async def root():
@@ -52,67 +88,142 @@ async def start_trial(trial_input: TrialInput):
         state = create_initial_state(trial_input.content, trial_input.input_type)
         state["mode"] = trial_input.mode
         case_id = state["case_id"]
-        active_trials[case_id] = {"state": state, "status": "started", "streaming": False}
-        judgment_queues[case_id] = asyncio.Queue()  # Initialize judgment queue
+        await trial_store.create(case_id, {"state": state, "status": "started", "streaming": False})
         return {"case_id": case_id, "status": "started", "message": "Trial initialized", "mode": trial_input.mode}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/trial/start-with-file")
-async def start_trial_with_file(
-    input_type: str = Form(...),
-    mode: str = Form("courtroom"),
-    file: UploadFile = File(...)
-):
-    """Start trial with uploaded file (video)"""
+async def start_trial_with_file(request: Request):
+    """Start trial with uploaded file (video/image).
+
+    Expects multipart fields input_type, mode and file. The file is streamed
+    to disk and stored by content hash, so re-uploading the same file reuses
+    it along with its cached claim extraction.
+    """
+    if upload_store.rejects_length(request.headers.get("content-length")):
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {upload_store.max_bytes} bytes")
     try:
-        # Create uploads directory if it doesn't exist
-        upload_dir = "/tmp/unreliable_narrator_uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Save uploaded file with unique name
-        import uuid
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(upload_dir, unique_filename)
-        
-        print(f"[FILE UPLOAD] Saving {file.filename} to {file_path}")
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        print(f"[FILE UPLOAD] Saved {len(content)} bytes")
-        
-        # Create initial state with file path
-        state = create_initial_state(file_path, input_type)
+        fields, upload = await upload_store.receive(request.stream(), request.headers.get("content-type"))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (UploadError, MultipartParseError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    input_type = fields.get("input_type")
+    if not input_type:
+        raise HTTPException(status_code=422, detail="input_type is required")
+    mode = fields.get("mode", "courtroom")
+    print(f"[FILE UPLOAD] {upload['filename']}: {upload['size']} bytes -> {upload['path']}"
+          f"{' (deduplicated)' if upload['deduplicated'] else ''}")
+
+    try:
+        state = create_initial_state(upload["path"], input_type)
         state["mode"] = mode
+        state["content_hash"] = upload["sha256"]
         case_id = state["case_id"]
-        active_trials[case_id] = {"state": state, "status": "started", "streaming": False, "uploaded_file": file_path}
-        judgment_queues[case_id] = asyncio.Queue()  # Initialize judgment queue
-        
+        await trial_store.create(case_id, {"state": state, "status": "started", "streaming": False, "uploaded_file": upload["path"]})
+
         return {"case_id": case_id, "status": "started", "message": "Trial initialized with uploaded file", "mode": mode}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/factcheck/bulk")
+async def bulk_factcheck(request: Request):
+    """Fact-check many items through the fast-track pipeline.
+
+    Body: NDJSON (application/x-ndjson) or a JSON array (application/json)
+    of {"id", "content", "input_type"} items.
+    Responds with NDJSON: one result per item as it completes, then a
+    summary line.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        parse = parse_ndjson
+    elif content_type == "application/json":
+        parse = parse_json_array
+    else:
+        raise HTTPException(status_code=415, detail="Send application/x-ndjson or a JSON array")
+
+    # Read in full before responding: a streaming response listens for
+    # client disconnects on the same channel the body arrives on
+    too_large = HTTPException(status_code=413, detail=f"Body exceeds {Config.BULK_MAX_BODY_BYTES} bytes")
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > Config.BULK_MAX_BODY_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > Config.BULK_MAX_BODY_BYTES:
+            raise too_large
+    try:
+        items = parse(bytes(body))
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def result_lines():
+        async with aclosing(run_bulk(items, Config.BULK_CONCURRENCY)) as results:
+            async for result in results:
+                yield json.dumps(result) + "\n"
+
+    return StreamingResponse(
+        result_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/trial/{case_id}/audio/stream/{key}")
+async def stream_audio(case_id: str, key: str):
+    """Stream chunked TTS audio, starting as soon as the first sentence is ready"""
+    if not re.fullmatch(r"[0-9a-f]{32}", key):
+        raise HTTPException(status_code=400, detail="Invalid audio key")
+    if not await tts_service.has_chunked_speech(key):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return StreamingResponse(
+        tts_service.iter_chunked_audio(key),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+# TTS audio files are named by content hash
+AUDIO_FILENAME = re.compile(r"^([0-9a-f]{32})\.mp3$")
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
 @app.get("/api/trial/{case_id}/audio/{filename}")
-async def serve_audio(case_id: str, filename: str):
-    """Serve TTS audio files"""
+async def serve_audio(case_id: str, filename: str, request: Request):
+    """Serve TTS audio files.
+
+    The filename is a content hash, so it doubles as a strong ETag and the
+    response is immutable. Conditional GETs get 304, and Range requests
+    (seeking) get 206 from FileResponse, which uses zero-copy pathsend when
+    the ASGI server supports it.
+    """
     try:
-        # Security: validate filename to prevent directory traversal
-        if ".." in filename or "/" in filename:
+        # Security: only accept content-hash filenames (no directory traversal)
+        match = AUDIO_FILENAME.match(filename)
+        if not match:
             raise HTTPException(status_code=400, detail="Invalid filename")
         
-        cache_dir = Path("/tmp/unreliable_narrator_tts_cache")
-        file_path = cache_dir / filename
+        headers = {
+            "ETag": f'"{match.group(1)}"',
+            "Cache-Control": "public, max-age=31536000, immutable"
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
         
-        if not file_path.exists():
+        # Also bumps the file's recency for cache eviction
+        file_path = await tts_service.cache.touch(filename)
+        if file_path is None:
             raise HTTPException(status_code=404, detail="Audio file not found")
         
-        return FileResponse(
-            str(file_path),
-            media_type="audio/mpeg",
-            headers={"Cache-Control": "public, max-age=3600"}
-        )
+        return FileResponse(str(file_path), media_type="audio/mpeg", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -121,181 +232,69 @@ async def serve_audio(case_id: str, filename: str):
 
 
 @app.get("/api/trial/{case_id}/stream")
-async def stream_trial(case_id: str):
-    """Stream trial progress via SSE"""
-    if case_id not in active_trials:
+async def stream_trial(case_id: str, request: Request, last_event_id: Optional[str] = None):
+    """Stream trial progress via SSE.
+
+    Events come from the case's event log and carry increasing ids.
+    Reconnecting with Last-Event-ID (header, or the last_event_id query
+    parameter for a new EventSource) replays what was missed; without it
+    the whole trial replays. Any number of viewers may follow one case.
+    A courtroom stream ends at each judgment checkpoint (`awaiting_judgment`);
+    POST the judgment, then reconnect from that event's id.
+    """
+    record = await trial_store.get(case_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="Trial not found")
     
-    if active_trials[case_id].get("streaming"):
-        raise HTTPException(status_code=409, detail="Already streaming")
+    resume_from = request.headers.get("last-event-id") or last_event_id or "0"
+    try:
+        after_id = max(int(resume_from), 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be an event id")
     
-    active_trials[case_id]["streaming"] = True
+    # The trial runs in the background; this connection only follows its log
+    await ensure_running(case_id)
     
     async def event_generator():
-        try:
-            state = active_trials[case_id]["state"]
-            mode = state.get("mode", "courtroom")
-            
-            # Fast-track mode: skip courtroom simulation
-            if mode == "fasttrack":
-                from agents.claim_extractor import claim_extractor
-                from agents.claim_triage import claim_triage
-                from agents.investigator import investigator
-                from agents.fasttrack_verdict import fasttrack_verdict
-                
-                yield f"data: {json.dumps({'phase': 'claim_extraction', 'status': 'running'})}\n\n"
-                state = await claim_extractor(state)
-                
-                yield f"data: {json.dumps({'phase': 'claim_triage', 'status': 'running'})}\n\n"
-                state = await claim_triage(state)
-                
-                yield f"data: {json.dumps({'phase': 'investigation', 'status': 'running'})}\n\n"
-                state = await investigator(state)
-                
-                yield f"data: {json.dumps({'phase': 'fasttrack', 'status': 'analyzing'})}\n\n"
-                result_state = await fasttrack_verdict(state)
-                verdict = result_state.get('aggregated_verdict')
-                
-                yield f"data: {json.dumps({'phase': 'verdict', 'verdict': verdict})}\n\n"
-                yield f"data: {json.dumps({'phase': 'complete', 'status': 'finished'})}\n\n"
-                
-                active_trials[case_id]["state"] = result_state
-                return
-            
-            # Courtroom mode: manual round-by-round execution with judgment checkpoints
-            from agents.claim_extractor import claim_extractor
-            from agents.claim_triage import claim_triage
-            from agents.investigator import investigator
-            from agents.prosecutor import prosecutor_turn
-            from agents.defendant import defendant_turn
-            from agents.jury import jury_update
-            from agents.verdict import termination_check, verdict_aggregator, score_calculator
-            from agents.jury import jury_verdict
-            from agents.awareness_scorer import awareness_scorer
-            from agents.education import education_generator, report_generator
-            from utils.blackboard import blackboard
-            
-            # Setup
-            await blackboard.create_collection(state["case_id"])
-            
-            # Claim extraction
-            yield f"data: {json.dumps({'phase': 'claim_extraction', 'status': 'running'})}\n\n"
-            state = await claim_extractor(state)
-            yield f"data: {json.dumps({'phase': 'claim_extraction', 'claims': state.get('claims', [])})}\n\n"
-            
-            # Claim triage
-            state = await claim_triage(state)
-            
-            # Investigation
-            yield f"data: {json.dumps({'phase': 'investigation', 'status': 'running'})}\n\n"
-            state = await investigator(state)
-            yield f"data: {json.dumps({'phase': 'investigation', 'evidence_count': len(state.get('investigator_evidence', []))})}\n\n"
-            
-            # Trial rounds loop
-            judgment_queue = judgment_queues.get(case_id)
-            if not judgment_queue:
-                raise RuntimeError(f"Judgment queue not found for case {case_id}")
-            
-            while not state.get("should_terminate", False):
-                current_round = state.get("current_round", 1)
-                
-                # Prosecutor turn
-                state = await prosecutor_turn(state)
-                transcript = state.get('trial_transcript', [])
-                if transcript:
-                    latest = transcript[-1]
-                    audio_path = await tts_service.generate_speech(latest['argument_text'], 'prosecutor')
-                    audio_url = tts_service.get_audio_url(audio_path, case_id) if audio_path else None
-                    yield f"data: {json.dumps({'phase': 'trial', 'agent': 'prosecutor', 'round': current_round, 'argument': latest['argument_text'], 'confidence': latest['confidence_score'], 'audio_url': audio_url})}\n\n"
-                
-                # Defendant turn
-                state = await defendant_turn(state)
-                transcript = state.get('trial_transcript', [])
-                if transcript:
-                    latest = transcript[-1]
-                    audio_path = await tts_service.generate_speech(latest['argument_text'], 'defendant')
-                    audio_url = tts_service.get_audio_url(audio_path, case_id) if audio_path else None
-                    yield f"data: {json.dumps({'phase': 'trial', 'agent': 'defendant', 'round': current_round, 'argument': latest['argument_text'], 'confidence': latest['confidence_score'], 'audio_url': audio_url})}\n\n"
-                
-                # CHECKPOINT: Wait for user judgment
-                yield f"data: {json.dumps({'phase': 'awaiting_judgment', 'round': current_round})}\n\n"
-                
-                try:
-                    # Wait for judgment with 5 minute timeout
-                    judgement = await asyncio.wait_for(judgment_queue.get(), timeout=300.0)
-                    print(f"[JUDGMENT] Received for round {current_round}: {judgement}")
-                except asyncio.TimeoutError:
-                    print(f"[JUDGMENT] Timeout waiting for judgment in round {current_round}, using 'neutral'")
-                    judgement = "neutral"
-                
-                # Store judgment in state
-                state["user_judgements"].append(judgement)
-                active_trials[case_id]["state"] = state
-                
-                # Check termination
-                state = termination_check(state)
-                
-                # If continuing, increment round
-                if not state.get("should_terminate", False):
-                    state["current_round"] += 1
-            
-            # Jury deliberation and verdict
-            yield f"data: {json.dumps({'phase': 'deliberation', 'status': 'jury_deliberating'})}\n\n"
-            state = await jury_verdict(state)
-            
-            state = verdict_aggregator(state)
-            verdict = state.get('aggregated_verdict')
-            yield f"data: {json.dumps({'phase': 'verdict', 'verdict': verdict})}\n\n"
-            
-            state = score_calculator(state)
-            
-            # Awareness scoring
-            state = await awareness_scorer(state)
-            awareness = state.get('awareness_score_result')
-            yield f"data: {json.dumps({'phase': 'awareness_score', 'awareness_score': awareness})}\n\n"
-            
-            # Education
-            state = await education_generator(state)
-            education = state.get('education_panel')
-            yield f"data: {json.dumps({'phase': 'education', 'education': education})}\n\n"
-            
-            state = await report_generator(state)
-            
-            # Cleanup
-            await blackboard.delete_collection(state["case_id"])
-            
-            active_trials[case_id]["state"] = state
-            yield f"data: {json.dumps({'phase': 'complete', 'status': 'finished'})}\n\n"
-        except Exception as e:
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
-        finally:
-            active_trials[case_id]["streaming"] = False
+        yield f"retry: {Config.SSE_RETRY_MS}\n\n"
+        async with aclosing(event_log.follow(case_id, after_id, lambda: is_running(case_id),
+                                             Config.SSE_HEARTBEAT_SECONDS)) as events:
+            async for item in events:
+                if item is None:
+                    # Comment line: keeps proxies from closing an idle stream
+                    yield ": heartbeat\n\n"
+                else:
+                    event_id, event = item
+                    yield f"id: {event_id}\ndata: {json.dumps(event)}\n\n"
     
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/api/trial/{case_id}/prediction")
 async def submit_prediction(case_id: str, prediction: PredictionInput):
     """Submit user prediction"""
-    if case_id not in active_trials:
+    record = await trial_store.get(case_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="Trial not found")
     
-    # Update state with prediction
-    active_trials[case_id]["state"]["user_prediction"] = {
+    # Stored on the record rather than in the state, so a stream running in
+    # another worker picks it up before scoring without clobbering its state
+    await trial_store.update(case_id, user_prediction={
         "verdict": prediction.verdict,
         "confidence": prediction.confidence
-    }
+    })
     
     return {"status": "prediction_recorded"}
 
 @app.post("/api/trial/{case_id}/judgement")
 async def submit_judgement(case_id: str, judgement: JudgementInput):
     """Submit user judgement for a round"""
-    if case_id not in active_trials:
+    if await trial_store.get(case_id) is None:
         raise HTTPException(status_code=404, detail="Trial not found")
     
-    if case_id not in judgment_queues:
-        raise HTTPException(status_code=404, detail="Judgment queue not found")
-    
     # Validate judgement
     valid_judgements = ["plausible", "misleading", "not sure", "neutral"]
     user_judgement = judgement.judgement.lower().strip()
@@ -304,19 +303,64 @@ async def submit_judgement(case_id: str, judgement: JudgementInput):
     if user_judgement not in valid_judgements:
         user_judgement = "neutral"
     
-    # Put judgment into the queue to signal streaming process
-    await judgment_queues[case_id].put(user_judgement)
+    # Queued for the suspended trial, which resumes now (or as soon as its
+    # current run ends)
+    await trial_store.push_judgment(case_id, user_judgement)
     print(f"[JUDGMENT] Queued judgment for case {case_id}: {user_judgement}")
+    await ensure_running(case_id)
     
     return {"status": "judgement_recorded", "judgement": user_judgement}
 
+@app.get("/api/metrics/llm")
+async def get_llm_metrics():
+    """LLM scheduler metrics (queue depth, in-flight, rate limiting) and response cache stats"""
+    return {"providers": llm_clients.scheduler.metrics(), "cache": llm_clients.cache.stats()}
+
+@app.get("/api/metrics/speculation")
+async def get_speculation_metrics():
+    """Speculative defense: per-round defense latency by mode, fallbacks and extra tokens"""
+    return speculation_metrics.stats()
+
+@app.get("/api/metrics/batching")
+async def batching_metrics():
+    """Batched prompting in bulk runs: batches sent, items per batch, items retried alone"""
+    return {"claim_extractor": extraction_batcher.stats(), "fasttrack_verdict": verdict_batcher.stats()}
+
+@app.get("/api/metrics/blackboard")
+async def get_blackboard_metrics():
+    """Blackboard collections, namespaces, items and approximate bytes held"""
+    return blackboard.stats()
+
+@app.get("/api/metrics/tts")
+async def get_tts_metrics():
+    """TTS cache hit ratio, coalesced requests, evictions and size"""
+    return tts_service.cache.stats()
+
+@app.get("/api/metrics/files")
+async def get_file_metrics():
+    """Gemini File API uploads: live files, reuse and deletions"""
+    return llm_clients.files.stats()
+
+@app.post("/api/claim-index/invalidate")
+async def invalidate_claim_index(request: ClaimIndexInvalidation):
+    """Invalidate reusable claim evidence by claim text and/or age"""
+    if request.claim is None and request.older_than_seconds is None:
+        raise HTTPException(status_code=400, detail="Provide claim and/or older_than_seconds")
+    removed = 0
+    if request.claim is not None:
+        removed += await asyncio.to_thread(claim_index.invalidate, request.claim)
+    if request.older_than_seconds is not None:
+        removed += await asyncio.to_thread(claim_index.invalidate_older_than, request.older_than_seconds)
+    return {"status": "invalidated", "removed": removed, "index": claim_index.stats()}
+
 @app.get("/api/trial/{case_id}/status")
 async def get_trial_status(case_id: str):
     """Get current trial status"""
-    if case_id not in active_trials:
+    record = await trial_store.get(case_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="Trial not found")
     
-    state = active_trials[case_id]["state"]
+    state = record["state"]
     
     return {
         "case_id": case_id,
@@ -329,4 +373,11 @@ async def get_trial_status(case_id: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=Config.PORT)
+    workers = Config.WORKERS
+    if workers > 1 and Config.TRIAL_STORE_BACKEND == "memory":
+        print("[SERVER] TRIAL_STORE_BACKEND=memory only supports one worker; set it to sqlite to scale out")
+        workers = 1
+    if workers > 1:
+        uvicorn.run("main:app", host="0.0.0.0", port=Config.PORT, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=Config.PORT)
@@ -0,0 +1,229 @@
+"""
+Pipelined courtroom round.
+
+TTS only needs the finished argument text, so the prosecutor's audio is
+synthesized while the defendant's LLM call is in flight. Arguments are
+streamed as soon as they exist (with audio_url None) and each audio URL
+follows in a `trial_audio` event, always in argument order.
+
+With Config.STREAM_ARGUMENTS the agents' LLM calls are streamed and the
+argument text is forwarded as `trial_delta` events before the complete
+`trial` event.
+
+With Config.SPECULATIVE_DEFENSE the defense drafts its rebuttal from the
+evidence while the prosecutor is speaking, and a short refinement call
+writes an opening that answers the prosecutor's actual argument. If the draft or refinement
+fails, Config.SPECULATIVE_DEFENSE_FALLBACK decides between the strict
+serial defendant turn ("serial") and the unrefined draft ("draft").
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Optional, Tuple
+from config.settings import Config
+from config.state import TrialState
+from agents.prosecutor import prosecutor_turn, build_prosecutor_prompt, record_prosecutor_argument
+from agents.defendant import (
+    defendant_turn, build_defendant_prompt, record_defendant_argument,
+    gather_draft_evidence, build_defendant_draft_prompt, build_defendant_refine_prompt,
+    parse_defendant_response, apply_refinement
+)
+from utils.llm_clients import llm_clients
+from utils.llm_scheduler import Priority
+from utils.json_stream import JSONStringFieldExtractor
+from utils.tts_service import tts_service
+
+
+def _tokens(text: str) -> int:
+    # Same ~4 characters per token estimate as the scheduler
+    return len(text) // 4
+
+
+class SpeculationMetrics:
+    """Per-round cost and benefit of speculative defense.
+
+    `defense_wait_seconds` is the critical-path time from the prosecutor's
+    argument to the defendant's. For speculative rounds, `extra_tokens`
+    estimates draft + refinement minus what a single serial call would have
+    cost (the draft plus the prosecutor's argument).
+    """
+
+    def __init__(self):
+        self.modes = {mode: {"rounds": 0, "defense_wait_seconds": 0.0} for mode in ("serial", "speculative")}
+        self.fallbacks = 0
+        self.draft_tokens = 0
+        self.refine_tokens = 0
+        self.extra_tokens = 0
+
+    def record(self, mode: str, wait_seconds: float):
+        self.modes[mode]["rounds"] += 1
+        self.modes[mode]["defense_wait_seconds"] += wait_seconds
+
+    def stats(self) -> Dict:
+        modes = {
+            mode: {
+                "rounds": m["rounds"],
+                "mean_defense_wait_seconds": round(m["defense_wait_seconds"] / m["rounds"], 3) if m["rounds"] else None,
+            }
+            for mode, m in self.modes.items()
+        }
+        speculative = self.modes["speculative"]["rounds"]
+        return {
+            "modes": modes,
+            "fallbacks": self.fallbacks,
+            "draft_tokens": self.draft_tokens,
+            "refine_tokens": self.refine_tokens,
+            "mean_extra_tokens_per_round": round(self.extra_tokens / speculative, 1) if speculative else None,
+        }
+
+
+speculation_metrics = SpeculationMetrics()
+
+
+def _trial_event(entry: Dict) -> Dict:
+    return {
+        'phase': 'trial',
+        'agent': entry['agent'],
+        'round': entry['round'],
+        'argument': entry['argument_text'],
+        'confidence': entry['confidence_score'],
+        'audio_url': None
+    }
+
+
+def _audio_event(entry: Dict, audio_url: Optional[str]) -> Dict:
+    return {'phase': 'trial_audio', 'agent': entry['agent'], 'round': entry['round'], 'audio_url': audio_url}
+
+
+async def _synthesize(entry: Dict, case_id: str) -> Optional[str]:
+    if Config.TTS_CHUNKED:
+        # Returns as soon as synthesis has started; the client streams sentence by sentence
+        key = await tts_service.start_chunked_speech(entry['argument_text'], entry['agent'])
+        return tts_service.get_stream_url(key, case_id)
+    audio_path = await tts_service.generate_speech(entry['argument_text'], entry['agent'])
+    return tts_service.get_audio_url(audio_path, case_id) if audio_path else None
+
+
+async def _agent_turn(agent: str, state: TrialState, events: asyncio.Queue):
+    """Run one agent turn, pushing `trial_delta` events when streaming is on"""
+    if not Config.STREAM_ARGUMENTS:
+        await (prosecutor_turn if agent == "prosecutor" else defendant_turn)(state)
+        return
+
+    build_prompt, record = (
+        (build_prosecutor_prompt, record_prosecutor_argument) if agent == "prosecutor"
+        else (build_defendant_prompt, record_defendant_argument)
+    )
+    prompt = await build_prompt(state)
+    argument = JSONStringFieldExtractor("argument")
+    chunks = []
+    try:
+        async for chunk in llm_clients.stream_gemini_pro(prompt, temperature=0.7, priority=Priority.INTERACTIVE):
+            chunks.append(chunk)
+            delta = argument.feed(chunk)
+            if delta:
+                events.put_nowait({'phase': 'trial_delta', 'agent': agent, 'round': state["current_round"], 'delta': delta})
+        response = "".join(chunks)
+    except Exception as e:
+        # The complete `trial` event that follows replaces any partial text on the client
+        print(f"[STREAM] {agent} stream failed mid-response: {e}, retrying without streaming")
+        response = await llm_clients.generate_gemini_pro(prompt, temperature=0.7, priority=Priority.INTERACTIVE)
+    # confidence_score and evidence_to_reveal are parsed from the complete response
+    await record(state, response)
+
+
+async def _draft_defense(state: TrialState, evidence: Dict) -> Tuple[str, str]:
+    """Draft the defense from evidence alone (runs alongside the prosecutor)"""
+    prompt = build_defendant_draft_prompt(state, evidence)
+    draft = await llm_clients.generate_gemini_pro(prompt, temperature=0.7, priority=Priority.INTERACTIVE)
+    if parse_defendant_response(draft) is None:
+        raise ValueError("draft is not a valid defense JSON")
+    return prompt, draft
+
+
+async def _speculative_defense(state: TrialState, draft_task: asyncio.Task, events: asyncio.Queue) -> str:
+    """Refine the draft against the prosecutor's argument; returns the mode actually used"""
+    draft = None
+    try:
+        draft_prompt, draft = await draft_task
+        refine_prompt = build_defendant_refine_prompt(state, draft)
+        refinement = await asyncio.wait_for(
+            llm_clients.generate_gemini_flash(refine_prompt, temperature=0.3, priority=Priority.INTERACTIVE),
+            Config.SPECULATIVE_REFINE_TIMEOUT
+        )
+        response = apply_refinement(draft, refinement)
+        if response is None:
+            raise ValueError("refinement is not a valid JSON opening")
+    except Exception as e:
+        speculation_metrics.fallbacks += 1
+        if draft is not None and Config.SPECULATIVE_DEFENSE_FALLBACK == "draft":
+            print(f"[SPECULATION] Refinement failed ({e}), using the unrefined draft")
+            await record_defendant_argument(state, draft)
+            return "speculative"
+        print(f"[SPECULATION] Speculative defense failed ({e}), falling back to the serial turn")
+        await _agent_turn("defendant", state, events)
+        return "serial"
+
+    draft_tokens = _tokens(draft_prompt) + _tokens(draft)
+    refine_tokens = _tokens(refine_prompt) + _tokens(refinement)
+    speculation_metrics.draft_tokens += draft_tokens
+    speculation_metrics.refine_tokens += refine_tokens
+    prosecutor_tokens = _tokens(state["trial_transcript"][-1]["argument_text"])
+    speculation_metrics.extra_tokens += refine_tokens - prosecutor_tokens
+    await record_defendant_argument(state, response)
+    return "speculative"
+
+
+async def run_round(state: TrialState) -> AsyncIterator[Dict]:
+    """Run one prosecutor/defendant round, yielding SSE payloads.
+
+    The agents update `state` in place, so it holds the finished round once
+    the generator is exhausted.
+    """
+    case_id = state["case_id"]
+    events = asyncio.Queue()
+    background_tasks = []
+
+    async def speak(entry: Dict, after: Optional[asyncio.Task] = None):
+        audio_url = await _synthesize(entry, case_id)
+        if after is not None:
+            # Keep playback order: never announce this audio before the previous one
+            await after
+        events.put_nowait(_audio_event(entry, audio_url))
+
+    async def pipeline():
+        try:
+            draft_task = None
+            if Config.SPECULATIVE_DEFENSE:
+                # Read now: the prosecutor's turn writes to the blackboard while the draft runs
+                evidence = await gather_draft_evidence(state)
+                draft_task = asyncio.create_task(_draft_defense(state, evidence))
+                background_tasks.append(draft_task)
+
+            await _agent_turn("prosecutor", state, events)
+            prosecutor_entry = state["trial_transcript"][-1]
+            events.put_nowait(_trial_event(prosecutor_entry))
+            prosecutor_audio = asyncio.create_task(speak(prosecutor_entry))
+            background_tasks.append(prosecutor_audio)
+
+            started = time.monotonic()
+            if draft_task is not None:
+                mode = await _speculative_defense(state, draft_task, events)
+            else:
+                await _agent_turn("defendant", state, events)
+                mode = "serial"
+            speculation_metrics.record(mode, time.monotonic() - started)
+            defendant_entry = state["trial_transcript"][-1]
+            events.put_nowait(_trial_event(defendant_entry))
+            await speak(defendant_entry, after=prosecutor_audio)
+        finally:
+            events.put_nowait(None)
+
+    runner = asyncio.create_task(pipeline())
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        await runner  # re-raise agent failures
+    finally:
+        for task in [runner, *background_tasks]:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,41 @@
+"""
+Tests for the TTS audio endpoint (ETag, conditional GET, Range)
+"""
+import asyncio
+from fastapi.testclient import TestClient
+from main import app
+from utils.tts_service import tts_service
+
+KEY = "fedcba9876543210fedcba9876543210"
+URL = f"/api/trial/case/audio/{KEY}.mp3"
+BODY = bytes(range(256)) * 4
+
+
+def setup_module(module):
+    asyncio.run(tts_service.cache.put(f"{KEY}.mp3", BODY))
+
+
+def test_full_response_has_strong_etag_and_immutable_caching():
+    response = TestClient(app).get(URL)
+    assert response.status_code == 200
+    assert response.content == BODY
+    assert response.headers["etag"] == f'"{KEY}"'
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_if_none_match_returns_304():
+    client = TestClient(app)
+    assert client.get(URL, headers={"If-None-Match": f'W/"other", "{KEY}"'}).status_code == 304
+    assert client.get(URL, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_range_request_returns_partial_content():
+    response = TestClient(app).get(URL, headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == BODY[100:200]
+
+
+def test_rejects_non_hash_filenames():
+    client = TestClient(app)
+    assert client.get("/api/trial/case/audio/..%2Fsecrets.mp3").status_code in (400, 404)
+    assert client.get("/api/trial/case/audio/notahash.mp3").status_code == 400
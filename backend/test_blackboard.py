@@ -0,0 +1,49 @@
+"""
+Unit tests for blackboard collection bounds
+"""
+import asyncio
+import time
+from utils.blackboard import BlackboardClient
+
+EVIDENCE = {"source_url": "https://example.com", "text": "x" * 100}
+
+
+def test_stats_and_delete():
+    async def run():
+        board = BlackboardClient(ttl_seconds=3600, max_bytes=10 ** 6)
+        await board.create_collection("c1")
+        await board.store_evidence("c1", "investigator", EVIDENCE)
+        await board.store_evidence("c1", "prosecutor", EVIDENCE)
+        stats = board.stats()
+        assert stats["collections"] == 1 and stats["namespaces"] == 2 and stats["items"] == 2
+        assert stats["approx_bytes"] > 200
+
+        await board.delete_collection("c1")
+        assert board.stats()["approx_bytes"] == 0
+    asyncio.run(run())
+
+
+def test_byte_budget_evicts_least_recently_used():
+    async def run():
+        one_item = BlackboardClient._size(EVIDENCE)
+        board = BlackboardClient(ttl_seconds=3600, max_bytes=one_item * 2)
+        await board.store_evidence("old", "investigator", EVIDENCE)
+        await board.store_evidence("recent", "investigator", EVIDENCE)
+        await board.query_namespace("old", "investigator", "all")  # old is now most recently used
+        await board.store_evidence("new", "investigator", EVIDENCE)
+        assert "recent" not in board.storage
+        assert set(board.storage) == {"old", "new"}
+        assert board.stats()["evictions"] == 1
+    asyncio.run(run())
+
+
+def test_sweep_drops_idle_collections():
+    async def run():
+        board = BlackboardClient(ttl_seconds=60, max_bytes=10 ** 6)
+        await board.store_evidence("idle", "investigator", EVIDENCE)
+        await board.store_evidence("active", "investigator", EVIDENCE)
+        board._touched["idle"] = time.time() - 120
+        assert board.sweep() == 1
+        assert await board.query_namespace("idle", "investigator", "all") == []
+        assert len(await board.query_namespace("active", "investigator", "all")) == 1
+    asyncio.run(run())
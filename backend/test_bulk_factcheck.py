@@ -0,0 +1,102 @@
+"""
+Tests for the bulk fact-check runner and endpoint
+"""
+import asyncio
+import json
+from fastapi.testclient import TestClient
+import bulk_factcheck
+import main
+from bulk_factcheck import parse_ndjson, parse_json_array, run_bulk
+from utils.llm_scheduler import Priority, priority_floor
+
+
+def _install_stand_in(monkeypatch, delays=None):
+    """Fast-track stand-in: verdict score is the content length; tracks concurrency"""
+    stats = {"in_flight": 0, "max_in_flight": 0, "priorities": set()}
+
+    async def run_fasttrack(state):
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        stats["priorities"].add(priority_floor.get())
+        try:
+            yield {"phase": "claim_extraction", "status": "running"}
+            await asyncio.sleep((delays or {}).get(state["raw_input"], 0.01))
+            if state["raw_input"] == "boom":
+                raise RuntimeError("search failed")
+            state["selected_claims"] = [{"text": state["raw_input"]}]
+            state["aggregated_verdict"] = {"mode": "fasttrack", "score": len(state["raw_input"])}
+            yield {"phase": "verdict", "verdict": state["aggregated_verdict"]}
+        finally:
+            stats["in_flight"] -= 1
+
+    monkeypatch.setattr(bulk_factcheck, "run_fasttrack", run_fasttrack)
+    return stats
+
+
+async def _collect(items, concurrency):
+    return [result async for result in run_bulk(items, concurrency)]
+
+
+def test_results_stream_in_completion_order_with_bounded_concurrency(monkeypatch):
+    stats = _install_stand_in(monkeypatch, delays={"slow": 0.2})
+    items = parse_json_array(json.dumps(
+        [{"id": "a", "content": "slow"}] + [{"id": i, "content": f"post {i}"} for i in range(6)]
+    ).encode())
+    results = asyncio.run(_collect(items, 2))
+
+    *items_out, summary = results
+    assert items_out[-1]["id"] == "a"  # slow item finishes last
+    assert {r["id"] for r in items_out} == {"a", 0, 1, 2, 3, 4, 5}
+    assert all(r["status"] == "ok" for r in items_out)
+    assert items_out[0]["verdict"]["score"] == len("post 0")
+    assert stats["max_in_flight"] == 2
+    # Bulk LLM calls never compete with interactive trials
+    assert stats["priorities"] == {Priority.BACKGROUND}
+    assert priority_floor.get() == Priority.INTERACTIVE
+    assert summary == {"summary": {"items": 7, "ok": 7, "error": 0, "elapsed_ms": summary["summary"]["elapsed_ms"]}}
+
+
+def test_bad_items_and_failures_do_not_fail_the_batch(monkeypatch):
+    _install_stand_in(monkeypatch)
+
+    # A blank line and no trailing newline
+    body = (b'{"id": "x", "content": "fine"}\n{"id": "y", "content": "boom"}\n\nnot json\n'
+            b'{"id": "z", "content": "a", "input_type": "video"}\n"bare string"')
+    results = asyncio.run(_collect(parse_ndjson(body), 4))
+    by_id = {r.get("id"): r for r in results[:-1]}
+    assert by_id["x"]["status"] == "ok"
+    assert by_id["y"] == {"id": "y", "status": "error", "error": "search failed"}
+    assert by_id[2]["status"] == "error" and "invalid JSON" in by_id[2]["error"]
+    assert by_id["z"]["status"] == "error" and "input_type" in by_id["z"]["error"]
+    assert by_id[4]["verdict"]["score"] == len("bare string")
+    assert results[-1]["summary"]["ok"] == 2 and results[-1]["summary"]["error"] == 3
+
+
+def test_item_cap(monkeypatch):
+    _install_stand_in(monkeypatch)
+    monkeypatch.setattr(bulk_factcheck.Config, "BULK_MAX_ITEMS", 2)
+    results = asyncio.run(_collect(parse_json_array(b'["a", "b", "c", "d"]'), 4))
+    assert [r["status"] for r in results[:-1]].count("ok") == 2
+    assert any("exceeds 2 items" in r.get("error", "") for r in results)
+
+
+def test_bulk_endpoint_streams_ndjson(monkeypatch):
+    _install_stand_in(monkeypatch)
+    client = TestClient(main.app)
+
+    body = "\n".join(json.dumps({"id": i, "content": f"post {i}"}) for i in range(3))
+    response = client.post("/api/factcheck/bulk", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["id"] for line in lines[:-1]) == [0, 1, 2]
+    assert lines[-1]["summary"]["ok"] == 3
+
+    response = client.post("/api/factcheck/bulk", json=[{"content": "one"}])
+    assert [json.loads(line)["status"] for line in response.text.splitlines()[:-1]] == ["ok"]
+
+    assert client.post("/api/factcheck/bulk", json={"content": "one"}).status_code == 400
+    monkeypatch.setattr(main.Config, "BULK_MAX_BODY_BYTES", 10)
+    assert client.post("/api/factcheck/bulk", json=["x" * 20]).status_code == 413
+    assert client.post("/api/factcheck/bulk", content="x", headers={"Content-Type": "text/plain"}).status_code == 415
@@ -0,0 +1,88 @@
+"""
+Unit tests for the claim index
+"""
+import time
+from utils.claim_index import ClaimIndex, MinHasher, normalize_claim, shingles
+
+EVIDENCE = [{"source_url": "https://nasa.gov", "text": "No evidence of life on Mars", "credibility_score": 9}]
+
+
+def make_index(tmp_path, **kwargs):
+    return ClaimIndex(str(tmp_path / "claims.sqlite3"), **kwargs)
+
+
+def test_normalization():
+    assert normalize_claim("  NASA  confirmed: aliens exist!! ") == "nasa confirmed aliens exist"
+
+
+def test_minhash_similarity_tracks_jaccard():
+    hasher = MinHasher(num_perm=128)
+    a = hasher.signature(shingles(normalize_claim("NASA confirmed that aliens exist on Mars")))
+    b = hasher.signature(shingles(normalize_claim("NASA has confirmed that aliens exist on Mars")))
+    c = hasher.signature(shingles(normalize_claim("The stock market fell 5% on Monday")))
+    assert MinHasher.similarity(a, b) > 0.6
+    assert MinHasher.similarity(a, c) < 0.2
+
+
+def test_exact_and_near_duplicate_lookup(tmp_path):
+    index = make_index(tmp_path, threshold=0.6)
+    index.record_evidence("NASA confirmed that aliens exist on Mars last Tuesday.", EVIDENCE)
+
+    exact = index.lookup("nasa confirmed that aliens exist on mars last tuesday")
+    assert exact["evidence"] == EVIDENCE
+    assert exact["similarity"] == 1.0
+
+    near = index.lookup("NASA confirmed aliens exist on Mars last Tuesday")
+    assert near is not None and near["similarity"] >= 0.6
+
+    assert index.lookup("Vaccines contain microchips") is None
+
+
+def test_freshness_window(tmp_path):
+    index = make_index(tmp_path, freshness_seconds=0.05)
+    index.record_evidence("The Eiffel Tower is in Berlin", EVIDENCE)
+    assert index.lookup("The Eiffel Tower is in Berlin") is not None
+    time.sleep(0.06)
+    assert index.lookup("The Eiffel Tower is in Berlin") is None
+    assert index.lookup("The Eiffel Tower is in Berlin", max_age=60) is not None
+
+
+def test_verdicts_and_invalidation(tmp_path):
+    index = make_index(tmp_path)
+    index.record_evidence("The Eiffel Tower is in Berlin", EVIDENCE)
+    index.record_verdict("The Eiffel Tower is in Berlin", 5)
+    index.record_verdict("the eiffel tower is in berlin!", 12)
+    assert index.lookup("The Eiffel Tower is in Berlin")["verdict_scores"] == [5, 12]
+
+    assert index.invalidate("The Eiffel Tower is in Berlin") == 1
+    assert index.lookup("The Eiffel Tower is in Berlin") is None
+    assert index.stats()["claims"] == 0
+
+
+def test_invalidate_older_than(tmp_path):
+    index = make_index(tmp_path)
+    index.record_evidence("Claim one is here", EVIDENCE)
+    index.record_verdict("Verdict only claim", 50)  # never investigated
+    assert index.invalidate_older_than(3600) == 1
+    assert index.stats()["claims"] == 1
+
+
+def test_disabled_index(tmp_path):
+    index = make_index(tmp_path, enabled=False)
+    index.record_evidence("Claim one is here", EVIDENCE)
+    assert index.lookup("Claim one is here") is None
+
+
+def test_numbers_and_negations_must_match(tmp_path):
+    index = make_index(tmp_path, threshold=0.6)
+    evidence = [{"claim_id": 2, "source_url": "https://example.com", "text": "Completed in 1889", "supports_claim": True}]
+    index.record_evidence("The Eiffel Tower was completed in 1889", evidence)
+
+    assert index.lookup("The Eiffel Tower was completed in 1989") is None
+    assert index.lookup("The Eiffel Tower was not completed in 1889") is None
+    assert index.lookup("the eiffel tower was completed in 1889!")["evidence"] == evidence
+
+    # A near-duplicate gets the evidence without the per-claim fields
+    near = index.lookup("Eiffel Tower was completed in 1889")
+    assert near["similarity"] < 1.0
+    assert near["evidence"] == [{"source_url": "https://example.com", "text": "Completed in 1889"}]
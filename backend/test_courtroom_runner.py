@@ -0,0 +1,240 @@
+"""
+Unit tests for the checkpointed courtroom graph runner
+"""
+import asyncio
+import time
+import courtroom_runner
+import workflow
+from agents import jury as jury_module
+from courtroom_runner import CourtroomRunner
+from utils.blackboard import blackboard
+from utils.trial_store import InMemoryTrialStore
+
+
+def _install_stand_ins(monkeypatch, calls, jury_fails=False, jury_delay=0):
+    store = InMemoryTrialStore(3600)
+    monkeypatch.setattr(courtroom_runner, "trial_store", store)
+    monkeypatch.setattr(workflow, "trial_store", store)
+
+    async def claim_extractor(state):
+        calls.append("claim_extractor")
+        state["claims"] = [{"text": "Claim A"}]
+        return state
+
+    def claim_triage(state):
+        state["selected_claims"] = state["claims"]
+        return state
+
+    async def investigate(state):
+        evidence = [{"source_url": "https://example.com/a", "text": "evidence", "credibility_score": 8}]
+        for e in evidence:
+            await blackboard.store_evidence(state["case_id"], "investigator", e)
+        state["investigator_evidence"] = evidence
+        yield {"phase": "investigation", "status": "claim_investigated"}
+
+    async def run_round(state):
+        for agent in ("prosecutor", "defendant"):
+            state["trial_transcript"].append({
+                "agent": agent, "round": state["current_round"], "argument_text": f"{agent} argument",
+                "confidence_score": 60, "evidence_revealed": [{"source": "x"}],
+            })
+            yield {"phase": "trial", "agent": agent, "round": state["current_round"]}
+
+    async def jury_update(state):
+        calls.append(f"jury_update_{state['current_round']}")
+        await asyncio.sleep(jury_delay)
+        if jury_fails:
+            raise RuntimeError("quota")
+        for juror in state["jury_members"]:
+            juror["notes"] = {"current_lean": 40}
+
+    async def jury_verdict(state):
+        state["jury_verdicts"] = [{"juror_id": 1, "confidence_score": 30}]
+        return state
+
+    def verdict_aggregator(state):
+        state["aggregated_verdict"] = {"score": 30, "category": "Likely False"}
+        return state
+
+    async def passthrough(state):
+        return state
+
+    for name, fn in (("claim_extractor", claim_extractor), ("claim_triage", claim_triage),
+                     ("investigate", investigate), ("run_round", run_round), ("jury_update", jury_update),
+                     ("jury_verdict", jury_verdict), ("verdict_aggregator", verdict_aggregator),
+                     ("awareness_scorer", passthrough), ("education_generator", passthrough),
+                     ("report_generator", passthrough)):
+        monkeypatch.setattr(workflow, name, fn)
+    monkeypatch.setattr(workflow.claim_index, "record_verdict",
+                        lambda claim, score: calls.append(f"record_verdict:{claim}:{score}"))
+    # Background note updates call it from agents.jury
+    monkeypatch.setattr(jury_module, "jury_update", jury_update)
+    return store
+
+
+def _state(store, max_rounds=2):
+    state = workflow.create_initial_state("Viral post", "text")
+    state["max_rounds"] = max_rounds
+    asyncio.run(store.create(state["case_id"], {"state": state, "status": "started", "streaming": False}))
+    return state
+
+
+async def _collect(runner, state):
+    return [event async for event in runner.run(state)]
+
+
+def test_trial_suspends_at_each_judgment_and_resumes(monkeypatch, tmp_path):
+    calls = []
+    store = _install_stand_ins(monkeypatch, calls)
+    state = _state(store)
+    case_id = state["case_id"]
+
+    async def run():
+        runner = CourtroomRunner(str(tmp_path / "checkpoints.sqlite3"))
+        await runner.start()
+        try:
+            runs = [await _collect(runner, state)]
+            for judgement in ("plausible", "misleading"):
+                await store.push_judgment(case_id, judgement)
+                runs.append(await _collect(runner, state))
+            return runs
+        finally:
+            await runner.close()
+
+    first, second, last = asyncio.run(run())
+    # Each stream ends at the checkpoint
+    assert [e["phase"] for e in first[:2]] == ["claim_extraction", "claim_extraction"]
+    assert first[-1]["phase"] == second[-1]["phase"] == "awaiting_judgment"
+    assert (first[-1]["round"], second[-1]["round"]) == (1, 2)
+    assert second[0] == {"phase": "trial", "agent": "prosecutor", "round": 2}
+    assert [e["phase"] for e in last[-3:]] == ["awareness_score", "education", "complete"]
+    assert calls == ["claim_extractor", "jury_update_1", "jury_update_2", "record_verdict:Claim A:30"]
+
+    saved = asyncio.run(store.get(case_id))["state"]
+    assert saved["user_judgements"] == ["plausible", "misleading"]
+    assert saved["aggregated_verdict"]["category"] == "Likely False"
+    assert saved["jury_members"][0]["notes"] == {"current_lean": 40}
+    assert not blackboard.has_collection(case_id)
+
+
+def test_reconnect_without_judgment_stays_suspended_until_timeout(monkeypatch, tmp_path):
+    store = _install_stand_ins(monkeypatch, [])
+    state = _state(store)
+
+    async def run():
+        runner = CourtroomRunner(str(tmp_path / "checkpoints.sqlite3"))
+        await runner.start()
+        try:
+            checkpoint = (await _collect(runner, state))[-1]
+            again = await _collect(runner, state)
+            await store.push_judgment(state["case_id"], "plausible")
+            second = (await _collect(runner, state))[-1]
+            monkeypatch.setattr(courtroom_runner, "JUDGMENT_TIMEOUT", 0)
+            timed_out = await _collect(runner, state)
+            return checkpoint, again, second, timed_out
+        finally:
+            await runner.close()
+
+    checkpoint, again, second, timed_out = asyncio.run(run())
+    assert checkpoint == {"phase": "awaiting_judgment", "round": 1}
+    assert again == []
+    assert second["round"] == 2
+    assert timed_out[-1]["phase"] == "complete"
+    assert asyncio.run(store.get(state["case_id"]))["state"]["user_judgements"] == ["plausible", "neutral"]
+
+
+def test_paused_trial_resumes_on_another_runner(monkeypatch, tmp_path):
+    calls = []
+    store = _install_stand_ins(monkeypatch, calls, jury_fails=True)
+    state = _state(store)
+    case_id = state["case_id"]
+    path = str(tmp_path / "checkpoints.sqlite3")
+
+    async def first_worker():
+        runner = CourtroomRunner(path)
+        await runner.start()
+        try:
+            await _collect(runner, state)
+        finally:
+            await runner.close()
+        # The other worker has its own (empty) blackboard
+        await blackboard.delete_collection(case_id)
+
+    async def second_worker():
+        runner = CourtroomRunner(path)
+        await runner.start()
+        await store.push_judgment(case_id, "not sure")
+        try:
+            events = []
+            async for event in runner.run({"case_id": case_id}):
+                if not events:
+                    assert blackboard.has_collection(case_id)
+                events.append(event)
+            await store.push_judgment(case_id, "plausible")
+            events += await _collect(runner, {"case_id": case_id})
+            return events
+        finally:
+            await runner.close()
+
+    asyncio.run(first_worker())
+    events = asyncio.run(second_worker())
+
+    assert events[0] == {"phase": "trial", "agent": "prosecutor", "round": 2}
+    assert events[-1]["phase"] == "complete"
+    # Extraction is not redone; failed note updates do not stop the trial
+    assert calls.count("claim_extractor") == 1
+    assert asyncio.run(store.get(case_id))["state"]["user_judgements"] == ["not sure", "plausible"]
+
+
+def test_slow_jurors_do_not_hold_up_the_trial(monkeypatch, tmp_path):
+    calls = []
+    store = _install_stand_ins(monkeypatch, calls, jury_delay=1.0)
+    state = _state(store)
+    case_id = state["case_id"]
+
+    async def run():
+        runner = CourtroomRunner(str(tmp_path / "checkpoints.sqlite3"))
+        await runner.start()
+        try:
+            start = time.perf_counter()
+            await _collect(runner, state)
+            await store.push_judgment(case_id, "plausible")
+            await _collect(runner, state)
+            to_second_judgment = time.perf_counter() - start
+            await store.push_judgment(case_id, "misleading")
+            await _collect(runner, state)
+            return to_second_judgment
+        finally:
+            await runner.close()
+
+    # Notes take a second per round; the rounds go on without them
+    assert asyncio.run(run()) < 0.8
+    saved = asyncio.run(store.get(case_id))["state"]
+    # Deliberation waited for the last round's notes
+    assert calls[:3] == ["claim_extractor", "jury_update_1", "jury_update_2"]
+    assert saved["jury_members"][0]["notes"] == {"current_lean": 40}
+    assert saved["jury_members"][0]["notes_round"] == 2
+
+
+def test_sweep_cancels_notes_of_expired_trials(monkeypatch, tmp_path):
+    store = _install_stand_ins(monkeypatch, [], jury_delay=5.0)
+    state = _state(store)
+    case_id = state["case_id"]
+
+    async def run():
+        runner = CourtroomRunner(str(tmp_path / "checkpoints.sqlite3"))
+        await runner.start()
+        try:
+            await _collect(runner, state)
+            task = workflow._jury_tasks[case_id]
+            # Never resumed: the trial expires while its jurors are still writing
+            await store.delete(case_id)
+            assert await runner.sweep() == 1
+            await asyncio.sleep(0)
+            return task
+        finally:
+            await runner.close()
+
+    task = asyncio.run(run())
+    assert task.cancelled()
+    assert case_id not in workflow._jury_tasks
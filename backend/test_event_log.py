@@ -0,0 +1,90 @@
+"""
+Unit tests for the per-case SSE event log
+"""
+import asyncio
+import pytest
+from utils.event_log import InMemoryEventLog, SQLiteEventLog
+
+
+def make_log(kind, tmp_path, ttl=3600):
+    if kind == "memory":
+        return InMemoryEventLog(ttl)
+    return SQLiteEventLog(str(tmp_path / "events.sqlite3"), ttl, poll_interval=0.01)
+
+
+async def _follow(log, case_id, after_id, running, heartbeat=5.0):
+    async def is_running():
+        return running["value"]
+    return [item async for item in log.follow(case_id, after_id, is_running, heartbeat)]
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_ids_increase_per_case_and_replay_after_an_id(kind, tmp_path):
+    async def run():
+        log = make_log(kind, tmp_path)
+        assert [await log.append("c1", {"phase": f"p{i}"}) for i in range(3)] == [1, 2, 3]
+        assert await log.append("c2", {"phase": "other"}) == 1
+        assert await log.read("c1", 1) == [(2, {"phase": "p1"}), (3, {"phase": "p2"})]
+        assert await log.read("c1", 3) == []
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_subscribers_replay_then_follow_until_the_run_suspends(kind, tmp_path):
+    async def run():
+        log = make_log(kind, tmp_path)
+        running = {"value": True}
+        await log.append("c1", {"phase": "claim_extraction"})
+        # Two viewers: one from the start, one reconnecting after event 1
+        viewers = [asyncio.create_task(_follow(log, "c1", after, running)) for after in (0, 1)]
+        await asyncio.sleep(0.05)
+        await log.append("c1", {"phase": "trial"})
+        await log.append("c1", {"phase": "awaiting_judgment", "round": 1})
+        await asyncio.sleep(0.05)
+        # Suspended, but the run is still active: viewers keep waiting
+        assert not any(v.done() for v in viewers)
+        running["value"] = False
+        log.wake("c1")
+        return await asyncio.gather(*viewers)
+
+    full, resumed = asyncio.run(run())
+    assert [event_id for event_id, _ in full] == [1, 2, 3]
+    assert [event_id for event_id, _ in resumed] == [2, 3]
+    assert resumed[-1][1]["phase"] == "awaiting_judgment"
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_idle_streams_get_heartbeats(kind, tmp_path):
+    async def run():
+        log = make_log(kind, tmp_path)
+        running = {"value": True}
+        await log.append("c1", {"phase": "investigation", "status": "running"})
+        viewer = asyncio.create_task(_follow(log, "c1", 0, running, heartbeat=0.05))
+        await asyncio.sleep(0.18)
+        running["value"] = False
+        await log.append("c1", {"phase": "complete"})
+        return await viewer
+
+    items = asyncio.run(run())
+    assert items[0][0] == 1 and items[-1][1] == {"phase": "complete"}
+    assert 2 <= items.count(None) <= 4
+
+
+def test_caught_up_viewer_of_an_idle_trial_returns_at_once(tmp_path):
+    async def run():
+        log = make_log("memory", tmp_path)
+        await log.append("c1", {"phase": "awaiting_judgment", "round": 1})
+        return await asyncio.wait_for(_follow(log, "c1", 1, {"value": False}), timeout=1)
+    assert asyncio.run(run()) == []
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_sweep_drops_stale_logs(kind, tmp_path):
+    async def run():
+        log = make_log(kind, tmp_path, ttl=0.05)
+        await log.append("old", {"phase": "complete"})
+        await asyncio.sleep(0.1)
+        await log.append("new", {"phase": "trial"})
+        assert await log.sweep() == 1
+        assert await log.read("old") == [] and len(await log.read("new")) == 1
+    asyncio.run(run())
@@ -0,0 +1,99 @@
+"""
+Unit tests for the fast-track DAG
+"""
+import asyncio
+import time
+import fasttrack_pipeline
+from agents import investigator
+
+
+def _install_stand_ins(monkeypatch, search_latency, forensics_latency=0.0, log=None):
+    log = log if log is not None else []
+
+    async def claim_extractor(state):
+        state["claims"] = [{"text": text, "priority": 50} for text in search_latency]
+        return state
+
+    async def claim_triage(state):
+        state["selected_claims"] = state["claims"]
+        return state
+
+    async def gather_claim_evidence(claims, claim_ids=None):
+        text = claims[0]["text"]
+        log.append(f"search_start:{text}")
+        await asyncio.sleep(search_latency[text])
+        log.append(f"search_done:{text}")
+        return [{"source_url": f"https://example.com/{text}", "text": text}]
+
+    async def video_forensics(state):
+        if state["input_type"] != "video":
+            return None
+        log.append("forensics_start")
+        await asyncio.sleep(forensics_latency)
+        return {"source_url": "video_forensics_analysis", "text": "AUTHENTIC"}
+
+    async def record_investigation(state, evidence):
+        state["investigator_evidence"] = evidence
+
+    async def fasttrack_verdict(state):
+        state["aggregated_verdict"] = {"mode": "fasttrack", "evidence": len(state["investigator_evidence"])}
+        return state
+
+    for name, fn in list(locals().items()):
+        if callable(fn):
+            monkeypatch.setattr(fasttrack_pipeline if hasattr(fasttrack_pipeline, name) else investigator, name, fn)
+    return log
+
+
+def _run(state):
+    async def run():
+        return [event async for event in fasttrack_pipeline.run_fasttrack(state)]
+    return asyncio.run(run())
+
+
+def test_claims_are_searched_in_parallel_alongside_forensics(monkeypatch):
+    monkeypatch.setattr(fasttrack_pipeline.Config, "FASTTRACK_VERDICT_QUORUM", 1.0)
+    log = _install_stand_ins(monkeypatch, {"a": 0.2, "b": 0.2, "c": 0.2}, forensics_latency=0.2)
+    state = {"case_id": "c1", "input_type": "video"}
+
+    start = time.perf_counter()
+    events = _run(state)
+    elapsed = time.perf_counter() - start
+
+    # Four 0.2s calls: ~0.2s concurrently vs 0.8s in series
+    assert elapsed < 0.5
+    assert set(log[:4]) == {"forensics_start", "search_start:a", "search_start:b", "search_start:c"}
+    assert [e["phase"] for e in events] == ["claim_extraction", "claim_triage"] + ["investigation"] * 4 + ["fasttrack", "verdict"]
+    assert [e["completed"] for e in events[3:6]] == [1, 2, 3]
+    assert events[-1]["verdict"]["evidence"] == 4
+
+
+def test_fan_out_is_bounded(monkeypatch):
+    monkeypatch.setattr(fasttrack_pipeline.Config, "FASTTRACK_VERDICT_QUORUM", 1.0)
+    monkeypatch.setattr(fasttrack_pipeline.Config, "INVESTIGATOR_CLAIM_CONCURRENCY", 2)
+    log = _install_stand_ins(monkeypatch, {"a": 0.05, "b": 0.05, "c": 0.05})
+    _run({"case_id": "c1", "input_type": "text"})
+    # The third search only starts once one of the first two is done
+    assert log.index("search_start:c") > min(log.index("search_done:a"), log.index("search_done:b"))
+
+
+def test_verdict_starts_at_quorum_and_cancels_stragglers(monkeypatch):
+    monkeypatch.setattr(fasttrack_pipeline.Config, "FASTTRACK_VERDICT_QUORUM", 0.6)
+    log = _install_stand_ins(monkeypatch, {"a": 0.05, "b": 0.05, "slow": 5.0})
+    state = {"case_id": "c1", "input_type": "text"}
+
+    start = time.perf_counter()
+    _run(state)
+    assert time.perf_counter() - start < 1.0
+    assert "search_done:slow" not in log
+    assert sorted(e["text"] for e in state["investigator_evidence"]) == ["a", "b"]
+
+
+def test_shared_search_setting_is_respected(monkeypatch):
+    monkeypatch.setattr(fasttrack_pipeline.Config, "INVESTIGATOR_PER_CLAIM", False)
+    log = _install_stand_ins(monkeypatch, {"a": 0.01, "b": 0.01})
+    state = {"case_id": "c1", "input_type": "text"}
+    events = _run(state)
+    # One search for all claims, no per-claim events
+    assert log == ["search_start:a", "search_done:a"]
+    assert "investigation" not in [e["phase"] for e in events[3:]]
@@ -0,0 +1,66 @@
+"""
+Tests for the file processing tracker (backoff, batching, deadline, histograms)
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from utils.file_processing import ProcessingTracker, ProcessingTimeout, size_bucket
+from utils.remote_files import InMemoryFileProvider
+
+
+async def upload(provider, tmp_path, name: str, size: int = 10):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return await provider.upload(str(path))
+
+
+def test_wait_returns_active_file_with_backoff(tmp_path):
+    async def run():
+        provider = InMemoryFileProvider(processing_seconds=0.2)
+        tracker = ProcessingTracker(provider, initial_delay=0.01, max_delay=1.0, jitter=0.0)
+        remote_file = await upload(provider, tmp_path, "a.mp4")
+        ready = await tracker.wait(remote_file)
+        assert ready.state == "ACTIVE"
+        # 0.01, 0.02, 0.04, 0.08, 0.16: a fixed 10 ms poll would need ~20 checks
+        assert provider.gets <= 6
+        stats = tracker.stats()
+        assert stats["processing"] == 0 and stats["by_size"]["<1MB"]["count"] == 1
+        assert stats["by_size"]["<1MB"]["histogram"]["<=1s"] == 1
+    asyncio.run(run())
+
+
+def test_many_processing_files_are_checked_in_batches(tmp_path):
+    async def run():
+        provider = InMemoryFileProvider(processing_seconds=0.05)
+        tracker = ProcessingTracker(provider, initial_delay=0.02, jitter=0.0, batch_min=3)
+        files = [await upload(provider, tmp_path, f"{i}.mp4") for i in range(5)]
+        ready = await asyncio.gather(*[tracker.wait(f) for f in files])
+        assert all(f.state == "ACTIVE" for f in ready)
+        assert provider.lists >= 1 and provider.gets == 0
+    asyncio.run(run())
+
+
+def test_deadline_raises_processing_timeout(tmp_path):
+    async def run():
+        provider = InMemoryFileProvider(processing_seconds=60)
+        tracker = ProcessingTracker(provider, initial_delay=0.01, max_delay=0.02, deadline=0.1)
+        remote_file = await upload(provider, tmp_path, "slow.mp4")
+        with pytest.raises(ProcessingTimeout):
+            await tracker.wait(remote_file)
+        assert tracker.timeouts == 1 and tracker.stats()["processing"] == 0
+    asyncio.run(run())
+
+
+def test_already_active_files_return_immediately():
+    async def run():
+        tracker = ProcessingTracker(InMemoryFileProvider())
+        remote_file = SimpleNamespace(name="files/x", state="ACTIVE", size_bytes=30 << 20)
+        assert await tracker.wait(remote_file) is remote_file
+        assert tracker.stats()["by_size"]["<50MB"]["count"] == 1
+    asyncio.run(run())
+
+
+def test_size_buckets():
+    assert size_bucket(None) == "unknown"
+    assert size_bucket(0) == "<1MB"
+    assert size_bucket(250 << 20) == ">=200MB"
@@ -0,0 +1,29 @@
+"""
+Unit tests for the shared HTTP pool
+"""
+import asyncio
+from utils.http_pool import HTTPPool
+
+
+def test_client_is_reused_within_a_loop_and_rebound_across_loops():
+    pool = HTTPPool(http2=False)
+
+    async def clients():
+        await pool.start()
+        return pool.client, pool.client
+
+    first, second = asyncio.run(clients())
+    assert first is second
+    third, _ = asyncio.run(clients())
+    assert third is not first
+
+
+def test_close_then_lazy_client():
+    async def run():
+        pool = HTTPPool(http2=False)
+        await pool.start()
+        await pool.close()
+        assert pool._client is None
+        assert not pool.client.is_closed
+        await pool.close()
+    asyncio.run(run())
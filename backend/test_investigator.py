@@ -0,0 +1,97 @@
+"""
+Unit tests for per-claim investigation and evidence merging
+"""
+import asyncio
+import json
+from agents import investigator
+
+
+def _install_stand_ins(monkeypatch, latency, per_claim=True):
+    calls = []
+
+    async def gather_claim_evidence(claims, claim_ids=None):
+        calls.append([c["text"] for c in claims])
+        await asyncio.sleep(max(latency[c["text"]] for c in claims))
+        if any(c["text"] == "broken" for c in claims):
+            raise ValueError("malformed response")
+        return [{"source_url": "https://shared.example", "text": "shared", "credibility_score": 7}] + [
+            {"source_url": f"https://example.com/{c['text']}", "text": c["text"], "credibility_score": 8} for c in claims
+        ]
+
+    async def record_investigation(state, evidence):
+        state["investigator_evidence"] = evidence
+
+    monkeypatch.setattr(investigator.Config, "INVESTIGATOR_PER_CLAIM", per_claim)
+    monkeypatch.setattr(investigator, "gather_claim_evidence", gather_claim_evidence)
+    monkeypatch.setattr(investigator, "record_investigation", record_investigation)
+    return calls
+
+
+def _run(state):
+    async def run():
+        return [event async for event in investigator.investigate(state)]
+    return asyncio.run(run())
+
+
+def test_merge_evidence_dedupes_by_source_url():
+    evidence = [{"source_url": "https://a", "text": "first"}]
+    added = investigator.merge_evidence(evidence, [
+        {"source_url": "https://a", "text": "again"},
+        {"source_url": "https://b", "text": "new"},
+        {"text": "no url"},
+        {"text": "no url either"},
+    ])
+    assert [e["text"] for e in added] == ["new", "no url", "no url either"]
+    assert [e["text"] for e in evidence] == ["first", "new", "no url", "no url either"]
+
+
+def test_per_claim_events_stream_as_each_claim_lands(monkeypatch):
+    calls = _install_stand_ins(monkeypatch, {"slow": 0.2, "fast": 0.01, "broken": 0.05})
+    state = {"case_id": "c1", "input_type": "text",
+             "selected_claims": [{"text": "slow"}, {"text": "fast"}, {"text": "broken"}]}
+    events = _run(state)
+
+    assert sorted(calls) == [["broken"], ["fast"], ["slow"]]
+    assert [(e["claim_text"], e["completed"], e["total"]) for e in events] == [
+        ("fast", 1, 3), ("broken", 2, 3), ("slow", 3, 3)
+    ]
+    # A failed claim costs only that claim; the shared source is reported once
+    assert events[1]["new_evidence"] == []
+    assert [card["source"] for card in events[2]["new_evidence"]] == ["https://example.com/slow"]
+    assert len(state["investigator_evidence"]) == 3
+
+
+def test_batch_mode_issues_one_search(monkeypatch):
+    calls = _install_stand_ins(monkeypatch, {"a": 0.01, "b": 0.01}, per_claim=False)
+    state = {"case_id": "c1", "input_type": "text", "selected_claims": [{"text": "a"}, {"text": "b"}]}
+    assert _run(state) == []
+    assert calls == [["a", "b"]]
+    assert len(state["investigator_evidence"]) == 3
+
+
+def test_evidence_keeps_each_claims_position(monkeypatch):
+    indexed = {"a": [{"source_url": "https://index.example/a", "text": "a", "claim_id": 1}]}
+
+    async def generate_gemini_grounded(prompt, stage=None):
+        # The search prompt numbers only the claims it was given
+        claims = [line.split(". ", 1)[1] for line in prompt.splitlines() if line[:1].isdigit() and ". " in line]
+        return json.dumps([{"claim_id": i, "source_url": f"https://example.com/{text}", "text": text}
+                           for i, text in enumerate(claims, 1)])
+
+    monkeypatch.setattr(investigator.Config, "INVESTIGATOR_PER_CLAIM", True)
+    monkeypatch.setattr(investigator.claim_index, "lookup", lambda text: {"evidence": indexed[text]} if text in indexed else None)
+    monkeypatch.setattr(investigator.claim_index, "record_evidence", lambda text, evidence: None)
+    monkeypatch.setattr(investigator.llm_clients, "generate_gemini_grounded", generate_gemini_grounded)
+
+    async def record_investigation(state, evidence):
+        state["investigator_evidence"] = evidence
+    monkeypatch.setattr(investigator, "record_investigation", record_investigation)
+
+    claims = [{"text": "a"}, {"text": "b"}, {"text": "c"}]
+    state = {"case_id": "c1", "input_type": "text", "selected_claims": claims}
+    _run(state)
+    assert sorted((e["text"], e["claim_id"]) for e in state["investigator_evidence"]) == [("a", 1), ("b", 2), ("c", 3)]
+
+    # One shared search for the claims the index did not have
+    evidence = asyncio.run(investigator.gather_claim_evidence(claims))
+    assert sorted((e["text"], e["claim_id"]) for e in evidence) == [("a", 1), ("b", 2), ("c", 3)]
@@ -0,0 +1,33 @@
+"""
+Unit tests for juror note updates
+"""
+import asyncio
+from agents import jury
+
+
+def test_update_stores_notes_per_juror(monkeypatch):
+    notes = {}
+
+    async def query_namespace(case_id, namespace, query, top_k=5):
+        return list(notes.get(namespace, []))
+
+    async def store_evidence(case_id, namespace, item):
+        notes.setdefault(namespace, []).append(item)
+
+    async def generate(prompt, temperature=0.5, priority=None):
+        return '{"current_lean": 30, "key_evidence": "", "logical_weaknesses": "", "unanswered_questions": ""}'
+
+    monkeypatch.setattr(jury.blackboard, "query_namespace", query_namespace)
+    monkeypatch.setattr(jury.blackboard, "store_evidence", store_evidence)
+    monkeypatch.setattr(jury.llm_clients, "generate_gemini_flash", generate)
+    state = {
+        "case_id": "c1", "current_round": 2,
+        "selected_claims": [{"text": "Claim A"}],
+        "trial_transcript": [{"agent": "prosecutor", "argument_text": "It is fake."}],
+        "jury_members": [{"juror_id": i, "model_name": "gemini-flash", "current_lean": 50, "notes": {}} for i in (1, 2)],
+    }
+
+    asyncio.run(jury.jury_update(state))
+    assert [n["round"] for n in notes["jury_notes/juror_1"]] == [2]
+    assert len(notes["jury_notes/juror_2"]) == 1
+    assert all(j["current_lean"] == 30 and j["notes"]["current_lean"] == 30 for j in state["jury_members"])
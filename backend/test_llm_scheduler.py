@@ -0,0 +1,125 @@
+"""
+Unit tests for the LLM admission scheduler
+"""
+import asyncio
+from utils.llm_scheduler import LLMScheduler, Priority, TokenBucket, is_rate_limit_error
+
+
+def make_scheduler(max_concurrency=1, rpm=6000, tpm=10_000_000):
+    return LLMScheduler({"gemini": {"max_concurrency": max_concurrency, "rpm": rpm, "tpm": tpm}})
+
+
+def test_interactive_runs_before_background():
+    """Queued interactive calls are admitted ahead of earlier background calls"""
+    scheduler = make_scheduler(max_concurrency=1)
+    order = []
+
+    async def call(name, priority):
+        async with scheduler.slot("gemini", priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        async with scheduler.slot("gemini", Priority.DEFAULT):
+            tasks = [asyncio.create_task(call("report", Priority.BACKGROUND))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(call("prosecutor", Priority.INTERACTIVE)))
+            await asyncio.sleep(0)
+            assert scheduler.metrics()["gemini"]["queue_depth"] == 2
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["prosecutor", "report"]
+
+
+def test_concurrency_cap():
+    """No more than max_concurrency calls are in flight at once"""
+    scheduler = make_scheduler(max_concurrency=2)
+    peak = 0
+    active = 0
+
+    async def call():
+        nonlocal peak, active
+        async with scheduler.slot("gemini"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run():
+        await asyncio.gather(*[call() for _ in range(6)])
+
+    asyncio.run(run())
+    assert peak == 2
+    assert scheduler.metrics()["gemini"]["admitted"] == 6
+
+
+def test_token_bucket_delay():
+    """Bucket reports how long until enough tokens refill"""
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.delay(1) == 0
+    bucket.consume(60)
+    assert 0.9 < bucket.delay(1) <= 1.0
+
+
+def test_backoff_holds_admissions():
+    """A 429 backoff drains the request budget"""
+    scheduler = make_scheduler(rpm=60)
+
+    async def run():
+        await scheduler.backoff("gemini", 5)
+
+    asyncio.run(run())
+    limiter = scheduler.limiters["gemini"]
+    assert limiter.rate_limited == 1
+    assert limiter.requests.delay(1) >= 5
+
+
+def test_unknown_provider_is_unlimited():
+    scheduler = make_scheduler()
+
+    async def run():
+        async with scheduler.slot("not-configured"):
+            return True
+
+    assert asyncio.run(run())
+
+
+def test_rate_limit_detection():
+    class Err(Exception):
+        status_code = 429
+
+    assert is_rate_limit_error(Err())
+    assert is_rate_limit_error(Exception("429 RESOURCE_EXHAUSTED"))
+    assert not is_rate_limit_error(Exception("invalid argument"))
+
+
+def test_stream_setup_backs_off_on_rate_limit(monkeypatch):
+    from types import SimpleNamespace
+    from utils.llm_clients import llm_clients
+
+    scheduler = make_scheduler()
+    opened = []
+
+    async def chunks():
+        for text in ("Hel", "lo"):
+            yield SimpleNamespace(text=text)
+
+    async def generate_content_stream(model, contents, config):
+        opened.append(contents)
+        if len(opened) == 1:
+            raise Exception("429 RESOURCE_EXHAUSTED")
+        return chunks()
+
+    monkeypatch.setattr(llm_clients, "scheduler", scheduler)
+    monkeypatch.setattr(llm_clients, "client", SimpleNamespace(aio=SimpleNamespace(
+        models=SimpleNamespace(generate_content_stream=generate_content_stream))))
+    monkeypatch.setattr("utils.llm_clients.Config.LLM_RATE_LIMIT_BACKOFF", 0.01)
+
+    async def run():
+        return [text async for text in llm_clients.stream_gemini_pro("prompt")]
+
+    # Retried on Gemini after the backoff instead of failing over to Groq
+    assert asyncio.run(run()) == ["Hel", "lo"]
+    assert len(opened) == 2
+    assert scheduler.limiters["gemini"].rate_limited == 1
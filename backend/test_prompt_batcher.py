@@ -0,0 +1,165 @@
+"""
+Tests for batched prompting (PromptBatcher and the batched agents)
+"""
+import asyncio
+import json
+from agents import claim_extractor as extractor_module
+from agents import fasttrack_verdict as verdict_module
+from utils.llm_clients import llm_clients
+from utils.prompt_batcher import PromptBatcher, batching_enabled, format_items, parse_items
+from config.settings import Config
+from utils.response_cache import MemoryLRUTier, ResponseCache
+
+
+def test_format_and_parse_items():
+    prompt = format_items(["first", "second"])
+    assert prompt == "[item_1]\nfirst\n[/item_1]\n\n[item_2]\nsecond\n[/item_2]"
+    assert parse_items('Sure: {"item_2": [], "item_1": [1]} done', 3) == [[1], [], None]
+    assert parse_items("not json", 2) == [None, None]
+
+
+def test_coalesces_concurrent_submits_and_retries_invalid_items_alone():
+    batches, singles = [], []
+
+    async def run_batch(payloads):
+        batches.append(list(payloads))
+        # The model drops one item from its answer
+        return [None if p == "c" else p.upper() for p in payloads]
+
+    async def run_one(payload):
+        singles.append(payload)
+        return payload.upper() + "!"
+
+    batcher = PromptBatcher("test", run_batch, run_one, batch_size=3, max_wait=0.05)
+
+    async def run():
+        return await asyncio.gather(*[batcher.submit(p) for p in "abcde"])
+
+    assert asyncio.run(run()) == ["A", "B", "C!", "D", "E"]
+    # Full batch sent at once, the remainder after max_wait
+    assert batches == [["a", "b", "c"], ["d", "e"]]
+    assert singles == ["c"]
+    assert batcher.stats()["retried_individually"] == 1
+    assert batcher.stats()["avg_batch_size"] == 2.5
+
+
+def test_failed_batch_and_lone_item_use_the_single_prompt():
+    async def run_batch(payloads):
+        raise RuntimeError("bad gateway")
+
+    async def run_one(payload):
+        if payload == "boom":
+            raise ValueError("single failed too")
+        return payload * 2
+
+    batcher = PromptBatcher("test", run_batch, run_one, batch_size=4, max_wait=0.01)
+
+    async def run():
+        results = await asyncio.gather(batcher.submit("x"), batcher.submit("boom"), return_exceptions=True)
+        lone = await batcher.submit("y")
+        return results, lone
+
+    (ok, failed), lone = asyncio.run(run())
+    assert ok == "xx" and isinstance(failed, ValueError)
+    assert lone == "yy"
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["batch_failures"] == 1
+
+
+def _install_model(monkeypatch, answer, cache=None):
+    prompts = []
+
+    async def generate(prompt, temperature=0.7, priority=None, stage=None):
+        prompts.append(prompt)
+        return answer(prompt)
+
+    monkeypatch.setattr(llm_clients, "generate_gemini_pro", generate)
+    monkeypatch.setattr(llm_clients, "cache", cache or ResponseCache([], {}, enabled=False))
+    return prompts
+
+
+def _run_batched(monkeypatch, batcher, agent, states):
+    monkeypatch.setattr(batcher, "batch_size", len(states))
+
+    async def one(state):
+        batching_enabled.set(True)
+        return await agent(state)
+
+    async def run():
+        return await asyncio.gather(*[one(state) for state in states])
+    return asyncio.run(run())
+
+
+def test_batched_claim_extraction_validates_each_item(monkeypatch):
+    def answer(prompt):
+        if "independent pieces of content" in prompt:
+            # item_2 is malformed (claim without text)
+            return json.dumps({
+                "item_1": [{"text": "Alpha is true", "priority": 80}],
+                "item_2": [{"category": "factual"}],
+                "item_3": [],
+            })
+        return '[{"text": "Beta retried", "category": "factual", "verifiability_score": 70, "priority": 60}]'
+
+    prompts = _install_model(monkeypatch, answer)
+    states = [{"input_type": "text", "raw_input": text} for text in ("alpha post", "beta post", "gamma post")]
+    _run_batched(monkeypatch, extractor_module.extraction_batcher, extractor_module.claim_extractor, states)
+
+    assert len(prompts) == 2  # one batch, one individual retry
+    assert "[item_3]\ngamma post\n[/item_3]" in prompts[0]
+    assert "Content: beta post" in prompts[1]
+    assert states[0]["claims"] == [{"text": "Alpha is true", "category": "factual", "verifiability_score": 50, "priority": 80}]
+    assert states[1]["claims"][0]["text"] == "Beta retried"
+    assert states[2]["claims"] == []
+
+
+def test_batched_verdicts(monkeypatch):
+    verdict = {"confidence_score": 30, "verdict_category": "Likely False", "top_3_reasons": ["r"], "key_evidence": "e"}
+
+    def answer(prompt):
+        assert "independent submissions" in prompt
+        return json.dumps({"item_1": verdict, "item_2": {**verdict, "confidence_score": 85, "verdict_category": "Verified True"}})
+
+    _install_model(monkeypatch, answer)
+
+    async def no_evidence(*args, **kwargs):
+        return []
+    monkeypatch.setattr(verdict_module.blackboard, "query_namespace", no_evidence)
+    monkeypatch.setattr(verdict_module.claim_index, "record_verdict", lambda claim, score: None)
+
+    states = [{"case_id": f"c{i}", "selected_claims": [{"text": f"claim {i}"}]} for i in range(2)]
+    _run_batched(monkeypatch, verdict_module.verdict_batcher, verdict_module.fasttrack_verdict, states)
+    assert [s["aggregated_verdict"]["category"] for s in states] == ["Likely False", "Verified True"]
+    assert states[1]["aggregated_verdict"]["score"] == 85
+
+
+def test_batched_answers_are_not_served_to_single_prompts(monkeypatch):
+    verdict = {"confidence_score": 30, "verdict_category": "Likely False", "top_3_reasons": ["r"], "key_evidence": "e"}
+
+    def answer(prompt):
+        if "independent submissions" in prompt:
+            return json.dumps({"item_1": verdict, "item_2": verdict})
+        return '{"confidence_score": 90, "verdict_category": "Verified True", "extra": 1}'
+
+    cache = ResponseCache([MemoryLRUTier()], Config.RESPONSE_CACHE_STAGE_TTLS)
+    prompts = _install_model(monkeypatch, answer, cache)
+
+    async def no_evidence(*args, **kwargs):
+        return []
+    monkeypatch.setattr(verdict_module.blackboard, "query_namespace", no_evidence)
+    monkeypatch.setattr(verdict_module.claim_index, "record_verdict", lambda claim, score: None)
+
+    states = [{"case_id": f"c{i}", "selected_claims": [{"text": f"claim {i}"}]} for i in range(2)]
+    _run_batched(monkeypatch, verdict_module.verdict_batcher, verdict_module.fasttrack_verdict, states)
+    # A repeat in a bulk run reuses the batched answer
+    _run_batched(monkeypatch, verdict_module.verdict_batcher, verdict_module.fasttrack_verdict, states[:1] * 2)
+    assert len(prompts) == 1
+    single_prompt = verdict_module.FASTTRACK_VERDICT_PROMPT.format(claims="- claim 0", investigator_evidence="[]")
+    assert asyncio.run(llm_clients.cache.get("gemini-2.0-flash", single_prompt, 0.3, "fasttrack_verdict")) is None
+
+    # An interactive run of the same item asks the single prompt; its answer
+    # is normalized like a batched one
+    single = {"case_id": "c0", "selected_claims": [{"text": "claim 0"}]}
+    asyncio.run(verdict_module.fasttrack_verdict(single))
+    assert len(prompts) == 2
+    assert single["aggregated_verdict"]["category"] == "Verified True"
+    assert single["aggregated_verdict"]["individual_verdicts"][0]["top_3_reasons"] == []
@@ -0,0 +1,90 @@
+"""
+Tests for the content-addressed remote file registry (offline provider)
+"""
+import asyncio
+from utils.remote_files import RemoteFileRegistry, InMemoryFileProvider, file_sha256
+from utils.file_processing import ProcessingTracker
+
+
+def make_clip(tmp_path, data: bytes = b"video bytes", name: str = "clip.mp4") -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_same_content_is_uploaded_once_across_cases(tmp_path):
+    async def run():
+        provider = InMemoryFileProvider()
+        registry = RemoteFileRegistry(provider)
+        first = make_clip(tmp_path)
+        copy = make_clip(tmp_path, name="copy.mp4")
+        async with registry.use(first) as a:
+            async with registry.use(copy) as b:
+                assert a.name == b.name
+                assert registry.entries[file_sha256(first)]["refs"] == 2
+        assert provider.uploads == 1
+        assert registry.stats()["reused"] == 1
+        # Releasing does not delete; the file stays for the next case
+        assert registry.entries[file_sha256(first)]["refs"] == 0 and provider.deletes == 0
+    asyncio.run(run())
+
+
+def test_concurrent_acquires_share_one_upload_and_wait_for_processing(tmp_path):
+    async def run():
+        provider = InMemoryFileProvider(processing_seconds=0.05)
+        registry = RemoteFileRegistry(provider, tracker=ProcessingTracker(provider, initial_delay=0.01))
+        path = make_clip(tmp_path)
+        files = await asyncio.gather(*[registry.acquire(path, "h") for _ in range(4)])
+        assert {f.name for f in files} == {files[0].name}
+        assert all(f.state == "ACTIVE" for f in files)
+        assert provider.uploads == 1 and registry.coalesced == 3
+        assert registry.entries["h"]["refs"] == 4
+    asyncio.run(run())
+
+
+def test_janitor_deletes_only_idle_unreferenced_files(tmp_path):
+    async def run():
+        provider = InMemoryFileProvider()
+        registry = RemoteFileRegistry(provider, idle_seconds=10)
+        await registry.acquire(make_clip(tmp_path, b"a", "a.mp4"), "held")
+        async with registry.use(make_clip(tmp_path, b"b", "b.mp4"), "idle"):
+            pass
+        for entry in registry.entries.values():
+            entry["last_used"] -= 60
+        assert await registry.sweep() == 1
+        assert set(registry.entries) == {"held"}
+        assert provider.deletes == 1 and len(provider.files) == 1
+    asyncio.run(run())
+
+
+def test_files_near_expiry_are_reuploaded(tmp_path):
+    async def run():
+        provider = InMemoryFileProvider(ttl_seconds=300)
+        registry = RemoteFileRegistry(provider, expiry_margin_seconds=600)
+        path = make_clip(tmp_path)
+        async with registry.use(path, "h"):
+            pass
+        async with registry.use(path, "h"):
+            pass
+        assert provider.uploads == 2
+        # Expiring, unreferenced entries are dropped by the janitor
+        assert await registry.sweep() == 1
+    asyncio.run(run())
+
+
+def test_failed_upload_is_not_registered(tmp_path):
+    async def run():
+        class FailingProvider(InMemoryFileProvider):
+            async def upload(self, path):
+                raise RuntimeError("quota")
+
+        registry = RemoteFileRegistry(FailingProvider())
+        path = make_clip(tmp_path)
+        for _ in range(2):
+            try:
+                await registry.acquire(path, "h")
+                assert False, "expected failure"
+            except RuntimeError:
+                pass
+        assert registry.entries == {} and registry._inflight == {}
+    asyncio.run(run())
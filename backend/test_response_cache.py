@@ -0,0 +1,81 @@
+"""
+Unit tests for the LLM response cache
+"""
+import asyncio
+import time
+from utils.response_cache import MemoryLRUTier, ResponseCache, SQLiteTier
+
+TTLS = {"claim_extractor": 60, "fasttrack_verdict": 60}
+
+
+def make_cache(tmp_path, **memory_kwargs):
+    tiers = [MemoryLRUTier(**memory_kwargs), SQLiteTier(str(tmp_path / "cache.sqlite3"))]
+    return ResponseCache(tiers, TTLS)
+
+
+def test_hit_after_set(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def run():
+        assert await cache.get("gemini", "prompt", 0.3, "claim_extractor") is None
+        await cache.set("gemini", "prompt", 0.3, "claim_extractor", "[claims]")
+        return await cache.get("gemini", "prompt", 0.3, "claim_extractor")
+
+    assert asyncio.run(run()) == "[claims]"
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["by_stage"]["claim_extractor"] == {"hits": 1, "misses": 1}
+
+
+def test_key_includes_model_temperature_and_stage():
+    base = ResponseCache.make_key("gemini", "p", 0.3, "claim_extractor")
+    assert base != ResponseCache.make_key("gemini", "p", 0.5, "claim_extractor")
+    assert base != ResponseCache.make_key("groq", "p", 0.3, "claim_extractor")
+    assert base != ResponseCache.make_key("gemini", "p", 0.3, "fasttrack_verdict")
+
+
+def test_uncached_stage_is_ignored(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def run():
+        await cache.set("gemini", "prompt", 0.7, "prosecutor", "argument")
+        return await cache.get("gemini", "prompt", 0.7, "prosecutor")
+
+    assert asyncio.run(run()) is None
+    assert cache.stats()["misses"] == 0
+
+
+def test_disk_tier_survives_restart_and_promotes(tmp_path):
+    async def write():
+        await make_cache(tmp_path).set("gemini", "p", 0.3, "claim_extractor", "value")
+
+    asyncio.run(write())
+    fresh = make_cache(tmp_path)
+    assert asyncio.run(fresh.get("gemini", "p", 0.3, "claim_extractor")) == "value"
+    assert fresh.stats()["tier_hits"] == {"memory": 0, "sqlite": 1}
+    assert fresh.tiers[0].stats()["entries"] == 1
+
+
+def test_memory_lru_eviction_and_ttl():
+    tier = MemoryLRUTier(max_entries=2)
+    tier.set("a", "1", "s", 60)
+    tier.set("b", "2", "s", 60)
+    tier.get("a")
+    tier.set("c", "3", "s", 60)
+    assert tier.get("b") is None
+    assert tier.get("a") == "1"
+    assert tier.stats()["evictions"] == 1
+
+    tier.set("short", "x", "s", 0.01)
+    time.sleep(0.02)
+    assert tier.get("short") is None
+
+
+def test_sqlite_size_bound(tmp_path):
+    tier = SQLiteTier(str(tmp_path / "bounded.sqlite3"), max_bytes=1000)
+    for i in range(20):
+        tier.set(f"k{i}", "x" * 100, "s", 60)
+    stats = tier.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["evictions"] > 0
+    assert tier.get("k19") == "x" * 100
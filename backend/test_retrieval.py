@@ -0,0 +1,52 @@
+"""
+Unit tests for blackboard retrieval
+"""
+import time
+from utils.retrieval import BM25Index, HashingEmbedder, NamespaceIndex, document_text, tokenize
+
+
+def test_tokenize_and_document_text():
+    assert tokenize("The Moon IS made of cheese!") == ["moon", "made", "cheese"]
+    item = {"source_url": "https://nasa.gov", "text": "Lunar rock", "credibility_score": 9, "tags": ["apollo"]}
+    assert "Lunar rock" in document_text(item) and "apollo" in document_text(item)
+
+
+def test_bm25_prefers_matching_documents():
+    index = BM25Index()
+    index.add("stock market fell on monday")
+    index.add("vaccine trial results published")
+    index.add("vaccine microchip rumor debunked by vaccine experts")
+    scores = index.scores("vaccine microchip")
+    assert max(scores, key=scores.get) == 2
+    assert 0 not in scores
+
+
+def test_search_ranks_then_pads_in_insertion_order():
+    index = NamespaceIndex()
+    for text in ["weather report", "election fraud claim debunked", "sports scores", "recipe"]:
+        index.add({"text": text})
+    results = index.search("election fraud", top_k=3)
+    assert results[0]["text"] == "election fraud claim debunked"
+    assert [r["text"] for r in results[1:]] == ["weather report", "sports scores"]
+    assert len(index.search("nothing matches", top_k=10)) == 4
+
+
+def test_dense_scores_related_text_higher():
+    embedder = HashingEmbedder(dim=256)
+    query = embedder.embed("moon landing hoax")
+    assert embedder.embed("the moon landing was a hoax") @ query > embedder.embed("tax policy change") @ query
+
+    index = NamespaceIndex(dense=True)
+    index.add({"text": "tax policy change"})
+    index.add({"text": "moon landing hoax evidence"})
+    assert index.search("moon landing", top_k=1)[0]["text"] == "moon landing hoax evidence"
+
+
+def test_search_scales_to_thousands_of_items():
+    index = NamespaceIndex(dense=True)
+    for i in range(5000):
+        index.add({"text": f"source {i} reports item {i % 97} about topic {i % 13}", "credibility_score": i % 10})
+    start = time.perf_counter()
+    for _ in range(20):
+        index.search("topic 7 item 42", top_k=5)
+    assert (time.perf_counter() - start) / 20 < 0.05
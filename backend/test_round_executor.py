@@ -0,0 +1,209 @@
+"""
+Unit tests for the pipelined courtroom round
+"""
+import asyncio
+import time
+import round_executor
+
+
+def _install_stand_ins(monkeypatch, llm_latency, tts_latency, log):
+    def turn(agent):
+        async def run(state):
+            log.append(f"{agent}_llm_start")
+            await asyncio.sleep(llm_latency)
+            state["trial_transcript"].append({
+                "agent": agent, "round": state["current_round"],
+                "argument_text": f"{agent} argument", "confidence_score": 60
+            })
+            return state
+        return run
+
+    async def generate_speech(text, agent):
+        log.append(f"{agent}_tts_start")
+        await asyncio.sleep(tts_latency[agent])
+        return f"/tmp/{agent}.mp3"
+
+    monkeypatch.setattr(round_executor.Config, "STREAM_ARGUMENTS", False)
+    monkeypatch.setattr(round_executor.Config, "TTS_CHUNKED", False)
+    monkeypatch.setattr(round_executor, "prosecutor_turn", turn("prosecutor"))
+    monkeypatch.setattr(round_executor, "defendant_turn", turn("defendant"))
+    monkeypatch.setattr(round_executor.tts_service, "generate_speech", generate_speech)
+
+
+def _collect(state):
+    async def run():
+        return [event async for event in round_executor.run_round(state)]
+    return asyncio.run(run())
+
+
+def test_tts_overlaps_defendant_turn(monkeypatch):
+    log = []
+    _install_stand_ins(monkeypatch, 0.3, {"prosecutor": 0.15, "defendant": 0.15}, log)
+    state = {"case_id": "c1", "current_round": 1, "trial_transcript": []}
+
+    start = time.perf_counter()
+    events = _collect(state)
+    elapsed = time.perf_counter() - start
+
+    # prosecutor LLM, then (defendant LLM || prosecutor TTS), then defendant TTS:
+    # 0.75s pipelined vs 0.9s sequential
+    assert elapsed < 0.85
+    assert log[0] == "prosecutor_llm_start" and log[-1] == "defendant_tts_start"
+    assert set(log[1:3]) == {"prosecutor_tts_start", "defendant_llm_start"}
+    assert [(e["phase"], e["agent"]) for e in events] == [
+        ("trial", "prosecutor"), ("trial_audio", "prosecutor"),
+        ("trial", "defendant"), ("trial_audio", "defendant"),
+    ]
+    assert events[0]["audio_url"] is None
+    assert events[1]["audio_url"] == "/api/trial/c1/audio/prosecutor.mp3"
+    assert len(state["trial_transcript"]) == 2
+
+
+def test_audio_events_stay_in_argument_order(monkeypatch):
+    # Prosecutor audio is slow: defendant's argument is sent first, but its
+    # audio must not overtake the prosecutor's
+    _install_stand_ins(monkeypatch, 0.05, {"prosecutor": 0.3, "defendant": 0.01}, [])
+    events = _collect({"case_id": "c1", "current_round": 1, "trial_transcript": []})
+    assert [(e["phase"], e["agent"]) for e in events] == [
+        ("trial", "prosecutor"), ("trial", "defendant"),
+        ("trial_audio", "prosecutor"), ("trial_audio", "defendant"),
+    ]
+
+
+def test_streaming_emits_deltas_then_the_complete_argument(monkeypatch):
+    responses = {
+        "prosecutor": '{"argument": "It is \\"fake\\".", "confidence_score": 80, "evidence_to_reveal": []}',
+        "defendant": 'Sure! {"argument": "It is real.", "confidence_score": 40, "evidence_to_reveal": []}',
+    }
+
+    async def build_prompt(agent, state):
+        return agent
+
+    async def stream_gemini_pro(prompt, temperature=0.7, priority=None):
+        text = responses[prompt]
+        for i in range(0, len(text), 5):
+            await asyncio.sleep(0)
+            yield text[i:i + 5]
+
+    async def generate_speech(text, agent):
+        return None
+
+    monkeypatch.setattr(round_executor.Config, "STREAM_ARGUMENTS", True)
+    monkeypatch.setattr(round_executor.Config, "TTS_CHUNKED", False)
+    monkeypatch.setattr(round_executor, "build_prosecutor_prompt", lambda state: build_prompt("prosecutor", state))
+    monkeypatch.setattr(round_executor, "build_defendant_prompt", lambda state: build_prompt("defendant", state))
+    monkeypatch.setattr(round_executor.llm_clients, "stream_gemini_pro", stream_gemini_pro)
+    monkeypatch.setattr(round_executor.tts_service, "generate_speech", generate_speech)
+
+    state = {
+        "case_id": "c1", "current_round": 1, "trial_transcript": [],
+        "prosecutor_revealed_evidence": [], "defendant_revealed_evidence": [],
+    }
+    events = _collect(state)
+
+    prosecutor_deltas = "".join(e["delta"] for e in events if e["phase"] == "trial_delta" and e["agent"] == "prosecutor")
+    assert prosecutor_deltas == 'It is "fake".'
+    first_trial = next(i for i, e in enumerate(events) if e["phase"] == "trial")
+    assert all(e["phase"] == "trial_delta" for e in events[:first_trial])
+    assert events[first_trial]["argument"] == 'It is "fake".'
+    assert [(t["agent"], t["confidence_score"]) for t in state["trial_transcript"]] == [("prosecutor", 80), ("defendant", 40)]
+
+
+def _install_speculation(monkeypatch, refined: str, log):
+    draft = '{"argument": "Drafted defense.", "confidence_score": 55, "evidence_to_reveal": []}'
+
+    async def gather_draft_evidence(state):
+        return {"investigator": [], "prosecutor": []}
+
+    def build_defendant_draft_prompt(state, evidence):
+        return "draft prompt"
+
+    async def generate_gemini_pro(prompt, temperature=0.7, priority=None, stage=None):
+        log.append("draft_start")
+        await asyncio.sleep(0.3)
+        return draft
+
+    async def generate_gemini_flash(prompt, temperature=0.7, priority=None, stage=None):
+        log.append("refine_start")
+        assert "Drafted defense." in prompt and "prosecutor argument" in prompt and "draft: 55" in prompt
+        await asyncio.sleep(0.05)
+        return refined
+
+    monkeypatch.setattr(round_executor.Config, "SPECULATIVE_DEFENSE", True)
+    monkeypatch.setattr(round_executor, "gather_draft_evidence", gather_draft_evidence)
+    monkeypatch.setattr(round_executor, "build_defendant_draft_prompt", build_defendant_draft_prompt)
+    monkeypatch.setattr(round_executor.llm_clients, "generate_gemini_pro", generate_gemini_pro)
+    monkeypatch.setattr(round_executor.llm_clients, "generate_gemini_flash", generate_gemini_flash)
+
+
+def test_speculative_defense_drafts_alongside_the_prosecutor(monkeypatch):
+    log = []
+    _install_stand_ins(monkeypatch, 0.3, {"prosecutor": 0.01, "defendant": 0.01}, log)
+    _install_speculation(monkeypatch, '{"opening": "The prosecutor ignores the report.", "confidence_score": 60}', log)
+    state = {"case_id": "c1", "current_round": 1, "trial_transcript": [], "defendant_revealed_evidence": []}
+    before = round_executor.speculation_metrics.modes["speculative"]["rounds"]
+
+    start = time.perf_counter()
+    events = _collect(state)
+    elapsed = time.perf_counter() - start
+
+    # prosecutor || draft (0.3s), then refine (0.05s): ~0.35s vs 0.6s serial
+    assert elapsed < 0.5
+    assert set(log[:2]) == {"prosecutor_llm_start", "draft_start"}
+    assert "defendant_llm_start" not in log
+    trial_events = [e for e in events if e["phase"] == "trial"]
+    assert trial_events[1]["argument"] == "The prosecutor ignores the report. Drafted defense."
+    assert trial_events[1]["confidence"] == 60
+    assert round_executor.speculation_metrics.modes["speculative"]["rounds"] == before + 1
+
+
+def test_speculative_defense_falls_back_to_the_serial_turn(monkeypatch):
+    log = []
+    _install_stand_ins(monkeypatch, 0.05, {"prosecutor": 0.01, "defendant": 0.01}, log)
+    _install_speculation(monkeypatch, "not json", log)
+    monkeypatch.setattr(round_executor.Config, "SPECULATIVE_DEFENSE_FALLBACK", "serial")
+    state = {"case_id": "c1", "current_round": 1, "trial_transcript": [], "defendant_revealed_evidence": []}
+    fallbacks = round_executor.speculation_metrics.fallbacks
+
+    events = _collect(state)
+    assert "defendant_llm_start" in log
+    assert [e["argument"] for e in events if e["phase"] == "trial"] == ["prosecutor argument", "defendant argument"]
+    assert round_executor.speculation_metrics.fallbacks == fallbacks + 1
+
+
+def test_draft_reads_the_evidence_from_before_the_prosecutor_turn(monkeypatch):
+    from agents import defendant
+    board = {"investigator": [{"text": "report"}], "prosecutor": []}
+    draft_prompts = []
+
+    async def query_namespace(case_id, namespace, query, top_k=5):
+        await asyncio.sleep(0.1)
+        return list(board[namespace])
+
+    async def prosecutor_turn(state):
+        await asyncio.sleep(0.05)
+        # Stored mid-turn, after the draft has started
+        board["prosecutor"].append({"text": "this round's prosecution"})
+        state["trial_transcript"].append({
+            "agent": "prosecutor", "round": 1, "argument_text": "prosecutor argument", "confidence_score": 60
+        })
+
+    _install_stand_ins(monkeypatch, 0.01, {"prosecutor": 0.01, "defendant": 0.01}, [])
+    _install_speculation(monkeypatch, '{"opening": "Not so.", "confidence_score": 50}', [])
+    generate = round_executor.llm_clients.generate_gemini_pro
+
+    async def generate_gemini_pro(prompt, **kwargs):
+        draft_prompts.append(prompt)
+        await asyncio.sleep(0.1)
+        return await generate(prompt, **kwargs)
+
+    monkeypatch.setattr(defendant.blackboard, "query_namespace", query_namespace)
+    monkeypatch.setattr(round_executor, "gather_draft_evidence", defendant.gather_draft_evidence)
+    monkeypatch.setattr(round_executor, "build_defendant_draft_prompt", defendant.build_defendant_draft_prompt)
+    monkeypatch.setattr(round_executor, "prosecutor_turn", prosecutor_turn)
+    monkeypatch.setattr(round_executor.llm_clients, "generate_gemini_pro", generate_gemini_pro)
+
+    _collect({"case_id": "c1", "current_round": 1, "trial_transcript": [], "defendant_revealed_evidence": [],
+              "selected_claims": [{"text": "Claim A"}]})
+    assert "report" in draft_prompts[0]
+    assert "this round's prosecution" not in draft_prompts[0]
@@ -4,7 +4,9 @@ Simple test script to verify No Cap Your Honor setup
 """
 
 import asyncio
-from workflow import create_initial_state, trial_graph
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import Command
+from workflow import create_initial_state, create_trial_graph
 
 async def test_trial():
     """Run a simple test trial"""
@@ -22,48 +24,46 @@ async def test_trial():
     # Run the workflow
     print("🔄 Running trial workflow...\n")
     
+    trial_graph = create_trial_graph(InMemorySaver())
+    config = {"configurable": {"thread_id": state["case_id"]}}
+    graph_input = state
+    
     try:
-        async for event in trial_graph.astream(state):
-            node_name = list(event.keys())[0]
-            node_state = event[node_name]
-            
-            if node_name == "claim_extractor":
-                claims = node_state.get('claims', [])
-                print(f"📋 Extracted {len(claims)} claims")
-                for i, claim in enumerate(claims, 1):
-                    print(f"   {i}. {claim.get('text', 'N/A')}")
-                print()
-            
-            elif node_name == "investigator":
-                evidence_count = len(node_state.get('investigator_evidence', []))
-                print(f"🔍 Gathered {evidence_count} pieces of evidence\n")
-            
-            elif node_name == "prosecutor_turn":
-                round_num = node_state['current_round']
-                conf = node_state.get('prosecutor_confidence', 0)
-                print(f"⚖️  Round {round_num} - Prosecutor (Confidence: {conf}%)")
-                transcript = node_state.get('trial_transcript', [])
-                if transcript:
-                    latest = transcript[-1]
-                    print(f"   {latest['argument_text'][:150]}...\n")
-            
-            elif node_name == "defendant_turn":
-                conf = node_state.get('defendant_confidence', 0)
-                print(f"🛡️  Round {node_state['current_round']} - Defendant (Confidence: {conf}%)")
-                transcript = node_state.get('trial_transcript', [])
-                if transcript:
-                    latest = transcript[-1]
-                    print(f"   {latest['argument_text'][:150]}...\n")
-            
-            elif node_name == "verdict_aggregator":
-                verdict = node_state.get('aggregated_verdict')
-                if verdict:
-                    print(f"\n🎯 VERDICT: {verdict['category']}")
-                    print(f"📊 Score: {verdict['score']}/100")
-                    print(f"📝 {verdict['summary']}\n")
+        while graph_input is not None:
+            async for event in trial_graph.astream(graph_input, config):
+                node_name = list(event.keys())[0]
+                node_state = event[node_name]
+                
+                if node_name == "claim_extractor":
+                    claims = node_state.get('claims', [])
+                    print(f"📋 Extracted {len(claims)} claims")
+                    for i, claim in enumerate(claims, 1):
+                        print(f"   {i}. {claim.get('text', 'N/A')}")
+                    print()
+                
+                elif node_name == "investigator":
+                    evidence_count = len(node_state.get('investigator_evidence', []))
+                    print(f"🔍 Gathered {evidence_count} pieces of evidence\n")
+                
+                elif node_name == "trial_round":
+                    round_num = node_state['current_round']
+                    for latest in node_state.get('trial_transcript', [])[-2:]:
+                        print(f"⚖️  Round {round_num} - {latest['agent'].title()} (Confidence: {latest['confidence_score']}%)")
+                        print(f"   {latest['argument_text'][:150]}...\n")
+                
+                elif node_name == "verdict_aggregator":
+                    verdict = node_state.get('aggregated_verdict')
+                    if verdict:
+                        print(f"\n🎯 VERDICT: {verdict['category']}")
+                        print(f"📊 Score: {verdict['score']}/100")
+                        print(f"📝 {verdict['summary']}\n")
+                
+                elif node_name == "cleanup":
+                    print("🧹 Cleaned up case data")
             
-            elif node_name == "cleanup":
-                print("🧹 Cleaned up case data")
+            # Paused at a judgment checkpoint: answer "neutral" and resume
+            snapshot = await trial_graph.aget_state(config)
+            graph_input = Command(resume="neutral") if snapshot.next else None
         
         print("\n✅ Test trial completed successfully!")
         
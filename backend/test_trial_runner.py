@@ -0,0 +1,205 @@
+"""
+Tests for background trial runs and the SSE event log endpoint
+"""
+import asyncio
+import json
+from fastapi.testclient import TestClient
+import main
+import trial_runner
+from utils.trial_store import trial_store
+
+
+def _events(body: str):
+    """(id, payload) pairs from an SSE body"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if "data" in fields:
+            events.append((int(fields["id"]), json.loads(fields["data"])))
+    return events
+
+
+def _install_stand_in(monkeypatch):
+    runs = []
+
+    async def run(state):
+        # Called again whenever someone connects; only runs with work count
+        if not runs:
+            runs.append("round 1")
+            yield {"phase": "trial", "agent": "prosecutor", "round": 1}
+            yield {"phase": "awaiting_judgment", "round": 1}
+            return
+        judgement = await trial_store.pop_judgment(state["case_id"], timeout=0)
+        if judgement is None:
+            return
+        runs.append("round 2")
+        yield {"phase": "trial", "agent": "prosecutor", "round": 2, "after": judgement}
+        yield {"phase": "complete", "status": "finished"}
+
+    async def noop(*args):
+        return None
+
+    monkeypatch.setattr(trial_runner.courtroom_runner, "run", run)
+    monkeypatch.setattr(main.courtroom_runner, "start", noop)
+    monkeypatch.setattr(main.courtroom_runner, "close", noop)
+    return runs
+
+
+def test_reconnects_replay_from_last_event_id_and_viewers_share_one_run(monkeypatch):
+    runs = _install_stand_in(monkeypatch)
+    with TestClient(main.app) as client:
+        case_id = client.post("/api/trial/start", json={"content": "Viral post"}).json()["case_id"]
+        url = f"/api/trial/{case_id}/stream"
+
+        first = client.get(url)
+        assert first.text.startswith("retry: ")
+        assert _events(first.text) == [
+            (1, {"phase": "trial", "agent": "prosecutor", "round": 1}),
+            (2, {"phase": "awaiting_judgment", "round": 1}),
+        ]
+
+        # Suspended: a caught-up viewer gets nothing new (and no 409)
+        assert _events(client.get(url, headers={"Last-Event-ID": "2"}).text) == []
+
+        client.post(f"/api/trial/{case_id}/judgement", json={"case_id": case_id, "judgement": "plausible"})
+        resumed = _events(client.get(f"{url}?last_event_id=2").text)
+        assert [event_id for event_id, _ in resumed] == [3, 4]
+        assert resumed[0][1]["after"] == "plausible"
+
+        # A late viewer replays the whole trial without re-running it
+        replay = _events(client.get(url).text)
+        assert [event_id for event_id, _ in replay] == [1, 2, 3, 4]
+        assert replay[-1][1]["phase"] == "complete"
+        assert client.get(url, headers={"Last-Event-ID": "abc"}).status_code == 400
+
+    assert runs == ["round 1", "round 2"]
+
+
+def test_fasttrack_runs_once_in_the_background(monkeypatch):
+    _install_stand_in(monkeypatch)
+    runs = []
+
+    async def run_fasttrack(state):
+        runs.append(state["case_id"])
+        yield {"phase": "claim_extraction", "status": "running"}
+        state["aggregated_verdict"] = {"score": 20}
+        yield {"phase": "verdict", "verdict": state["aggregated_verdict"]}
+
+    monkeypatch.setattr(trial_runner, "run_fasttrack", run_fasttrack)
+    with TestClient(main.app) as client:
+        case_id = client.post("/api/trial/start", json={"content": "Viral post", "mode": "fasttrack"}).json()["case_id"]
+        url = f"/api/trial/{case_id}/stream"
+        assert [e["phase"] for _, e in _events(client.get(url).text)] == ["claim_extraction", "verdict", "complete"]
+        assert len(_events(client.get(url).text)) == 3
+        assert client.get(f"/api/trial/{case_id}/status").json()["verdict"] == {"score": 20}
+    assert len(runs) == 1
+
+
+def test_runs_renew_their_lease(monkeypatch):
+    """A run longer than the lease keeps it; nobody else can start one meanwhile"""
+    monkeypatch.setattr(trial_runner.Config, "STREAM_LEASE_SECONDS", 0.06)
+    monkeypatch.setattr(trial_store, "lease_seconds", 0.06)
+
+    async def run_fasttrack(state):
+        await asyncio.sleep(0.25)
+        yield {"phase": "verdict", "verdict": None}
+
+    monkeypatch.setattr(trial_runner, "run_fasttrack", run_fasttrack)
+
+    async def run():
+        await trial_store.create("lease-case", {"state": {"case_id": "lease-case", "mode": "fasttrack"}, "status": "started"})
+        assert await trial_runner.ensure_running("lease-case")
+        for _ in range(4):
+            await asyncio.sleep(0.05)
+            assert await trial_runner.is_running("lease-case")
+            assert not await trial_runner.ensure_running("lease-case")
+        await trial_runner._runs["lease-case"]
+        assert not await trial_runner.is_running("lease-case")
+    asyncio.run(run())
+
+
+def _install_suspending_run(monkeypatch, case_id, late_judgment=False):
+    """Courtroom stand-in: round 1, then waits for a judgment (one can arrive just after it looked)"""
+    runs = []
+
+    async def run(state):
+        if not runs:
+            runs.append("round 1")
+            yield {"phase": "awaiting_judgment", "round": 1}
+            return
+        judgement = await trial_store.pop_judgment(case_id, timeout=0)
+        if judgement is None and late_judgment:
+            # Posted while this run still holds the lease
+            await trial_store.push_judgment(case_id, "plausible")
+            assert not await trial_runner.ensure_running(case_id)
+            return
+        runs.append(judgement or "timed out")
+        yield {"phase": "complete", "status": "finished"}
+
+    monkeypatch.setattr(trial_runner.courtroom_runner, "run", run)
+    return runs
+
+
+async def _until(check, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if await check():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def test_judgment_posted_as_a_run_ends_is_not_stranded(monkeypatch):
+    runs = _install_suspending_run(monkeypatch, "late-case", late_judgment=True)
+
+    async def finished():
+        return (await trial_store.get("late-case"))["status"] == "finished"
+
+    async def run():
+        await trial_store.create("late-case", {"state": {"case_id": "late-case"}, "status": "started"})
+        assert await trial_runner.ensure_running("late-case")
+        await trial_runner._runs["late-case"]
+        # A reconnect runs again; the judgment lands after it checked
+        assert await trial_runner.ensure_running("late-case")
+        await _until(finished)
+        await trial_runner.cancel_all()
+    asyncio.run(run())
+    assert runs == ["round 1", "plausible"]
+
+
+def test_unanswered_judgment_times_out_without_a_reconnect(monkeypatch):
+    monkeypatch.setattr(trial_runner, "JUDGMENT_TIMEOUT", 0.05)
+    runs = _install_suspending_run(monkeypatch, "timeout-case")
+
+    async def finished():
+        return (await trial_store.get("timeout-case"))["status"] == "finished"
+
+    async def run():
+        await trial_store.create("timeout-case", {"state": {"case_id": "timeout-case"}, "status": "started"})
+        assert await trial_runner.ensure_running("timeout-case")
+        await _until(finished)
+        assert "timeout-case" not in trial_runner._timers
+    asyncio.run(run())
+    assert runs == ["round 1", "timed out"]
+
+
+def test_failed_run_drops_its_jury_notes(monkeypatch):
+    import workflow
+
+    async def run(state):
+        yield {"phase": "trial", "agent": "prosecutor", "round": 1}
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(trial_runner.courtroom_runner, "run", run)
+
+    async def scenario():
+        notes = asyncio.create_task(asyncio.sleep(10))
+        workflow._jury_tasks["failed-case"] = notes
+        await trial_store.create("failed-case", {"state": {"case_id": "failed-case"}, "status": "started"})
+        assert await trial_runner.ensure_running("failed-case")
+        await trial_runner._runs["failed-case"]
+        await asyncio.sleep(0)
+        return notes
+
+    notes = asyncio.run(scenario())
+    assert notes.cancelled()
+    assert "failed-case" not in workflow._jury_tasks
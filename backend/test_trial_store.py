@@ -0,0 +1,138 @@
+"""
+Unit tests for the trial state stores
+"""
+import asyncio
+import pytest
+from utils.trial_store import InMemoryTrialStore, SQLiteTrialStore
+
+
+def make_store(kind, tmp_path, ttl=3600, lease=30):
+    if kind == "memory":
+        return InMemoryTrialStore(ttl, lease_seconds=lease)
+    return SQLiteTrialStore(str(tmp_path / "trials.sqlite3"), ttl, poll_interval=0.01, lease_seconds=lease)
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_record_lifecycle(kind, tmp_path):
+    async def run():
+        store = make_store(kind, tmp_path)
+        await store.create("c1", {"state": {"case_id": "c1", "current_round": 1}, "status": "started", "streaming": False})
+        assert (await store.get("c1"))["state"]["current_round"] == 1
+
+        assert await store.try_start_stream("c1", "run-1")
+        assert not await store.try_start_stream("c1", "run-2")
+
+        await store.save_state("c1", {"case_id": "c1", "current_round": 2})
+        await store.update("c1", user_prediction={"verdict": "fake"})
+        record = await store.get("c1")
+        assert record["state"]["current_round"] == 2
+        assert record["user_prediction"] == {"verdict": "fake"}
+
+        await store.end_stream("c1", "run-2")  # not the holder: no effect
+        assert (await store.get("c1"))["streaming"]
+        await store.end_stream("c1", "run-1")
+        assert await store.try_start_stream("c1", "run-2")
+
+        await store.delete("c1")
+        assert await store.get("c1") is None
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_judgments_are_fifo_and_time_out(kind, tmp_path):
+    async def run():
+        store = make_store(kind, tmp_path)
+        await store.create("c1", {"state": {}, "streaming": False})
+        assert await store.pop_judgment("c1", timeout=0.05) is None
+
+        waiter = asyncio.create_task(store.pop_judgment("c1", timeout=2.0))
+        await asyncio.sleep(0.02)
+        await store.push_judgment("c1", "plausible")
+        await store.push_judgment("c1", "misleading")
+        assert await waiter == "plausible"
+        assert await store.pop_judgment("c1", timeout=0.05) == "misleading"
+
+        # timeout=0 takes only what is already queued
+        assert await store.pop_judgment("c1", timeout=0) is None
+        await store.push_judgment("c1", "not sure")
+        assert await store.has_judgment("c1")
+        assert await store.pop_judgment("c1", timeout=0) == "not sure"
+        assert not await store.has_judgment("c1")
+    asyncio.run(run())
+
+
+def test_sqlite_judgment_crosses_store_instances(tmp_path):
+    """Two instances on one file stand in for two worker processes"""
+    async def run():
+        stream_worker = make_store("sqlite", tmp_path)
+        post_worker = make_store("sqlite", tmp_path)
+        await stream_worker.create("c1", {"state": {}, "streaming": False})
+        assert await stream_worker.try_start_stream("c1", "run-1")
+        assert not await post_worker.try_start_stream("c1", "run-2")
+
+        waiter = asyncio.create_task(stream_worker.pop_judgment("c1", timeout=2.0))
+        await post_worker.push_judgment("c1", "not sure")
+        assert await waiter == "not sure"
+    asyncio.run(run())
+
+
+def test_sqlite_drops_unserializable_values(tmp_path):
+    async def run():
+        store = make_store("sqlite", tmp_path)
+        await store.create("c1", {"state": {"uploaded_video_file": object(), "claims": ["a"]}})
+        state = (await store.get("c1"))["state"]
+        assert state["uploaded_video_file"] is None
+        assert state["claims"] == ["a"]
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_ttl_eviction_skips_streaming_trials(kind, tmp_path):
+    async def run():
+        store = make_store(kind, tmp_path, ttl=0.05)
+        await store.create("idle", {"state": {}, "streaming": False})
+        await store.create("live", {"state": {}, "streaming": False})
+        assert await store.try_start_stream("live", "run-1")
+        await asyncio.sleep(0.1)
+
+        assert await store.sweep() == 1
+        assert await store.get("idle") is None
+        assert await store.get("live") is not None
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_expired_lease_frees_the_trial(kind, tmp_path):
+    """A run whose worker died (no renewals) stops blocking new runs and eviction"""
+    async def run():
+        store = make_store(kind, tmp_path, ttl=0.1, lease=0.05)
+        await store.create("c1", {"state": {}, "streaming": False})
+        assert await store.try_start_stream("c1", "crashed")
+        assert await store.renew_stream("c1", "crashed")
+        await asyncio.sleep(0.07)
+
+        assert not (await store.get("c1"))["streaming"]
+        assert await store.try_start_stream("c1", "run-2")
+        assert not await store.renew_stream("c1", "crashed")
+        await store.end_stream("c1", "crashed")
+        assert (await store.get("c1"))["streaming"]
+
+        await asyncio.sleep(0.15)
+        assert await store.sweep() == 1
+    asyncio.run(run())
+
+
+def test_sqlite_adds_lease_columns_to_old_files(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "trials.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE trials (case_id TEXT PRIMARY KEY, record TEXT NOT NULL, "
+                 "streaming INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL)")
+    conn.commit()
+    conn.close()
+
+    async def run():
+        store = SQLiteTrialStore(path, 3600)
+        await store.create("c1", {"state": {}})
+        assert await store.try_start_stream("c1", "run-1")
+    asyncio.run(run())
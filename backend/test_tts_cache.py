@@ -0,0 +1,69 @@
+"""
+Unit tests for the on-disk TTS cache
+"""
+import asyncio
+import os
+import time
+from utils.tts_cache import TTSCache
+
+NAME = "0123456789abcdef0123456789abcdef.mp3"
+
+
+def test_put_is_sharded_and_get_counts_hits(tmp_path):
+    async def run():
+        cache = TTSCache(str(tmp_path))
+        assert await cache.get(NAME) is None
+        path = await cache.put(NAME, b"mp3")
+        assert path == tmp_path / "01" / NAME
+        assert (await cache.get(NAME)).read_bytes() == b"mp3"
+        assert not [p for p in path.parent.iterdir() if p.name.startswith(".tmp-")]
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_ratio"] == 0.5
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_synthesis(tmp_path):
+    async def run():
+        cache = TTSCache(str(tmp_path))
+        calls = 0
+
+        async def create():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return b"audio"
+
+        paths = await asyncio.gather(*[cache.get_or_create(NAME, create) for _ in range(5)])
+        assert calls == 1
+        assert len(set(paths)) == 1
+        assert cache.stats()["coalesced"] == 4
+    asyncio.run(run())
+
+
+def test_failed_synthesis_is_not_cached(tmp_path):
+    async def run():
+        cache = TTSCache(str(tmp_path))
+
+        async def create():
+            return None
+
+        assert await cache.get_or_create(NAME, create) is None
+        assert not await cache.exists(NAME)
+    asyncio.run(run())
+
+
+def test_evicts_expired_then_least_recently_used(tmp_path):
+    async def run():
+        cache = TTSCache(str(tmp_path), max_bytes=10, max_age_seconds=3600)
+        names = [f"{i:02x}" + "0" * 30 + ".mp3" for i in range(4)]
+        for name in names:
+            await cache.put(name, b"12345")
+        now = time.time()
+        os.utime(cache.path_for(names[0]), (now - 7200, now - 7200))  # expired
+        os.utime(cache.path_for(names[1]), (now - 60, now - 60))      # least recently used
+        os.utime(cache.path_for(names[2]), (now - 30, now - 30))
+
+        assert cache.evict() == 2
+        assert [await cache.exists(n) for n in names] == [False, False, True, True]
+        assert cache.stats()["bytes"] == 10
+    asyncio.run(run())
@@ -0,0 +1,97 @@
+"""
+Unit tests for chunked TTS
+"""
+import asyncio
+import pytest
+from utils.tts_service import ChunkedSpeechError, TTSService
+
+ARGUMENT = "The photo is from 2015. It was taken in Chile, not Japan! Reverse image search confirms this."
+
+
+def make_service(tmp_path, monkeypatch, delays=None):
+    service = TTSService(cache_dir=str(tmp_path))
+    service.api_key = "test"
+    calls = []
+
+    async def generate_speech(text, agent):
+        calls.append(text)
+        await asyncio.sleep((delays or {}).get(text, 0.01))
+        path = await service.cache.put(f"{service._get_cache_key(text, agent)}.mp3", text.encode())
+        return str(path)
+
+    monkeypatch.setattr(service, "generate_speech", generate_speech)
+    return service, calls
+
+
+def test_split_sentences_merges_short_ones():
+    assert TTSService.split_sentences("Hi. Yes. This one is long enough to stand alone.", min_chars=10) == [
+        "Hi. Yes. This one is long enough to stand alone."
+    ]
+    assert TTSService.split_sentences(ARGUMENT, min_chars=20) == [
+        "The photo is from 2015.",
+        "It was taken in Chile, not Japan!",
+        "Reverse image search confirms this.",
+    ]
+
+
+def test_chunks_stream_in_order_as_they_finish(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.settings.Config.TTS_CHUNK_MIN_CHARS", 20)
+
+    async def run():
+        chunks = TTSService.split_sentences(ARGUMENT)
+        # First sentence is slowest: later chunks still come out after it
+        service, calls = make_service(tmp_path, monkeypatch, {chunks[0]: 0.1})
+        key = await service.start_chunked_speech(ARGUMENT, "prosecutor")
+        assert await service.has_chunked_speech(key)
+        body = [part async for part in service.iter_chunked_audio(key)]
+        assert b" ".join(body).decode() == " ".join(chunks)
+        assert sorted(calls) == sorted(chunks)
+    asyncio.run(run())
+
+
+def test_other_worker_streams_from_manifest(tmp_path, monkeypatch):
+    async def run():
+        synthesizer, _ = make_service(tmp_path, monkeypatch)
+        key = await synthesizer.start_chunked_speech(ARGUMENT, "defendant")
+        other = TTSService(cache_dir=str(tmp_path))
+        assert await other.has_chunked_speech(key)
+        body = b"".join([part async for part in other.iter_chunked_audio(key, timeout=2.0)])
+        assert body.decode().replace(" ", "") == ARGUMENT.replace(" ", "")
+    asyncio.run(run())
+
+
+def test_no_chunked_speech_without_voice_or_key(tmp_path):
+    async def run():
+        service = TTSService(cache_dir=str(tmp_path))
+        service.api_key = ""
+        assert await service.start_chunked_speech(ARGUMENT, "prosecutor") is None
+        service.api_key = "test"
+        assert await service.start_chunked_speech(ARGUMENT, "jury") is None
+    asyncio.run(run())
+
+
+def test_failed_chunk_ends_the_stream_on_every_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.settings.Config.TTS_CHUNK_MIN_CHARS", 20)
+
+    async def run():
+        chunks = TTSService.split_sentences(ARGUMENT)
+        synthesizer, _ = make_service(tmp_path, monkeypatch)
+        generate = synthesizer.generate_speech
+
+        async def generate_speech(text, agent):
+            if text == chunks[1]:
+                await asyncio.sleep(0.05)
+                return None  # synthesis failed: no file
+            return await generate(text, agent)
+        monkeypatch.setattr(synthesizer, "generate_speech", generate_speech)
+
+        key = await synthesizer.start_chunked_speech(ARGUMENT, "prosecutor")
+        other = TTSService(cache_dir=str(tmp_path))
+        for service in (synthesizer, other):
+            body = []
+            with pytest.raises(ChunkedSpeechError):
+                async for part in service.iter_chunked_audio(key, timeout=10.0):
+                    body.append(part)
+            # The first sentence streams; the gap is never skipped over
+            assert body == [chunks[0].encode()]
+    asyncio.run(run())
@@ -0,0 +1,103 @@
+"""
+Tests for streaming, content-addressed file uploads
+"""
+import asyncio
+import hashlib
+import httpx
+import pytest
+from utils.uploads import UploadStore, UploadTooLarge, UploadError
+
+BOUNDARY = "testboundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def multipart(data: bytes, filename: str = "clip.MP4", **fields) -> bytes:
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: video/mp4\r\n\r\n'.encode() + data + b"\r\n"
+    )
+    parts.append(f"--{BOUNDARY}--\r\n".encode())
+    return b"".join(parts)
+
+
+async def chunked(body: bytes, size: int = 7):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+def test_receive_streams_hashes_and_collects_fields(tmp_path):
+    async def run():
+        store = UploadStore(str(tmp_path), max_bytes=1024)
+        data = bytes(range(256)) * 2
+        fields, upload = await store.receive(chunked(multipart(data, input_type="video", mode="fast")), CONTENT_TYPE)
+        assert fields == {"input_type": "video", "mode": "fast"}
+        assert upload["sha256"] == hashlib.sha256(data).hexdigest()
+        assert upload["size"] == len(data) and not upload["deduplicated"]
+        assert upload["path"] == str(tmp_path / f"{upload['sha256']}.mp4")
+        assert open(upload["path"], "rb").read() == data
+        assert not [p for p in tmp_path.iterdir() if p.name.startswith(".tmp-")]
+    asyncio.run(run())
+
+
+def test_identical_uploads_share_one_file(tmp_path):
+    async def run():
+        store = UploadStore(str(tmp_path), max_bytes=1024)
+        _, first = await store.receive(chunked(multipart(b"same bytes")), CONTENT_TYPE)
+        _, second = await store.receive(chunked(multipart(b"same bytes", filename="copy.mp4")), CONTENT_TYPE)
+        assert second["path"] == first["path"] and second["deduplicated"]
+        assert store.deduplicated == 1
+        assert len(list(tmp_path.iterdir())) == 1
+    asyncio.run(run())
+
+
+def test_oversized_upload_is_rejected_before_the_body_ends(tmp_path):
+    async def run():
+        store = UploadStore(str(tmp_path), max_bytes=100)
+        consumed = 0
+
+        async def body():
+            nonlocal consumed
+            async for chunk in chunked(multipart(b"x" * 10_000), size=64):
+                consumed += len(chunk)
+                yield chunk
+
+        with pytest.raises(UploadTooLarge):
+            await store.receive(body(), CONTENT_TYPE)
+        assert consumed < 1000
+        assert list(tmp_path.iterdir()) == []
+    asyncio.run(run())
+
+
+def test_rejects_missing_file_and_declared_oversize(tmp_path):
+    async def run():
+        store = UploadStore(str(tmp_path), max_bytes=100)
+        body = f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="mode"\r\n\r\nfast\r\n--{BOUNDARY}--\r\n'.encode()
+        with pytest.raises(UploadError):
+            await store.receive(chunked(body), CONTENT_TYPE)
+        with pytest.raises(UploadError):
+            await store.receive(chunked(body), "application/json")
+        assert store.rejects_length(str(10 * 1024 * 1024))
+        assert not store.rejects_length("50") and not store.rejects_length(None)
+    asyncio.run(run())
+
+
+def test_start_with_file_endpoint(tmp_path, monkeypatch):
+    import main
+    monkeypatch.setattr(main, "upload_store", UploadStore(str(tmp_path), max_bytes=64))
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = {"Content-Type": CONTENT_TYPE}
+            response = await client.post("/api/trial/start-with-file", content=multipart(b"img", input_type="image"), headers=headers)
+            assert response.status_code == 200
+            record = await main.trial_store.get(response.json()["case_id"])
+            assert record["state"]["input_type"] == "image"
+            assert record["state"]["content_hash"] == hashlib.sha256(b"img").hexdigest()
+
+            response = await client.post("/api/trial/start-with-file", content=multipart(b"x" * 100, input_type="image"), headers=headers)
+            assert response.status_code == 413
+    asyncio.run(run())
@@ -0,0 +1,136 @@
+"""
+Runs trials in the background, independent of client connections.
+
+A run appends every SSE payload to the case's event log; SSE connections
+only replay and follow that log, so a dropped connection loses nothing and
+any number of viewers can watch one trial. At most one run per case is
+active at a time: a run holds the trial store's stream lease and renews it
+while alive, so a run lost with its worker frees the trial once the lease
+expires. A courtroom run ends at each judgment checkpoint; posting the
+judgment starts the next one, and so does JUDGMENT_TIMEOUT running out
+(the trial goes on with "neutral").
+"""
+import asyncio
+import uuid
+from contextlib import aclosing
+from typing import Dict
+from config.settings import Config
+from courtroom_runner import JUDGMENT_TIMEOUT, courtroom_runner
+from fasttrack_pipeline import run_fasttrack
+from utils.blackboard import blackboard
+from utils.event_log import event_log
+from utils.trial_store import trial_store
+from workflow import cancel_jury_notes
+
+# case_id -> running task (keeps a reference so runs are not garbage collected)
+_runs: Dict[str, asyncio.Task] = {}
+# case_id -> timer resuming a suspended trial once its judgment times out
+_timers: Dict[str, asyncio.Task] = {}
+
+
+async def _hold_lease(case_id: str, owner: str, run: asyncio.Task):
+    """Renew the run's lease until cancelled; stop the run if the lease was lost"""
+    while True:
+        await asyncio.sleep(Config.STREAM_LEASE_SECONDS / 3)
+        if not await trial_store.renew_stream(case_id, owner):
+            print(f"[TRIAL RUNNER] Case {case_id} lost its run lease, stopping")
+            run.cancel()
+            return
+
+
+async def _resume_after_timeout(case_id: str):
+    await asyncio.sleep(JUDGMENT_TIMEOUT)
+    _timers.pop(case_id, None)
+    await ensure_running(case_id)
+
+
+def _cancel_timeout(case_id: str):
+    timer = _timers.pop(case_id, None)
+    if timer is not None:
+        timer.cancel()
+
+
+def _schedule_timeout(case_id: str):
+    """(Re)start the judgment timer of a trial that just suspended"""
+    _cancel_timeout(case_id)
+    _timers[case_id] = asyncio.create_task(_resume_after_timeout(case_id))
+
+
+async def _run(case_id: str, owner: str):
+    lease = asyncio.create_task(_hold_lease(case_id, owner, asyncio.current_task()))
+    waiting = False  # left suspended at a judgment checkpoint
+    try:
+        record = await trial_store.get(case_id)
+        if record is None or record.get("status") == "finished":
+            return
+        state = record["state"]
+        if state.get("mode", "courtroom") == "fasttrack":
+            try:
+                async for event in run_fasttrack(state):
+                    await event_log.append(case_id, event)
+            finally:
+                # Fast-track never checkpoints, so its evidence is dropped here;
+                # a courtroom trial keeps it until the graph's cleanup step
+                await blackboard.delete_collection(case_id)
+            await trial_store.update(case_id, state=state, status="finished")
+            await event_log.append(case_id, {'phase': 'complete', 'status': 'finished'})
+            return
+        finished = False
+        while True:
+            suspended = False
+            async with aclosing(courtroom_runner.run(state)) as events:
+                async for event in events:
+                    if event.get("phase") == "complete":
+                        finished = True
+                        _cancel_timeout(case_id)
+                        await trial_store.update(case_id, status="finished")
+                    elif event.get("phase") == "awaiting_judgment":
+                        suspended = True
+                        _schedule_timeout(case_id)
+                    await event_log.append(case_id, event)
+            # A judgment posted while this run finished the round resumes at once
+            if not suspended:
+                break
+        waiting = not finished
+    except Exception as e:
+        print(f"[TRIAL RUNNER] Case {case_id} failed: {e}")
+        # Nothing awaits the jurors' notes of a failed run
+        cancel_jury_notes(case_id)
+        await event_log.append(case_id, {'error': str(e)})
+    finally:
+        lease.cancel()
+        await trial_store.end_stream(case_id, owner)
+        # Followers of a suspended or finished trial can close their streams
+        event_log.wake(case_id)
+        # A judgment posted after this run last looked, while it still held
+        # the lease, could not start a run of its own
+        if waiting and await trial_store.has_judgment(case_id):
+            await ensure_running(case_id)
+
+
+async def ensure_running(case_id: str) -> bool:
+    """Start a run for `case_id` unless one is active; True if started.
+
+    A run that has nothing to do (finished, or suspended with no judgment
+    yet) ends at once without events.
+    """
+    owner = uuid.uuid4().hex
+    if not await trial_store.try_start_stream(case_id, owner):
+        return False
+    task = asyncio.create_task(_run(case_id, owner))
+    _runs[case_id] = task
+    task.add_done_callback(lambda done: _runs.pop(case_id) if _runs.get(case_id) is done else None)
+    return True
+
+
+async def is_running(case_id: str) -> bool:
+    record = await trial_store.get(case_id)
+    return bool(record and record.get("streaming"))
+
+
+async def cancel_all():
+    """Stop the runs of this process (shutdown); courtroom runs resume from their checkpoints"""
+    tasks = list(_runs.values()) + list(_timers.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,35 +1,112 @@
-import httpx
+import asyncio
+import json
+import time
+from collections import OrderedDict
 from typing import List, Dict
 from config.settings import Config
+from utils.retrieval import NamespaceIndex
+from utils.http_pool import http_pool
 
 class BlackboardClient:
-    def __init__(self):
+    def __init__(self, ttl_seconds: float = None, max_bytes: int = None):
         self.api_key = Config.BLACKBOARD_API_KEY
         self.base_url = Config.BLACKBOARD_BASE_URL
         self.headers = {"Authorization": f"Bearer {self.api_key}"}
-        self.storage = {}
-    
+        # case_id -> {namespace: NamespaceIndex}, least recently used first
+        self.storage = OrderedDict()
+        self.ttl_seconds = Config.BLACKBOARD_COLLECTION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_bytes = Config.BLACKBOARD_MAX_BYTES if max_bytes is None else max_bytes
+        self._bytes = {}    # case_id -> approximate bytes held
+        self._total_bytes = 0
+        self._touched = {}  # case_id -> last access time
+        self.evictions = 0
+        self.expirations = 0
+        self.dense_retrieval = Config.BLACKBOARD_DENSE_RETRIEVAL
+
+    @staticmethod
+    def _size(evidence: Dict) -> int:
+        return len(json.dumps(evidence, default=str))
+
+    def _touch(self, case_id: str):
+        self.storage.move_to_end(case_id)
+        self._touched[case_id] = time.time()
+
+    def _drop(self, case_id: str):
+        self.storage.pop(case_id, None)
+        self._total_bytes -= self._bytes.pop(case_id, 0)
+        self._touched.pop(case_id, None)
+
+    def _enforce_budget(self):
+        """Evict least recently used collections until under the byte budget.
+
+        The most recently used collection is never evicted.
+        """
+        while self._total_bytes > self.max_bytes and len(self.storage) > 1:
+            oldest = next(iter(self.storage))
+            print(f"[BLACKBOARD] Byte budget exceeded, evicting collection {oldest}")
+            self._drop(oldest)
+            self.evictions += 1
+
     async def create_collection(self, case_id: str):
+        self._drop(case_id)
         self.storage[case_id] = {}
+        self._bytes[case_id] = 0
+        self._touch(case_id)
         return {"status": "created"}
     
+    def has_collection(self, case_id: str) -> bool:
+        return case_id in self.storage
+
     async def delete_collection(self, case_id: str):
-        if case_id in self.storage:
-            del self.storage[case_id]
+        self._drop(case_id)
         return {"status": "deleted"}
     
     async def store_evidence(self, case_id: str, namespace: str, evidence: Dict):
         if case_id not in self.storage:
             self.storage[case_id] = {}
+            self._bytes[case_id] = 0
         if namespace not in self.storage[case_id]:
-            self.storage[case_id][namespace] = []
-        self.storage[case_id][namespace].append(evidence)
+            self.storage[case_id][namespace] = NamespaceIndex(self.dense_retrieval, Config.BLACKBOARD_EMBEDDING_DIM)
+        self.storage[case_id][namespace].add(evidence)
+        size = self._size(evidence)
+        self._bytes[case_id] += size
+        self._total_bytes += size
+        self._touch(case_id)
+        self._enforce_budget()
         return {"status": "stored"}
     
     async def query_namespace(self, case_id: str, namespace: str, query: str, top_k: int = 5) -> List[Dict]:
         if case_id in self.storage and namespace in self.storage[case_id]:
-            return self.storage[case_id][namespace][:top_k]
+            self._touch(case_id)
+            return self.storage[case_id][namespace].search(query, top_k)
         return []
+
+    def sweep(self) -> int:
+        """Drop collections not touched within the TTL; returns the number removed"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [case_id for case_id, touched in self._touched.items() if touched < cutoff]
+        for case_id in expired:
+            self._drop(case_id)
+        self.expirations += len(expired)
+        return len(expired)
+
+    async def run_sweeper(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            removed = self.sweep()
+            if removed:
+                print(f"[BLACKBOARD] Expired {removed} collections")
+
+    def stats(self) -> Dict:
+        return {
+            "collections": len(self.storage),
+            "namespaces": sum(len(namespaces) for namespaces in self.storage.values()),
+            "items": sum(len(index.items) for namespaces in self.storage.values() for index in namespaces.values()),
+            "approx_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
     
     async def web_search(self, query: str, top_k: int = 5) -> List[Dict]:
         if not self.api_key or self.api_key.startswith('demo'):
@@ -38,13 +115,13 @@ class BlackboardClient:
                 {"url": "https://example.com/source2", "title": "Another source", "snippet": "Additional context"}
             ]
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/search/web",
-                    headers=self.headers,
-                    json={"query": query, "top_k": top_k}
-                )
-                return response.json().get("results", [])
+            response = await http_pool.post(
+                f"{self.base_url}/search/web",
+                headers=self.headers,
+                json={"query": query, "top_k": top_k},
+                timeout=10.0
+            )
+            return response.json().get("results", [])
         except:
             return [
                 {"url": "https://example.com/source1", "title": "Relevant source", "snippet": "Mock search result for: " + query}
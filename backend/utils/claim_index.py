@@ -0,0 +1,257 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from config.settings import Config
+
+_PRIME = (1 << 31) - 1  # keeps a*h+b inside uint64
+
+# "t" is what normalization leaves of n't (isn't -> "isn t")
+_NEGATIONS = {"no", "not", "never", "none", "nobody", "nothing", "neither", "nor", "without", "cannot", "t"}
+
+# Evidence fields that describe its relation to one particular claim
+PER_CLAIM_FIELDS = ("claim_id", "supports_claim")
+
+
+def normalize_claim(text: str) -> str:
+    """Case-fold, strip punctuation and collapse whitespace"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def critical_tokens(normalized: str) -> List[str]:
+    """Numbers, dates and negations: tokens that change what a claim asserts"""
+    return sorted(t for t in normalized.split() if t in _NEGATIONS or any(c.isdigit() for c in t))
+
+
+def shingles(normalized: str, k: int = 5) -> set:
+    """Character k-shingles; robust to small wording changes in short claims"""
+    if len(normalized) <= k:
+        return {normalized}
+    return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+
+class MinHasher:
+    """MinHash signatures via universal hashing of 31-bit shingle hashes"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: set) -> np.ndarray:
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") & _PRIME
+             for s in shingle_set),
+            dtype=np.uint64,
+            count=len(shingle_set),
+        )
+        return ((self.a[:, None] * hashes[None, :] + self.b[:, None]) % _PRIME).min(axis=1)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets"""
+        return float(np.mean(sig_a == sig_b))
+
+
+class ClaimIndex:
+    """Local index mapping atomic claims to previously gathered evidence and verdicts.
+
+    Claims are matched by normalized text first, then by MinHash/LSH
+    near-duplicate search. A near-duplicate must also have the same numbers,
+    dates and negations ("completed in 1889" never matches "completed in
+    1989"), and its evidence comes back without the per-claim fields.
+    Lookups only return entries whose evidence is within the freshness
+    window.
+    """
+
+    def __init__(self, path: str, num_perm: int = 64, bands: int = 16,
+                 threshold: float = 0.8, freshness_seconds: float = 6 * 3600, enabled: bool = True):
+        assert num_perm % bands == 0
+        self.path = path
+        self.enabled = enabled
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.freshness_seconds = freshness_seconds
+        self.hasher = MinHasher(num_perm)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS claims (
+                id INTEGER PRIMARY KEY,
+                normalized TEXT UNIQUE NOT NULL,
+                text TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                evidence TEXT NOT NULL DEFAULT '[]',
+                evidence_updated_at REAL,
+                verdict_scores TEXT NOT NULL DEFAULT '[]',
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS claim_lsh (
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                claim_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, claim_id)
+            )
+        """)
+
+    @classmethod
+    def from_config(cls) -> "ClaimIndex":
+        return cls(
+            Config.CLAIM_INDEX_PATH,
+            threshold=Config.CLAIM_INDEX_SIMILARITY,
+            freshness_seconds=Config.CLAIM_INDEX_FRESHNESS_SECONDS,
+            enabled=Config.CLAIM_INDEX_ENABLED,
+        )
+
+    def _signature(self, normalized: str) -> np.ndarray:
+        return self.hasher.signature(shingles(normalized))
+
+    def _buckets(self, signature: np.ndarray) -> List[str]:
+        return [
+            hashlib.blake2b(signature[i * self.rows:(i + 1) * self.rows].tobytes(), digest_size=8).hexdigest()
+            for i in range(self.bands)
+        ]
+
+    def _find(self, text: str) -> List[tuple]:
+        """Return [(row, similarity)] for exact and near-duplicate matches, best first"""
+        normalized = normalize_claim(text)
+        row = self._conn.execute("SELECT * FROM claims WHERE normalized = ?", (normalized,)).fetchone()
+        if row is not None:
+            return [(row, 1.0)]
+        signature = self._signature(normalized)
+        candidate_ids = set()
+        for band, bucket in enumerate(self._buckets(signature)):
+            for (claim_id,) in self._conn.execute(
+                "SELECT claim_id FROM claim_lsh WHERE band = ? AND bucket = ?", (band, bucket)
+            ):
+                candidate_ids.add(claim_id)
+        matches = []
+        critical = critical_tokens(normalized)
+        for claim_id in candidate_ids:
+            row = self._conn.execute("SELECT * FROM claims WHERE id = ?", (claim_id,)).fetchone()
+            if row is None:
+                continue
+            similarity = MinHasher.similarity(signature, np.frombuffer(row[3], dtype=np.uint64))
+            if similarity >= self.threshold and critical_tokens(row[1]) == critical:
+                matches.append((row, similarity))
+        return sorted(matches, key=lambda m: m[1], reverse=True)
+
+    def _insert(self, text: str) -> int:
+        normalized = normalize_claim(text)
+        signature = self._signature(normalized)
+        cursor = self._conn.execute(
+            "INSERT INTO claims (normalized, text, signature, created_at) VALUES (?, ?, ?, ?)",
+            (normalized, text, signature.tobytes(), time.time())
+        )
+        claim_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO claim_lsh (band, bucket, claim_id) VALUES (?, ?, ?)",
+            [(band, bucket, claim_id) for band, bucket in enumerate(self._buckets(signature))]
+        )
+        return claim_id
+
+    def _upsert_id(self, text: str) -> int:
+        row = self._conn.execute(
+            "SELECT id FROM claims WHERE normalized = ?", (normalize_claim(text),)
+        ).fetchone()
+        return row[0] if row else self._insert(text)
+
+    def lookup(self, text: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Fresh evidence for this claim (or a near-duplicate of it), or None"""
+        if not self.enabled:
+            return None
+        max_age = self.freshness_seconds if max_age is None else max_age
+        now = time.time()
+        with self._lock:
+            for row, similarity in self._find(text):
+                updated_at = row[5]
+                if updated_at is None or now - updated_at > max_age:
+                    continue
+                self.hits += 1
+                evidence = json.loads(row[4])
+                if similarity < 1.0:
+                    # Support was judged against the stored wording, not this one
+                    evidence = [{k: v for k, v in e.items() if k not in PER_CLAIM_FIELDS} for e in evidence]
+                return {
+                    "text": row[2],
+                    "similarity": similarity,
+                    "evidence": evidence,
+                    "verdict_scores": json.loads(row[6]),
+                    "age_seconds": now - updated_at,
+                }
+        self.misses += 1
+        return None
+
+    def record_evidence(self, text: str, evidence: List[Dict]):
+        if not self.enabled or not evidence:
+            return
+        with self._lock:
+            claim_id = self._upsert_id(text)
+            self._conn.execute(
+                "UPDATE claims SET evidence = ?, evidence_updated_at = ? WHERE id = ?",
+                (json.dumps(evidence, default=str), time.time(), claim_id)
+            )
+
+    def record_verdict(self, text: str, score: float, keep: int = 20):
+        """Append a verdict score for this claim (most recent `keep` are retained)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            claim_id = self._upsert_id(text)
+            (scores,) = self._conn.execute(
+                "SELECT verdict_scores FROM claims WHERE id = ?", (claim_id,)
+            ).fetchone()
+            scores = (json.loads(scores) + [score])[-keep:]
+            self._conn.execute(
+                "UPDATE claims SET verdict_scores = ? WHERE id = ?", (json.dumps(scores), claim_id)
+            )
+
+    def _delete_ids(self, ids: List[int]) -> int:
+        self._conn.executemany("DELETE FROM claims WHERE id = ?", [(i,) for i in ids])
+        self._conn.executemany("DELETE FROM claim_lsh WHERE claim_id = ?", [(i,) for i in ids])
+        return len(ids)
+
+    def invalidate(self, text: str) -> int:
+        """Drop this claim and any near-duplicates; returns the number removed"""
+        with self._lock:
+            return self._delete_ids([row[0] for row, _ in self._find(text)])
+
+    def invalidate_older_than(self, seconds: float) -> int:
+        """Drop entries whose evidence is older than `seconds` (or was never gathered)"""
+        cutoff = time.time() - seconds
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM claims WHERE evidence_updated_at IS NULL OR evidence_updated_at < ?", (cutoff,)
+            )]
+            return self._delete_ids(ids)
+
+    def clear(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM claims").fetchone()
+            self._conn.execute("DELETE FROM claims")
+            self._conn.execute("DELETE FROM claim_lsh")
+            return count
+
+    def stats(self) -> Dict:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM claims").fetchone()
+        return {"enabled": self.enabled, "claims": count, "hits": self.hits, "misses": self.misses}
+
+
+claim_index = ClaimIndex.from_config()
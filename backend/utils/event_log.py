@@ -0,0 +1,207 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from config.settings import Config
+
+
+def is_terminal(event: Dict) -> bool:
+    """Events after which a trial makes no progress until someone acts"""
+    return "error" in event or event.get("phase") in ("awaiting_judgment", "complete")
+
+
+class EventLog(ABC):
+    """Append-only log of a trial's SSE events.
+
+    Ids are per case, start at 1 and increase by one, so a client's
+    Last-Event-ID is exactly where its replay resumes. Any number of
+    subscribers can follow one case.
+    """
+
+    @abstractmethod
+    async def append(self, case_id: str, event: Dict) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def read(self, case_id: str, after_id: int = 0) -> List[Tuple[int, Dict]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def _wait(self, case_id: str, after_id: int, timeout: float):
+        """Return once an event after `after_id` may exist, or after `timeout`"""
+        raise NotImplementedError
+
+    def wake(self, case_id: str):
+        """Make subscribers re-check right away (e.g. the run ended)"""
+
+    async def follow(self, case_id: str, after_id: int, is_running: Callable[[], Awaitable[bool]],
+                     heartbeat: float) -> AsyncIterator[Optional[Tuple[int, Dict]]]:
+        """Replay events after `after_id`, then tail new ones.
+
+        Yields None when `heartbeat` seconds pass without an event. Stops
+        once everything is delivered, the last event is terminal and no
+        runner is appending.
+        """
+        # The event the subscriber saw last decides whether the trial is idle
+        seen = await self.read(case_id, after_id - 1) if after_id > 0 else []
+        last_event = seen[0][1] if seen else None
+        idle = 0.0
+        while True:
+            events = await self.read(case_id, after_id)
+            for event_id, event in events:
+                after_id, last_event = event_id, event
+                yield event_id, event
+            if events:
+                idle = 0.0
+                continue
+            if (last_event is None or is_terminal(last_event)) and not await is_running():
+                # The runner may have appended just before it finished
+                if not await self.read(case_id, after_id):
+                    return
+                continue
+            started = time.monotonic()
+            await self._wait(case_id, after_id, heartbeat - idle)
+            idle += time.monotonic() - started
+            if idle >= heartbeat:
+                idle = 0.0
+                yield None
+
+    async def sweep(self) -> int:
+        """Drop logs with no events within the TTL; returns the number removed"""
+        return 0
+
+    async def run_sweeper(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.sweep()
+                if removed:
+                    print(f"[EVENT LOG] Dropped {removed} expired event logs")
+            except Exception as e:
+                print(f"[EVENT LOG] Sweep failed: {e}")
+
+
+class InMemoryEventLog(EventLog):
+    """Process-local log (single worker only)"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._events: Dict[str, List[Dict]] = {}
+        self._touched: Dict[str, float] = {}
+        self._waiters: Dict[str, set] = {}
+
+    async def append(self, case_id: str, event: Dict) -> int:
+        events = self._events.setdefault(case_id, [])
+        events.append(event)
+        self._touched[case_id] = time.time()
+        self.wake(case_id)
+        return len(events)
+
+    def wake(self, case_id: str):
+        for waiter in self._waiters.get(case_id, ()):
+            waiter.set()
+
+    async def read(self, case_id: str, after_id: int = 0) -> List[Tuple[int, Dict]]:
+        events = self._events.get(case_id, [])
+        return list(enumerate(events[after_id:], after_id + 1))
+
+    async def _wait(self, case_id: str, after_id: int, timeout: float):
+        if len(self._events.get(case_id, [])) > after_id:
+            return
+        waiter = asyncio.Event()
+        waiters = self._waiters.setdefault(case_id, set())
+        waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters.discard(waiter)
+            if not waiters:
+                self._waiters.pop(case_id, None)
+
+    async def sweep(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        expired = [case_id for case_id, touched in self._touched.items() if touched < cutoff]
+        for case_id in expired:
+            self._events.pop(case_id, None)
+            self._touched.pop(case_id, None)
+        return len(expired)
+
+
+class SQLiteEventLog(EventLog):
+    """Log shared by every worker process on the host; subscribers poll"""
+
+    def __init__(self, path: str, ttl_seconds: float, poll_interval: float = 0.25):
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS trial_events (
+                case_id TEXT NOT NULL,
+                event_id INTEGER NOT NULL,
+                event TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (case_id, event_id)
+            )
+        """)
+
+    async def append(self, case_id: str, event: Dict) -> int:
+        def append():
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    (last,) = self._conn.execute(
+                        "SELECT COALESCE(MAX(event_id), 0) FROM trial_events WHERE case_id = ?", (case_id,)
+                    ).fetchone()
+                    self._conn.execute(
+                        "INSERT INTO trial_events (case_id, event_id, event, created_at) VALUES (?, ?, ?, ?)",
+                        (case_id, last + 1, json.dumps(event), time.time())
+                    )
+                    self._conn.execute("COMMIT")
+                    return last + 1
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        return await asyncio.to_thread(append)
+
+    async def read(self, case_id: str, after_id: int = 0) -> List[Tuple[int, Dict]]:
+        def read():
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT event_id, event FROM trial_events WHERE case_id = ? AND event_id > ? ORDER BY event_id",
+                    (case_id, after_id)
+                ).fetchall()
+            return [(event_id, json.loads(event)) for event_id, event in rows]
+        return await asyncio.to_thread(read)
+
+    async def _wait(self, case_id: str, after_id: int, timeout: float):
+        await asyncio.sleep(max(min(self.poll_interval, timeout), 0))
+
+    async def sweep(self) -> int:
+        def sweep():
+            cutoff = time.time() - self.ttl_seconds
+            with self._lock:
+                expired = [row[0] for row in self._conn.execute(
+                    "SELECT case_id FROM trial_events GROUP BY case_id HAVING MAX(created_at) < ?", (cutoff,)
+                )]
+                self._conn.executemany("DELETE FROM trial_events WHERE case_id = ?", [(c,) for c in expired])
+            return len(expired)
+        return await asyncio.to_thread(sweep)
+
+
+def create_event_log() -> EventLog:
+    # Follows the trial store: logs must be shared wherever trials are
+    if Config.TRIAL_STORE_BACKEND == "sqlite":
+        return SQLiteEventLog(Config.TRIAL_STORE_PATH, Config.TRIAL_TTL_SECONDS)
+    return InMemoryEventLog(Config.TRIAL_TTL_SECONDS)
+
+
+event_log = create_event_log()
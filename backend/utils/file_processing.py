@@ -0,0 +1,179 @@
+"""
+Awaitable tracker for files the provider is still processing.
+
+Instead of every upload polling `files.get` every 2 s, waiters register
+with one poller task. Each file is re-checked with exponential backoff
+and jitter (short clips are picked up quickly, long ones are not hammered)
+and fails after an overall deadline. When several files are due at once
+they are checked with one `files.list` call where the provider supports it.
+
+Processing times are recorded in histograms per file-size bucket.
+"""
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+from config.settings import Config
+
+# Upper bounds; the last bucket is open-ended
+SIZE_BUCKETS = [(1 << 20, "<1MB"), (10 << 20, "<10MB"), (50 << 20, "<50MB"), (200 << 20, "<200MB"), (None, ">=200MB")]
+LATENCY_BUCKETS = [1, 2, 5, 10, 20, 40, 80, 160]
+
+
+def file_state(remote_file) -> str:
+    """Processing state as a plain string ("PROCESSING", "ACTIVE", "FAILED")"""
+    state = getattr(remote_file, "state", None)
+    return str(getattr(state, "value", state) or "ACTIVE")
+
+
+def size_bucket(size_bytes: Optional[int]) -> str:
+    if size_bytes is None:
+        return "unknown"
+    for limit, label in SIZE_BUCKETS:
+        if limit is None or size_bytes < limit:
+            return label
+
+
+class ProcessingTimeout(Exception):
+    """A file was still PROCESSING when its deadline passed"""
+
+
+class ProcessingTracker:
+    def __init__(self, provider, initial_delay: float = 0.5, max_delay: float = 8.0, multiplier: float = 2.0,
+                 jitter: float = 0.25, deadline: float = 600.0, batch_min: int = 3):
+        self.provider = provider
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.batch_min = batch_min
+        # name -> {future, started, size, attempt, next_check}
+        self._pending: Dict[str, Dict] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._poller: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.batch_checks = 0
+        self.timeouts = 0
+        self._histograms: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_config(cls, provider) -> "ProcessingTracker":
+        return cls(
+            provider,
+            initial_delay=Config.FILE_POLL_INITIAL_DELAY,
+            max_delay=Config.FILE_POLL_MAX_DELAY,
+            deadline=Config.FILE_PROCESSING_DEADLINE,
+            batch_min=Config.FILE_POLL_BATCH_MIN,
+        )
+
+    def _delay(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.initial_delay * self.multiplier ** attempt)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _record(self, size_bytes: Optional[int], seconds: float):
+        histogram = self._histograms.setdefault(size_bucket(size_bytes), {
+            "count": 0, "total_seconds": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS) + 1)
+        })
+        histogram["count"] += 1
+        histogram["total_seconds"] += seconds
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        histogram["buckets"][index] += 1
+
+    async def wait(self, remote_file, size_bytes: Optional[int] = None):
+        """Return the file once it is no longer PROCESSING (raises ProcessingTimeout)"""
+        size_bytes = getattr(remote_file, "size_bytes", None) or size_bytes
+        if file_state(remote_file) != "PROCESSING":
+            self._record(size_bytes, 0.0)
+            return remote_file
+
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        future = loop.create_future()
+        self._pending[remote_file.name] = {
+            "future": future,
+            "started": now,
+            "size": size_bytes,
+            "attempt": 0,
+            "next_check": now + self._delay(0),
+        }
+        if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.create_task(self._poll())
+        else:
+            self._wakeup.set()
+        try:
+            return await future
+        finally:
+            self._pending.pop(remote_file.name, None)
+
+    async def _check(self, names: List[str]) -> Dict[str, object]:
+        """Current file objects for `names` (missing ones are left out)"""
+        found = {}
+        list_files = getattr(self.provider, "list_files", None)
+        if list_files is not None and len(names) >= self.batch_min:
+            self.batch_checks += 1
+            try:
+                found = await list_files(set(names))
+            except Exception as e:
+                print(f"[FILES] Batch status check failed: {e}")
+        rest = [name for name in names if name not in found]
+        self.checks += len(rest)
+        results = await asyncio.gather(*[self.provider.get(name) for name in rest], return_exceptions=True)
+        for name, result in zip(rest, results):
+            if not isinstance(result, BaseException):
+                found[name] = result
+        return found
+
+    async def _poll(self):
+        while self._pending:
+            now = time.monotonic()
+            waiting = {name: p for name, p in self._pending.items() if not p["future"].done()}
+            for name, p in waiting.items():
+                if now - p["started"] > self.deadline:
+                    self.timeouts += 1
+                    p["future"].set_exception(ProcessingTimeout(f"{name} still processing after {self.deadline:.0f}s"))
+            due = [name for name, p in waiting.items() if not p["future"].done() and p["next_check"] <= now]
+            if not due:
+                next_check = min((p["next_check"] for p in waiting.values() if not p["future"].done()), default=None)
+                if next_check is None:
+                    # Waiters have not yet removed themselves
+                    await asyncio.sleep(0)
+                    continue
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=next_check - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            found = await self._check(due)
+            now = time.monotonic()
+            for name in due:
+                p = self._pending.get(name)
+                if p is None or p["future"].done():
+                    continue
+                remote_file = found.get(name)
+                if remote_file is not None and file_state(remote_file) != "PROCESSING":
+                    self._record(p["size"], now - p["started"])
+                    p["future"].set_result(remote_file)
+                else:
+                    p["attempt"] += 1
+                    p["next_check"] = now + self._delay(p["attempt"])
+
+    def stats(self) -> Dict:
+        by_size = {}
+        for label, histogram in self._histograms.items():
+            bounds = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+            by_size[label] = {
+                "count": histogram["count"],
+                "mean_seconds": round(histogram["total_seconds"] / histogram["count"], 3),
+                "histogram": dict(zip(bounds, histogram["buckets"])),
+            }
+        return {
+            "processing": len(self._pending),
+            "status_checks": self.checks,
+            "batch_checks": self.batch_checks,
+            "timeouts": self.timeouts,
+            "by_size": by_size,
+        }
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Dict, Optional
+import httpx
+from config.settings import Config
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPPool:
+    """Process-wide pooled httpx.AsyncClient for outbound calls (search, TTS).
+
+    Started and closed by the FastAPI lifespan. Outside the app (scripts,
+    tests) the client is created lazily, and re-created if used from a
+    different event loop since connections are bound to the loop that opened them.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive: int = 20,
+                 keepalive_expiry: float = 30.0, timeout: float = 30.0, http2: bool = True):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.http2 = http2 and _http2_available()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = None
+        self.requests = 0
+
+    @classmethod
+    def from_config(cls) -> "HTTPPool":
+        return cls(
+            max_connections=Config.HTTP_MAX_CONNECTIONS,
+            max_keepalive=Config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+            timeout=Config.HTTP_TIMEOUT,
+            http2=Config.HTTP2_ENABLED,
+        )
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = self._new_client()
+            self._loop = loop
+            print(f"[HTTP] Pool started (http2={self.http2}, max_connections={self.limits.max_connections})")
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = self._new_client()
+            self._loop = loop
+        return self._client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.requests += 1
+        return await self.client.request(method, url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict:
+        return {
+            "http2": self.http2,
+            "requests": self.requests,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
+
+
+http_pool = HTTPPool.from_config()
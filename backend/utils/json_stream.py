@@ -0,0 +1,63 @@
+import json
+import re
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JSONStringFieldExtractor:
+    """Incrementally decode one string field from a streamed JSON object.
+
+    Feed raw model output chunk by chunk; `feed` returns the newly decoded
+    characters of the field's value (possibly ""). Escape sequences split
+    across chunks are held back until complete.
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._pos = None  # index of the next undecoded value character
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        if self.done:
+            return ""
+        self._buffer += chunk
+        if self._pos is None:
+            match = self._key.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+        out = []
+        buffer, i = self._buffer, self._pos
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != '\\':
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break
+            code = buffer[i + 1]
+            if code == 'u':
+                # A surrogate pair is two \uXXXX escapes and must be decoded together
+                width = 12 if buffer[i + 2:i + 4].lower() in ("d8", "d9", "da", "db") else 6
+                if i + width > len(buffer):
+                    break
+                out.append(self._unicode(buffer[i:i + width]))
+                i += width
+            else:
+                out.append(_ESCAPES.get(code, code))
+                i += 2
+        self._pos = i
+        return "".join(out)
+
+    @staticmethod
+    def _unicode(escape: str) -> str:
+        try:
+            return json.loads(f'"{escape}"')
+        except ValueError:
+            return ""
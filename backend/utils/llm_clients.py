@@ -1,32 +1,177 @@
 from google import genai
-from anthropic import Anthropic
-from openai import OpenAI
-from together import Together
-from groq import Groq
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+from together import AsyncTogether
+from groq import AsyncGroq
 from config.settings import Config
+from utils.llm_scheduler import LLMScheduler, Priority, is_rate_limit_error
+from utils.response_cache import response_cache
+from utils.remote_files import RemoteFileRegistry, GeminiFileProvider
+from typing import AsyncIterator, Optional
 import asyncio
 import time
 
 class LLMClients:
     def __init__(self):
+        # All providers use their native asyncio clients so a slow LLM call
+        # never blocks the event loop (SSE streams, judgement POSTs, etc.)
         self.client = genai.Client(api_key=Config.GOOGLE_API_KEY)
-        self.anthropic = Anthropic(api_key=Config.ANTHROPIC_API_KEY) if Config.ANTHROPIC_API_KEY else None
-        self.openai = OpenAI(api_key=Config.OPENAI_API_KEY) if Config.OPENAI_API_KEY else None
-        self.together = Together(api_key=Config.TOGETHER_API_KEY) if Config.TOGETHER_API_KEY else None
-        self.groq = Groq(api_key=Config.GROQ_API_KEY) if Config.GROQ_API_KEY else None
-    
-    async def generate_gemini_pro(self, prompt: str, temperature: float = 0.7) -> str:
-        try:
-            response = self.client.models.generate_content(
+        self.anthropic = AsyncAnthropic(api_key=Config.ANTHROPIC_API_KEY) if Config.ANTHROPIC_API_KEY else None
+        self.openai = AsyncOpenAI(api_key=Config.OPENAI_API_KEY) if Config.OPENAI_API_KEY else None
+        self.together = AsyncTogether(api_key=Config.TOGETHER_API_KEY) if Config.TOGETHER_API_KEY else None
+        self.groq = AsyncGroq(api_key=Config.GROQ_API_KEY) if Config.GROQ_API_KEY else None
+        # Per-provider admission control (concurrency, request/token budgets, priorities)
+        self.scheduler = LLMScheduler.from_config()
+        # Content-addressed cache for deterministic stages (see Config.RESPONSE_CACHE_STAGE_TTLS)
+        self.cache = response_cache
+        # Gemini File API uploads shared across cases by content hash
+        self.files = RemoteFileRegistry.from_config(GeminiFileProvider(self.client))
+
+    async def _call_provider(self, provider: str, prompt: str, priority: Priority, call):
+        """Run `call()` inside the provider's scheduler slot.
+
+        On a 429 the provider's budget is drained for a backoff period and the
+        call is re-queued, so we ride the rate limit instead of failing over.
+        """
+        tokens = LLMScheduler.estimate_tokens(prompt)
+        for attempt in range(Config.LLM_RATE_LIMIT_RETRIES + 1):
+            try:
+                async with self.scheduler.slot(provider, priority, tokens):
+                    return await call()
+            except Exception as e:
+                if await self._backoff_if_rate_limited(provider, attempt, e):
+                    continue
+                raise
+
+    async def _backoff_if_rate_limited(self, provider: str, attempt: int, error: Exception) -> bool:
+        """Back off the provider after a 429 with retries left; False if `error` should propagate"""
+        if attempt >= Config.LLM_RATE_LIMIT_RETRIES or not is_rate_limit_error(error):
+            return False
+        backoff = Config.LLM_RATE_LIMIT_BACKOFF * (2 ** attempt)
+        print(f"[SCHEDULER] {provider} rate limited, backing off {backoff:.1f}s")
+        await self.scheduler.backoff(provider, backoff)
+        return True
+
+    async def _stream_provider(self, provider: str, prompt: str, priority: Priority, open_stream, chunk_text) -> AsyncIterator[str]:
+        """Yield the text of the stream `open_stream()` returns, inside the provider's scheduler slot.
+
+        A 429 before any text is produced backs off and re-queues, as in
+        _call_provider; after that, errors propagate.
+        """
+        tokens = LLMScheduler.estimate_tokens(prompt)
+        for attempt in range(Config.LLM_RATE_LIMIT_RETRIES + 1):
+            produced = False
+            try:
+                async with self.scheduler.slot(provider, priority, tokens):
+                    stream = await open_stream()
+                    async for chunk in stream:
+                        text = chunk_text(chunk)
+                        if text:
+                            produced = True
+                            yield text
+                return
+            except Exception as e:
+                if not produced and await self._backoff_if_rate_limited(provider, attempt, e):
+                    continue
+                raise
+
+    async def _gemini_generate(self, contents, config: dict, priority: Priority, prompt: str):
+        return await self._call_provider(
+            "gemini", prompt, priority,
+            lambda: self.client.aio.models.generate_content(
                 model='gemini-2.0-flash',
-                contents=prompt,
-                config={'temperature': temperature}
+                contents=contents,
+                config=config
             )
+        )
+
+    async def _cached_gemini_text(self, model_key: str, cache_prompt: str, temperature: float, stage: Optional[str], generate) -> str:
+        """Return the cached response for `stage`, or call `generate()` and cache its text.
+
+        Only successful provider responses are cached; fallbacks are not.
+        """
+        cached = await self.cache.get(model_key, cache_prompt, temperature, stage)
+        if cached is not None:
+            print(f"[CACHE] Hit for {stage}")
+            return cached
+        text = await generate()
+        await self.cache.set(model_key, cache_prompt, temperature, stage, text)
+        return text
+
+    async def generate_gemini_pro(self, prompt: str, temperature: float = 0.7, priority: Priority = Priority.DEFAULT, stage: Optional[str] = None) -> str:
+        async def generate():
+            response = await self._gemini_generate(prompt, {'temperature': temperature}, priority, prompt)
             return response.text
+        try:
+            return await self._cached_gemini_text('gemini-2.0-flash', prompt, temperature, stage, generate)
         except Exception as e:
             print(f"[Gemini Pro] Failed: {e}, falling back to Groq")
-            return await self.generate_groq(prompt, temperature)
-    
+            return await self.generate_groq(prompt, temperature, priority=priority)
+
+    async def cached_batch_item(self, prompt: str, temperature: float, stage: str) -> Optional[str]:
+        """Cached Gemini answer for one item of a batched prompt, without calling the model.
+
+        Items are keyed by their own single prompt. Answers given inside a
+        batch are kept under "<stage>_batched", so only batched runs get them
+        (plain generate_gemini_pro calls never do); batched runs also take a
+        single-prompt answer for the stage.
+        """
+        for key_stage in (f"{stage}_batched", stage):
+            cached = await self.cache.get('gemini-2.0-flash', prompt, temperature, key_stage)
+            if cached is not None:
+                print(f"[CACHE] Hit for {key_stage}")
+                return cached
+        return None
+
+    async def cache_batch_item(self, prompt: str, temperature: float, stage: str, text: str):
+        """Record `text` as a batched answer to the single prompt `prompt` (see cached_batch_item)"""
+        await self.cache.set('gemini-2.0-flash', prompt, temperature, f"{stage}_batched", text)
+
+    async def stream_gemini_pro(self, prompt: str, temperature: float = 0.7, priority: Priority = Priority.DEFAULT) -> AsyncIterator[str]:
+        """Stream response text chunks from Gemini, falling back to a Groq stream.
+
+        The fallback only kicks in if Gemini fails before producing any text.
+        """
+        produced = False
+        try:
+            stream = self._stream_provider(
+                "gemini", prompt, priority,
+                lambda: self.client.aio.models.generate_content_stream(
+                    model='gemini-2.0-flash',
+                    contents=prompt,
+                    config={'temperature': temperature}
+                ),
+                lambda chunk: chunk.text
+            )
+            async for text in stream:
+                produced = True
+                yield text
+            return
+        except Exception as e:
+            if produced:
+                raise
+            print(f"[Gemini Pro] Stream failed: {e}, falling back to Groq")
+        async for text in self.stream_groq(prompt, temperature, priority=priority):
+            yield text
+
+    async def stream_groq(self, prompt: str, temperature: float = 0.7, priority: Priority = Priority.DEFAULT) -> AsyncIterator[str]:
+        """Stream response text chunks from Groq (Llama 3)"""
+        if not self.groq:
+            yield "Groq API not configured"
+            return
+        stream = self._stream_provider(
+            "groq", prompt, priority,
+            lambda: self.groq.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                stream=True
+            ),
+            lambda chunk: chunk.choices[0].delta.content if chunk.choices else None
+        )
+        async for text in stream:
+            yield text
+
     # async def generate_gemini_grounded(self, prompt: str) -> str:
     #     """Generate response using Gemini with Google Search grounding"""
     #     response = self.client.models.generate_content(
@@ -40,181 +185,135 @@ class LLMClients:
     #     )
     #     return response.text
 
-    async def generate_gemini_flash(self, prompt: str, temperature: float = 0.7) -> str:
-        try:
-            response = self.client.models.generate_content(
-                model='gemini-2.0-flash',
-                contents=prompt,
-                config={'temperature': temperature}
-            )
+    async def generate_gemini_flash(self, prompt: str, temperature: float = 0.7, priority: Priority = Priority.DEFAULT, stage: Optional[str] = None) -> str:
+        async def generate():
+            response = await self._gemini_generate(prompt, {'temperature': temperature}, priority, prompt)
             return response.text
+        try:
+            return await self._cached_gemini_text('gemini-2.0-flash', prompt, temperature, stage, generate)
         except Exception as e:
             print(f"[Gemini Flash] Failed: {e}, falling back to Groq")
-            return await self.generate_groq(prompt, temperature)
-    
-    async def generate_gemini_grounded(self, prompt: str) -> str:
+            return await self.generate_groq(prompt, temperature, priority=priority)
+
+    async def generate_gemini_grounded(self, prompt: str, priority: Priority = Priority.DEFAULT, stage: Optional[str] = None) -> str:
         """Generate grounded response using Gemini with Google Search"""
-        try:
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
-                config={
+        async def generate():
+            response = await self._gemini_generate(
+                prompt,
+                {
                     "temperature": 0.3,
                     "tools": [{"google_search": {}}],
                     "automatic_function_calling": {"disable": False}
-                }
+                },
+                priority,
+                prompt
             )
-            
+
             if hasattr(response, "text") and response.text:
                 return response.text
-            
+
             if response.candidates:
                 parts = response.candidates[0].content.parts
                 return "".join(part.text for part in parts if hasattr(part, "text"))
-            
+
             return ""
+        try:
+            return await self._cached_gemini_text('gemini-2.0-flash+google_search', prompt, 0.3, stage, generate)
         except Exception as e:
             print(f"[Gemini Grounded] Failed: {e}, falling back to Groq")
-            return await self.generate_groq(prompt, 0.3)
-    
-    async def analyze_url_content(self, url: str, prompt: str) -> str:
+            return await self.generate_groq(prompt, 0.3, priority=priority)
+
+    async def analyze_url_content(self, url: str, prompt: str, priority: Priority = Priority.DEFAULT, stage: Optional[str] = None) -> str:
         """Analyze content from a URL using Gemini"""
-        response = self.client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents=[url, prompt],
-            config={'temperature': 0.3}
-        )
-        return response.text
-    
-    
-    async def analyze_video_with_file(self, video_file_path: str, prompt: str) -> tuple[str, any]:
-        """Analyze video content using Gemini and return both response and file object for reuse"""
-        # Upload video file to Gemini
-        print(f"[VIDEO] Uploading video: {video_file_path}")
-        video_file = self.client.files.upload(file=video_file_path)
-        print(f"[VIDEO] Upload complete. File name: {video_file.name}")
-        print(f"[VIDEO] Processing state: {video_file.state}")
-        
-        # Wait for processing
-        while video_file.state == "PROCESSING":
-            print("[VIDEO] Waiting for video processing...")
-            await asyncio.sleep(2)
-            video_file = self.client.files.get(name=video_file.name)
-        
-        if video_file.state == "FAILED":
-            raise Exception(f"Video processing failed: {video_file.name}")
-        
-        print(f"[VIDEO] Processing complete. Generating content...")
-        
-        # Generate content from video
-        response = self.client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents=[video_file, prompt],
-            config={'temperature': 0.3}
-        )
-        
-        # Return both response and file object (don't delete yet)
-        return response.text, video_file
-    
-    async def analyze_video(self, video_file_path: str, prompt: str) -> str:
-        """Analyze video content using Gemini"""
-        # Upload video file to Gemini
-        print(f"[VIDEO] Uploading video: {video_file_path}")
-        video_file = self.client.files.upload(file=video_file_path)
-        print(f"[VIDEO] Upload complete. File name: {video_file.name}")
-        print(f"[VIDEO] Processing state: {video_file.state}")
-        
-        # Wait for processing
-        while video_file.state == "PROCESSING":
-            print("[VIDEO] Waiting for video processing...")
-            await asyncio.sleep(2)
-            video_file = self.client.files.get(name=video_file.name)
-        
-        if video_file.state == "FAILED":
-            raise Exception(f"Video processing failed: {video_file.name}")
-        
-        print(f"[VIDEO] Processing complete. Generating content...")
-        
-        # Generate content from video
-        response = self.client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents=[video_file, prompt],
-            config={'temperature': 0.3}
-        )
-        
-        # Clean up uploaded file
-        try:
-            self.client.files.delete(name=video_file.name)
-            print(f"[VIDEO] Cleaned up uploaded file: {video_file.name}")
-        except:
-            pass
-        
-        return response.text
-    
-    async def analyze_image(self, image_file_path: str, prompt: str) -> str:
-        """Analyze image content using Gemini"""
-        print(f"[IMAGE] Uploading image: {image_file_path}")
-        
-        # Upload image file to Gemini
-        image_file = self.client.files.upload(file=image_file_path)
-        print(f"[IMAGE] Upload complete. File name: {image_file.name}")
-        
-        # Generate content from image
-        response = self.client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents=[image_file, prompt],
-            config={'temperature': 0.3}
-        )
-        
-        # Clean up uploaded file
-        try:
-            self.client.files.delete(name=image_file.name)
-            print(f"[IMAGE] Cleaned up uploaded file: {image_file.name}")
-        except:
-            pass
-        
-        return response.text
-
-    
-    async def generate_claude(self, prompt: str, temperature: float = 0.7) -> str:
+        async def generate():
+            response = await self._gemini_generate([url, prompt], {'temperature': 0.3}, priority, prompt)
+            return response.text
+        return await self._cached_gemini_text('gemini-2.0-flash', f"{url}\n{prompt}", 0.3, stage, generate)
+
+
+    async def analyze_video(self, video_file_path: str, prompt: str, priority: Priority = Priority.DEFAULT,
+                            content_hash: Optional[str] = None, stage: Optional[str] = None) -> str:
+        """Analyze video content using Gemini.
+
+        The upload comes from the remote file registry, so repeated analyses of
+        the same clip (claims, then forensics, or another case) share it. With
+        a content hash the response is also cached for `stage`.
+        """
+        async def generate():
+            async with self.files.use(video_file_path, content_hash) as video_file:
+                print(f"[VIDEO] Generating content from {video_file.name}...")
+                response = await self._gemini_generate([video_file, prompt], {'temperature': 0.3}, priority, prompt)
+            return response.text
+
+        if content_hash is None:
+            stage = None
+        return await self._cached_gemini_text('gemini-2.0-flash', f"{content_hash}\n{prompt}", 0.3, stage, generate)
+
+    async def analyze_image(self, image_file_path: str, prompt: str, priority: Priority = Priority.DEFAULT,
+                            content_hash: Optional[str] = None, stage: Optional[str] = None) -> str:
+        """Analyze image content using Gemini (cached by content hash when one is given)"""
+        async def generate():
+            async with self.files.use(image_file_path, content_hash) as image_file:
+                print(f"[IMAGE] Generating content from {image_file.name}...")
+                response = await self._gemini_generate([image_file, prompt], {'temperature': 0.3}, priority, prompt)
+            return response.text
+
+        if content_hash is None:
+            stage = None
+        return await self._cached_gemini_text('gemini-2.0-flash', f"{content_hash}\n{prompt}", 0.3, stage, generate)
+
+
+    async def generate_claude(self, prompt: str, temperature: float = 0.7, priority: Priority = Priority.DEFAULT) -> str:
         if not self.anthropic:
             return "Claude API not configured"
-        message = self.anthropic.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=2048,
-            temperature=temperature,
-            messages=[{"role": "user", "content": prompt}]
+        message = await self._call_provider(
+            "anthropic", prompt, priority,
+            lambda: self.anthropic.messages.create(
+                model="claude-3-5-sonnet-20241022",
+                max_tokens=2048,
+                temperature=temperature,
+                messages=[{"role": "user", "content": prompt}]
+            )
         )
         return message.content[0].text
-    
-    async def generate_gpt4(self, prompt: str, temperature: float = 0.7) -> str:
+
+    async def generate_gpt4(self, prompt: str, temperature: float = 0.7, priority: Priority = Priority.DEFAULT) -> str:
         if not self.openai:
             return "OpenAI API not configured"
-        response = self.openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature
+        response = await self._call_provider(
+            "openai", prompt, priority,
+            lambda: self.openai.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature
+            )
         )
         return response.choices[0].message.content
-    
-    async def generate_llama(self, prompt: str, temperature: float = 0.7) -> str:
+
+    async def generate_llama(self, prompt: str, temperature: float = 0.7, priority: Priority = Priority.DEFAULT) -> str:
         if not self.together:
             return "Together API not configured"
-        response = self.together.chat.completions.create(
-            model="meta-llama/Llama-3-70b-chat-hf",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature
+        response = await self._call_provider(
+            "together", prompt, priority,
+            lambda: self.together.chat.completions.create(
+                model="meta-llama/Llama-3-70b-chat-hf",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature
+            )
         )
         return response.choices[0].message.content
-    
-    async def generate_groq(self, prompt: str, temperature: float = 0.7) -> str:
+
+    async def generate_groq(self, prompt: str, temperature: float = 0.7, priority: Priority = Priority.DEFAULT) -> str:
         """Generate response using Groq (Llama 3)"""
         if not self.groq:
             return "Groq API not configured"
-        response = self.groq.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature
+        response = await self._call_provider(
+            "groq", prompt, priority,
+            lambda: self.groq.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature
+            )
         )
         return response.choices[0].message.content
 
@@ -0,0 +1,207 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, Optional
+from config.settings import Config
+
+
+class Priority(IntEnum):
+    """Admission priority for LLM calls (lower value is served first)"""
+    INTERACTIVE = 0  # courtroom turns the user is actively waiting on
+    DEFAULT = 1
+    BACKGROUND = 2   # reports, juror notes and other off-critical-path work
+
+
+# Lowest priority LLM calls in the current task may be admitted at; bulk jobs
+# set BACKGROUND so their agents never queue ahead of interactive trials
+priority_floor: ContextVar[Priority] = ContextVar("llm_priority_floor", default=Priority.INTERACTIVE)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate_per_minute`"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def drain(self, seconds: float):
+        """Push the bucket into debt so nothing is admitted for `seconds`"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class ProviderLimiter:
+    """Concurrency cap + request/token budgets + priority queue for one provider"""
+
+    def __init__(self, name: str, max_concurrency: int, requests_per_minute: float, tokens_per_minute: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._cond = None
+        self._loop = None
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self.in_flight = 0
+
+        # Metrics
+        self.admitted = 0
+        self.admitted_by_priority = {p.name.lower(): 0 for p in Priority}
+        self.rate_limited = 0
+        self.total_wait_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives bind to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._cond = asyncio.Condition()
+            self._waiting = []
+            self.in_flight = 0
+        return self._cond
+
+    def _can_admit(self, entry, tokens: int) -> float:
+        """Return -1 if not at the head / no free slot, else seconds until budgets allow it"""
+        if not self._waiting or self._waiting[0] != entry or self.in_flight >= self.max_concurrency:
+            return -1
+        return max(self.requests.delay(1), self.tokens.delay(tokens))
+
+    async def acquire(self, priority: Priority, tokens: int):
+        entry = (int(priority), next(self._seq))
+        enqueued_at = time.monotonic()
+        cond = self._condition()
+        async with cond:
+            heapq.heappush(self._waiting, entry)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+            try:
+                while True:
+                    delay = self._can_admit(entry, tokens)
+                    if delay == 0:
+                        break
+                    if delay < 0:
+                        await cond.wait()
+                    else:
+                        # At the head of the queue but over budget: sleep until the
+                        # buckets refill (or something else changes)
+                        try:
+                            await asyncio.wait_for(cond.wait(), timeout=delay)
+                        except asyncio.TimeoutError:
+                            pass
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                cond.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.in_flight += 1
+            self.admitted += 1
+            self.admitted_by_priority[priority.name.lower()] += 1
+            self.total_wait_seconds += time.monotonic() - enqueued_at
+            cond.notify_all()
+
+    async def release(self):
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            cond.notify_all()
+
+    async def backoff(self, seconds: float):
+        """Provider told us to slow down (HTTP 429): hold new admissions for `seconds`"""
+        cond = self._condition()
+        async with cond:
+            self.rate_limited += 1
+            self.requests.drain(seconds)
+            cond.notify_all()
+
+    def metrics(self) -> Dict:
+        return {
+            "queue_depth": len(self._waiting),
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "admitted": self.admitted,
+            "admitted_by_priority": dict(self.admitted_by_priority),
+            "rate_limited": self.rate_limited,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.admitted, 4) if self.admitted else 0.0,
+            "request_tokens_available": round(max(self.requests.tokens, 0.0), 2),
+            "token_budget_available": round(max(self.tokens.tokens, 0.0), 2),
+        }
+
+
+class LLMScheduler:
+    """Admission control for all LLM providers used by LLMClients"""
+
+    def __init__(self, limits: Dict[str, Dict]):
+        self.limiters = {
+            name: ProviderLimiter(
+                name,
+                max_concurrency=cfg["max_concurrency"],
+                requests_per_minute=cfg["rpm"],
+                tokens_per_minute=cfg["tpm"],
+            )
+            for name, cfg in limits.items()
+        }
+
+    @classmethod
+    def from_config(cls) -> "LLMScheduler":
+        return cls(Config.LLM_PROVIDER_LIMITS)
+
+    @staticmethod
+    def estimate_tokens(prompt: str, max_output_tokens: int = 1024) -> int:
+        """Rough token estimate (~4 characters per token) for budget accounting"""
+        return len(prompt) // 4 + max_output_tokens
+
+    @asynccontextmanager
+    async def slot(self, provider: str, priority: Priority = Priority.DEFAULT, tokens: int = 0):
+        limiter = self.limiters.get(provider)
+        if limiter is None:
+            yield
+            return
+        await limiter.acquire(max(priority, priority_floor.get()), tokens)
+        try:
+            yield
+        finally:
+            await limiter.release()
+
+    async def backoff(self, provider: str, seconds: float):
+        limiter = self.limiters.get(provider)
+        if limiter:
+            await limiter.backoff(seconds)
+
+    def metrics(self) -> Dict:
+        return {name: limiter.metrics() for name, limiter in self.limiters.items()}
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Best-effort detection of provider 429 / quota errors across SDKs"""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "resource_exhausted" in message or "rate limit" in message
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Set by bulk runs: agents route eligible calls in this task through their batcher
+batching_enabled: ContextVar[bool] = ContextVar("prompt_batching", default=False)
+
+
+def format_items(items: List[str]) -> str:
+    """Mark each item of a batched prompt with its ID (item_1, item_2, ...)"""
+    return "\n\n".join(f"[item_{i}]\n{text}\n[/item_{i}]" for i, text in enumerate(items, 1))
+
+
+def parse_items(response: str, count: int) -> List[Any]:
+    """Per-item values of a batched answer {"item_1": ..., ...}; None where an ID is missing"""
+    try:
+        data = json.loads(response[response.find('{'):response.rfind('}') + 1])
+    except ValueError:
+        return [None] * count
+    if not isinstance(data, dict):
+        return [None] * count
+    return [data.get(f"item_{i}") for i in range(1, count + 1)]
+
+
+class PromptBatcher:
+    """Coalesces concurrent single-item LLM calls into one multi-item prompt.
+
+    `submit` queues a payload; a batch is sent once `batch_size` payloads
+    are queued or `max_wait` seconds after the first one. `run_batch` gets
+    the payloads and returns one result per payload, None where the model's
+    answer for that item was missing or invalid. Those items (or all of
+    them, if the batch call fails) are retried individually with `run_one`.
+    """
+
+    def __init__(self, stage: str, run_batch: Callable[[List[Any]], Awaitable[List[Optional[Any]]]],
+                 run_one: Callable[[Any], Awaitable[Any]], batch_size: int, max_wait: float):
+        self.stage = stage
+        self.run_batch = run_batch
+        self.run_one = run_one
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes = set()
+        self.batches = 0
+        self.items = 0
+        self.retried = 0
+        self.batch_failures = 0
+
+    async def submit(self, payload: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((payload, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            # Keep a reference so the flush is not garbage collected
+            task = asyncio.create_task(self._run(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        # Callers that gave up (cancelled) are dropped from the prompt
+        batch = [(payload, future) for payload, future in batch if not future.done()]
+        if not batch:
+            return
+        payloads = [payload for payload, _ in batch]
+        if len(batch) == 1:
+            # A lone item takes the ordinary single-item prompt
+            results = [None]
+        else:
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await self.run_batch(payloads)
+            except Exception as e:
+                print(f"[BATCH] {self.stage} batch of {len(batch)} failed: {e}; retrying items individually")
+                self.batch_failures += 1
+                results = [None] * len(batch)
+        retries = [i for i, result in enumerate(results) if result is None]
+        if len(batch) > 1 and retries:
+            print(f"[BATCH] {self.stage}: {len(retries)}/{len(batch)} items invalid, retrying individually")
+            self.retried += len(retries)
+
+        async def one(i):
+            try:
+                return await self.run_one(payloads[i])
+            except Exception as e:
+                return e
+        retried = await asyncio.gather(*[one(i) for i in retries])
+        for i, result in zip(retries, retried):
+            results[i] = result
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        return {
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "retried_individually": self.retried,
+            "batch_failures": self.batch_failures,
+        }
@@ -0,0 +1,251 @@
+"""
+Registry of files uploaded to the Gemini File API, keyed by SHA-256 of the local file.
+
+The same clip submitted by several cases (or twice by one case: claim
+extraction, then video forensics) is uploaded and processed once. Cases
+acquire a reference while they use the remote file; releasing it does not
+delete anything. A janitor deletes files that have been unreferenced for
+REMOTE_FILE_IDLE_SECONDS and forgets ones that are about to expire
+remotely (Gemini keeps uploads for 48 hours).
+
+The registry is per process; with several workers each keeps its own.
+"""
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+from config.settings import Config
+from utils.file_processing import ProcessingTracker, ProcessingTimeout, file_state
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GeminiFileProvider:
+    """Gemini File API via the google-genai async client"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def upload(self, path: str):
+        return await self.client.aio.files.upload(file=path)
+
+    async def get(self, name: str):
+        return await self.client.aio.files.get(name=name)
+
+    async def delete(self, name: str):
+        await self.client.aio.files.delete(name=name)
+
+    async def list_files(self, names: set, max_pages: int = 5) -> Dict:
+        """Look up several files with paged `files.list` calls instead of one `get` each"""
+        found = {}
+        pager = await self.client.aio.files.list(config={"page_size": 100})
+        for _ in range(max_pages):
+            found.update((f.name, f) for f in pager.page if f.name in names)
+            if len(found) == len(names) or not pager.config.get("page_token"):
+                break
+            await pager.next_page()
+        return found
+
+
+class InMemoryFileProvider:
+    """Offline stand-in for the Gemini File API (tests and benchmarks).
+
+    Uploads stay PROCESSING for `processing_seconds`, then become ACTIVE.
+    """
+
+    def __init__(self, processing_seconds: float = 0.0, ttl_seconds: float = 48 * 3600, upload_latency: float = 0.0):
+        self.processing_seconds = processing_seconds
+        self.ttl_seconds = ttl_seconds
+        self.upload_latency = upload_latency
+        self.files: Dict[str, Dict] = {}
+        self.uploads = 0
+        self.gets = 0
+        self.lists = 0
+        self.deletes = 0
+
+    def _view(self, name: str):
+        f = self.files[name]
+        ready = time.monotonic() >= f["ready_at"]
+        return SimpleNamespace(name=name, state="ACTIVE" if ready else "PROCESSING",
+                               size_bytes=f["size_bytes"], expiration_time=f["expiration_time"])
+
+    async def upload(self, path: str):
+        await asyncio.sleep(self.upload_latency)
+        name = f"files/{uuid.uuid4().hex[:12]}"
+        self.files[name] = {
+            "size_bytes": os.path.getsize(path),
+            "ready_at": time.monotonic() + self.processing_seconds,
+            "expiration_time": datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds),
+        }
+        self.uploads += 1
+        return self._view(name)
+
+    async def get(self, name: str):
+        self.gets += 1
+        if name not in self.files:
+            raise KeyError(name)
+        return self._view(name)
+
+    async def list_files(self, names: set) -> Dict:
+        self.lists += 1
+        return {name: self._view(name) for name in names if name in self.files}
+
+    async def delete(self, name: str):
+        self.deletes += 1
+        self.files.pop(name, None)
+
+
+class RemoteFileRegistry:
+    """Reference-counted, content-addressed cache of remote (provider-side) files"""
+
+    def __init__(self, provider, idle_seconds: float = 3600, expiry_margin_seconds: float = 600,
+                 default_ttl_seconds: float = 47 * 3600, tracker: Optional[ProcessingTracker] = None):
+        self.provider = provider
+        self.tracker = tracker or ProcessingTracker(provider)
+        self.idle_seconds = idle_seconds
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self.default_ttl_seconds = default_ttl_seconds
+        # sha256 -> {file, name, state, expires_at, refs, last_used}
+        self.entries: Dict[str, Dict] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.uploads = 0
+        self.reused = 0
+        self.coalesced = 0
+        self.deleted = 0
+
+    @classmethod
+    def from_config(cls, provider) -> "RemoteFileRegistry":
+        return cls(provider, Config.REMOTE_FILE_IDLE_SECONDS, Config.REMOTE_FILE_EXPIRY_MARGIN_SECONDS,
+                   tracker=ProcessingTracker.from_config(provider))
+
+    def _expires_at(self, remote_file) -> float:
+        expiration = getattr(remote_file, "expiration_time", None)
+        if isinstance(expiration, datetime):
+            return expiration.timestamp()
+        return time.time() + self.default_ttl_seconds
+
+    def _usable(self, entry: Dict) -> bool:
+        return time.time() < entry["expires_at"] - self.expiry_margin_seconds
+
+    async def _upload(self, path: str):
+        print(f"[FILES] Uploading {path}")
+        remote_file = await self.provider.upload(path)
+        print(f"[FILES] Upload complete. File name: {remote_file.name}")
+        try:
+            remote_file = await self.tracker.wait(remote_file, await asyncio.to_thread(os.path.getsize, path))
+        except ProcessingTimeout:
+            await self._delete(remote_file.name)
+            raise
+        if file_state(remote_file) == "FAILED":
+            await self._delete(remote_file.name)
+            raise Exception(f"File processing failed: {remote_file.name}")
+        self.uploads += 1
+        return remote_file
+
+    async def _delete(self, name: str):
+        try:
+            await self.provider.delete(name)
+            self.deleted += 1
+        except Exception as e:
+            print(f"[FILES] Could not delete {name}: {e}")
+
+    async def acquire(self, path: str, content_hash: Optional[str] = None) -> Any:
+        """Return an ACTIVE remote file for `path`, uploading it only if needed.
+
+        Every acquire must be paired with `release(content_hash)`; prefer `use()`.
+        """
+        key = content_hash or await asyncio.to_thread(file_sha256, path)
+        while True:
+            entry = self.entries.get(key)
+            if entry is not None and self._usable(entry):
+                entry["refs"] += 1
+                entry["last_used"] = time.time()
+                self.reused += 1
+                return entry["file"]
+            if key in self._inflight:
+                self.coalesced += 1
+                await asyncio.shield(self._inflight[key])
+                continue
+            break
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            remote_file = await self._upload(path)
+            stale = self.entries.get(key)
+            self.entries[key] = {
+                "file": remote_file,
+                "name": remote_file.name,
+                "state": file_state(remote_file),
+                "expires_at": self._expires_at(remote_file),
+                "refs": 1 + (stale["refs"] if stale else 0),
+                "last_used": time.time(),
+            }
+            future.set_result(None)
+            return remote_file
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def release(self, content_hash: str):
+        """Drop one reference; deletion is left to the janitor"""
+        entry = self.entries.get(content_hash)
+        if entry is not None and entry["refs"] > 0:
+            entry["refs"] -= 1
+            entry["last_used"] = time.time()
+
+    @asynccontextmanager
+    async def use(self, path: str, content_hash: Optional[str] = None):
+        key = content_hash or await asyncio.to_thread(file_sha256, path)
+        remote_file = await self.acquire(path, key)
+        try:
+            yield remote_file
+        finally:
+            self.release(key)
+
+    async def sweep(self) -> int:
+        """Delete unreferenced files that are idle or close to expiry"""
+        now = time.time()
+        doomed = [
+            key for key, entry in self.entries.items()
+            if entry["refs"] == 0 and (now - entry["last_used"] > self.idle_seconds or not self._usable(entry))
+        ]
+        for key in doomed:
+            entry = self.entries.pop(key)
+            await self._delete(entry["name"])
+        return len(doomed)
+
+    async def run_janitor(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.sweep()
+                if removed:
+                    print(f"[FILES] Janitor deleted {removed} remote files")
+            except Exception as e:
+                print(f"[FILES] Janitor failed: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "files": len(self.entries),
+            "referenced": sum(1 for entry in self.entries.values() if entry["refs"] > 0),
+            "uploads": self.uploads,
+            "reused": self.reused,
+            "coalesced": self.coalesced,
+            "deleted": self.deleted,
+            "processing": self.tracker.stats(),
+        }
@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+from config.settings import Config
+
+
+class CacheTier(ABC):
+    """Interface for a response cache tier. Implementations are synchronous;
+    ResponseCache decides which ones run off the event loop."""
+
+    name = "tier"
+    blocking = False  # True if get/set do I/O and should run in a thread
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: str, stage: str, ttl: float):
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {}
+
+
+class MemoryLRUTier(CacheTier):
+    """In-process LRU bounded by entry count and total bytes"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, size = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, stage: str, ttl: float):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.time() + ttl, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class SQLiteTier(CacheTier):
+    """On-disk tier shared by all workers on the host, evicted by last access"""
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._writes = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)")
+        self._bytes = self._total_bytes()
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str, stage: str, ttl: float):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, stage, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, stage, value, size, now + ttl, now)
+            )
+            self._writes += 1
+            # Other workers write to the same file, so resync the running total now and then
+            if self._writes % 100 == 0:
+                self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                self._bytes = self._total_bytes()
+            else:
+                self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k, _ in rows])
+            self._bytes -= sum(size for _, size in rows)
+            self.evictions += len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": entries, "bytes": self._bytes, "evictions": self.evictions, "path": self.path}
+
+
+class ResponseCache:
+    """Content-addressed cache for deterministic LLM stages.
+
+    Keys are sha256(model, temperature, stage, prompt). Only stages with a
+    configured TTL are cached. Tiers are checked in order and a hit in a
+    lower tier is promoted into the tiers above it.
+    """
+
+    def __init__(self, tiers: List[CacheTier], stage_ttls: Dict[str, float], enabled: bool = True):
+        self.tiers = tiers
+        self.stage_ttls = stage_ttls
+        self.enabled = enabled
+        self.hits = {}    # stage -> count
+        self.misses = {}  # stage -> count
+        self.tier_hits = {tier.name: 0 for tier in tiers}
+
+    @classmethod
+    def from_config(cls) -> "ResponseCache":
+        tiers = [MemoryLRUTier(Config.RESPONSE_CACHE_MEMORY_ENTRIES, Config.RESPONSE_CACHE_MEMORY_MAX_BYTES)]
+        if Config.RESPONSE_CACHE_PATH:
+            tiers.append(SQLiteTier(Config.RESPONSE_CACHE_PATH, Config.RESPONSE_CACHE_DISK_MAX_BYTES))
+        return cls(tiers, Config.RESPONSE_CACHE_STAGE_TTLS, enabled=Config.RESPONSE_CACHE_ENABLED)
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float, stage: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, f"{temperature:.3f}", stage, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def is_cacheable(self, stage: Optional[str]) -> bool:
+        return self.enabled and stage is not None and self.stage_ttls.get(stage, 0) > 0
+
+    async def _run(self, tier: CacheTier, fn, *args):
+        if tier.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get(self, model: str, prompt: str, temperature: float, stage: Optional[str]) -> Optional[str]:
+        if not self.is_cacheable(stage):
+            return None
+        key = self.make_key(model, prompt, temperature, stage)
+        ttl = self.stage_ttls[stage]
+        for i, tier in enumerate(self.tiers):
+            value = await self._run(tier, tier.get, key)
+            if value is not None:
+                self.hits[stage] = self.hits.get(stage, 0) + 1
+                self.tier_hits[tier.name] += 1
+                for upper in self.tiers[:i]:
+                    await self._run(upper, upper.set, key, value, stage, ttl)
+                return value
+        self.misses[stage] = self.misses.get(stage, 0) + 1
+        return None
+
+    async def set(self, model: str, prompt: str, temperature: float, stage: Optional[str], value: str):
+        if not value or not self.is_cacheable(stage):
+            return
+        key = self.make_key(model, prompt, temperature, stage)
+        ttl = self.stage_ttls[stage]
+        for tier in self.tiers:
+            await self._run(tier, tier.set, key, value, stage, ttl)
+
+    async def clear(self):
+        for tier in self.tiers:
+            await self._run(tier, tier.clear)
+
+    def stats(self) -> Dict:
+        stages = sorted(set(self.hits) | set(self.misses))
+        total_hits = sum(self.hits.values())
+        total = total_hits + sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "hits": total_hits,
+            "misses": total - total_hits,
+            "hit_ratio": round(total_hits / total, 4) if total else 0.0,
+            "by_stage": {
+                stage: {"hits": self.hits.get(stage, 0), "misses": self.misses.get(stage, 0)}
+                for stage in stages
+            },
+            "tier_hits": dict(self.tier_hits),
+            "tiers": {tier.name: tier.stats() for tier in self.tiers},
+        }
+
+
+response_cache = ResponseCache.from_config()
@@ -0,0 +1,152 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with all my".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def document_text(item) -> str:
+    """Flatten the string/number leaves of a stored item into searchable text"""
+    if isinstance(item, dict):
+        return " ".join(document_text(v) for v in item.values())
+    if isinstance(item, (list, tuple)):
+        return " ".join(document_text(v) for v in item)
+    if isinstance(item, (str, int, float)):
+        return str(item)
+    return ""
+
+
+class BM25Index:
+    """Incremental Okapi BM25 over an inverted index.
+
+    Documents are only ever appended; idf and average length are computed at
+    query time so no re-indexing is needed on insert.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> {doc_id: term frequency}
+        self.doc_lengths = []
+        self.total_length = 0
+
+    def add(self, text: str) -> int:
+        doc_id = len(self.doc_lengths)
+        terms = tokenize(text)
+        for term, tf in Counter(terms).items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.doc_lengths.append(len(terms))
+        self.total_length += len(terms)
+        return doc_id
+
+    def scores(self, query: str) -> Dict[int, float]:
+        n = len(self.doc_lengths)
+        if n == 0:
+            return {}
+        avg_length = self.total_length / n or 1.0
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+
+class HashingEmbedder:
+    """Local, stateless embedder: signed feature hashing of unigrams and bigrams"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        return h % self.dim, (1.0 if (h >> 63) & 1 else -1.0)
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        terms = tokenize(text)
+        for feature in terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]:
+            index, sign = self._bucket(feature)
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class DenseIndex:
+    """Append-only matrix of unit vectors searched by cosine similarity"""
+
+    def __init__(self, embedder: HashingEmbedder):
+        self.embedder = embedder
+        self._matrix = np.zeros((16, embedder.dim), dtype=np.float32)
+        self._count = 0
+
+    def add(self, text: str):
+        if self._count == len(self._matrix):
+            self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+        self._matrix[self._count] = self.embedder.embed(text)
+        self._count += 1
+
+    def scores(self, query: str) -> np.ndarray:
+        return self._matrix[:self._count] @ self.embedder.embed(query)
+
+
+class NamespaceIndex:
+    """Items of one blackboard namespace, ranked by BM25 (plus cosine similarity
+    of hashed embeddings when `dense` is set).
+
+    Results are padded with unmatched items in insertion order, so callers
+    always get min(top_k, len(items)) items back.
+    """
+
+    def __init__(self, dense: bool = False, embedding_dim: int = 256):
+        self.items = []
+        self.bm25 = BM25Index()
+        self.dense = DenseIndex(HashingEmbedder(embedding_dim)) if dense else None
+
+    def add(self, item):
+        text = document_text(item)
+        self.items.append(item)
+        self.bm25.add(text)
+        if self.dense is not None:
+            self.dense.add(text)
+
+    def search(self, query: Optional[str], top_k: int = 5) -> List:
+        if top_k <= 0 or not self.items:
+            return []
+        combined = np.zeros(len(self.items))
+        bm25 = self.bm25.scores(query or "")
+        if bm25:
+            ids = np.fromiter(bm25.keys(), dtype=np.int64, count=len(bm25))
+            values = np.fromiter(bm25.values(), dtype=np.float64, count=len(bm25))
+            combined[ids] = values / values.max()
+        if self.dense is not None and query:
+            combined += np.clip(self.dense.scores(query), 0, None)
+
+        matched = np.flatnonzero(combined > 0)
+        k = min(top_k, len(matched))
+        ranked = []
+        if k:
+            top = matched[np.argpartition(-combined[matched], k - 1)[:k]]
+            ranked = top[np.lexsort((top, -combined[top]))].tolist()
+        if len(ranked) < top_k:
+            taken = set(ranked)
+            for doc_id in range(len(self.items)):
+                if len(ranked) == top_k:
+                    break
+                if doc_id not in taken:
+                    ranked.append(doc_id)
+        return [self.items[doc_id] for doc_id in ranked]
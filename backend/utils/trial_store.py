@@ -0,0 +1,380 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional
+from config.settings import Config
+
+
+class TrialStore(ABC):
+    """Storage for trial records and per-case judgment delivery.
+
+    A record is a dict like {"state": TrialState, "status": str, "streaming": bool, ...}.
+    Backends must make `pop_judgment` see judgments pushed from any process
+    that shares the store.
+
+    `streaming` is a lease held by the run of the trial: the run renews it
+    while it is alive, and a lease not renewed within `lease_seconds` (the
+    worker died) counts as free again.
+    """
+
+    @abstractmethod
+    async def create(self, case_id: str, record: Dict):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, case_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update(self, case_id: str, **fields):
+        """Merge top-level fields into the record"""
+        raise NotImplementedError
+
+    async def save_state(self, case_id: str, state: Dict):
+        await self.update(case_id, state=state)
+
+    @abstractmethod
+    async def delete(self, case_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def try_start_stream(self, case_id: str, owner: str) -> bool:
+        """Atomically take the trial's run lease for `owner`; False if someone else holds it"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def renew_stream(self, case_id: str, owner: str) -> bool:
+        """Extend `owner`'s lease; False if it no longer holds it"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def end_stream(self, case_id: str, owner: str):
+        """Release the lease if `owner` still holds it"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def push_judgment(self, case_id: str, judgement: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def pop_judgment(self, case_id: str, timeout: float) -> Optional[str]:
+        """Wait up to `timeout` seconds for the next judgment; None on timeout.
+
+        `timeout=0` only takes a judgment that is already queued.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def has_judgment(self, case_id: str) -> bool:
+        """True if a judgment is queued (without taking it)"""
+        raise NotImplementedError
+
+    async def sweep(self) -> int:
+        """Evict expired trials; returns the number removed"""
+        return 0
+
+    async def run_sweeper(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.sweep()
+                if removed:
+                    print(f"[TRIAL STORE] Evicted {removed} expired trials")
+            except Exception as e:
+                print(f"[TRIAL STORE] Sweep failed: {e}")
+
+
+class InMemoryTrialStore(TrialStore):
+    """Process-local store with TTL eviction (single worker only)"""
+
+    def __init__(self, ttl_seconds: float, lease_seconds: float = Config.STREAM_LEASE_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._records = {}
+        self._queues = {}
+        self._touched = {}
+        self._leases = {}  # case_id -> (owner, expires_at)
+
+    def _expired(self, case_id: str) -> bool:
+        return time.time() - self._touched.get(case_id, 0) > self.ttl_seconds
+
+    def _leased(self, case_id: str) -> bool:
+        lease = self._leases.get(case_id)
+        return lease is not None and lease[1] > time.time()
+
+    def _evict(self, case_id: str):
+        self._records.pop(case_id, None)
+        self._queues.pop(case_id, None)
+        self._touched.pop(case_id, None)
+        self._leases.pop(case_id, None)
+
+    async def create(self, case_id: str, record: Dict):
+        self._records[case_id] = record
+        self._queues[case_id] = asyncio.Queue()
+        self._touched[case_id] = time.time()
+
+    async def get(self, case_id: str) -> Optional[Dict]:
+        if case_id not in self._records:
+            return None
+        leased = self._leased(case_id)
+        if self._expired(case_id) and not leased:
+            self._evict(case_id)
+            return None
+        record = self._records[case_id]
+        record["streaming"] = leased
+        return record
+
+    async def update(self, case_id: str, **fields):
+        if case_id in self._records:
+            self._records[case_id].update(fields)
+            self._touched[case_id] = time.time()
+
+    async def delete(self, case_id: str):
+        self._evict(case_id)
+
+    async def try_start_stream(self, case_id: str, owner: str) -> bool:
+        record = self._records.get(case_id)
+        if record is None or self._leased(case_id):
+            return False
+        self._leases[case_id] = (owner, time.time() + self.lease_seconds)
+        record["streaming"] = True
+        self._touched[case_id] = time.time()
+        return True
+
+    async def renew_stream(self, case_id: str, owner: str) -> bool:
+        lease = self._leases.get(case_id)
+        if lease is None or lease[0] != owner:
+            return False
+        self._leases[case_id] = (owner, time.time() + self.lease_seconds)
+        return True
+
+    async def end_stream(self, case_id: str, owner: str):
+        lease = self._leases.get(case_id)
+        if lease is None or lease[0] != owner:
+            return
+        del self._leases[case_id]
+        self._records[case_id]["streaming"] = False
+        self._touched[case_id] = time.time()
+
+    async def push_judgment(self, case_id: str, judgement: str):
+        if case_id in self._queues:
+            await self._queues[case_id].put(judgement)
+
+    async def has_judgment(self, case_id: str) -> bool:
+        queue = self._queues.get(case_id)
+        return queue is not None and not queue.empty()
+
+    async def pop_judgment(self, case_id: str, timeout: float) -> Optional[str]:
+        queue = self._queues.get(case_id)
+        if queue is None:
+            return None
+        if timeout <= 0:
+            return None if queue.empty() else queue.get_nowait()
+        try:
+            return await asyncio.wait_for(queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def sweep(self) -> int:
+        expired = [
+            case_id for case_id, record in self._records.items()
+            if self._expired(case_id) and not self._leased(case_id)
+        ]
+        for case_id in expired:
+            self._evict(case_id)
+        return len(expired)
+
+
+def _drop_unserializable(value):
+    # Provider handles (e.g. uploaded Gemini files) only live inside the worker
+    # that created them; they are not persisted
+    return None
+
+
+class SQLiteTrialStore(TrialStore):
+    """Store shared by every worker process on the host via one SQLite file"""
+
+    def __init__(self, path: str, ttl_seconds: float, poll_interval: float = 0.25,
+                 lease_seconds: float = Config.STREAM_LEASE_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS trials (
+                case_id TEXT PRIMARY KEY,
+                record TEXT NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(trials)")}
+        for column, kind in (("lease_owner", "TEXT"), ("lease_expires", "REAL")):
+            if column not in columns:
+                # Files from before run leases
+                self._conn.execute(f"ALTER TABLE trials ADD COLUMN {column} {kind}")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS judgments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                case_id TEXT NOT NULL,
+                judgement TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS judgments_case ON judgments(case_id, id)")
+
+    def _execute(self, fn):
+        """Run `fn(conn)` inside an immediate (write-locking) transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _dumps(record: Dict) -> str:
+        return json.dumps(record, default=_drop_unserializable)
+
+    async def create(self, case_id: str, record: Dict):
+        def create(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO trials (case_id, record, updated_at) VALUES (?, ?, ?)",
+                (case_id, self._dumps(record), time.time())
+            )
+            conn.execute("DELETE FROM judgments WHERE case_id = ?", (case_id,))
+        await asyncio.to_thread(self._execute, create)
+
+    def _get(self, case_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record, lease_expires, updated_at FROM trials WHERE case_id = ?", (case_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        record, lease_expires, updated_at = row
+        now = time.time()
+        leased = lease_expires is not None and lease_expires > now
+        if not leased and now - updated_at > self.ttl_seconds:
+            return None
+        record = json.loads(record)
+        record["streaming"] = leased
+        return record
+
+    async def get(self, case_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self._get, case_id)
+
+    async def update(self, case_id: str, **fields):
+        def update(conn):
+            row = conn.execute("SELECT record FROM trials WHERE case_id = ?", (case_id,)).fetchone()
+            if row is None:
+                return
+            record = json.loads(row[0])
+            record.update(fields)
+            conn.execute(
+                "UPDATE trials SET record = ?, updated_at = ? WHERE case_id = ?",
+                (self._dumps(record), time.time(), case_id)
+            )
+        await asyncio.to_thread(self._execute, update)
+
+    async def delete(self, case_id: str):
+        def delete(conn):
+            conn.execute("DELETE FROM trials WHERE case_id = ?", (case_id,))
+            conn.execute("DELETE FROM judgments WHERE case_id = ?", (case_id,))
+        await asyncio.to_thread(self._execute, delete)
+
+    async def try_start_stream(self, case_id: str, owner: str) -> bool:
+        def start(conn):
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE trials SET lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE case_id = ? AND (lease_expires IS NULL OR lease_expires <= ?)",
+                (owner, now + self.lease_seconds, now, case_id, now)
+            )
+            return cursor.rowcount == 1
+        return await asyncio.to_thread(self._execute, start)
+
+    async def renew_stream(self, case_id: str, owner: str) -> bool:
+        def renew(conn):
+            cursor = conn.execute(
+                "UPDATE trials SET lease_expires = ? WHERE case_id = ? AND lease_owner = ?",
+                (time.time() + self.lease_seconds, case_id, owner)
+            )
+            return cursor.rowcount == 1
+        return await asyncio.to_thread(self._execute, renew)
+
+    async def end_stream(self, case_id: str, owner: str):
+        def end(conn):
+            conn.execute(
+                "UPDATE trials SET lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE case_id = ? AND lease_owner = ?",
+                (time.time(), case_id, owner)
+            )
+        await asyncio.to_thread(self._execute, end)
+
+    async def push_judgment(self, case_id: str, judgement: str):
+        def push(conn):
+            conn.execute(
+                "INSERT INTO judgments (case_id, judgement, created_at) VALUES (?, ?, ?)",
+                (case_id, judgement, time.time())
+            )
+        await asyncio.to_thread(self._execute, push)
+
+    async def has_judgment(self, case_id: str) -> bool:
+        def peek(conn):
+            return conn.execute("SELECT 1 FROM judgments WHERE case_id = ? LIMIT 1", (case_id,)).fetchone() is not None
+        return await asyncio.to_thread(self._execute, peek)
+
+    async def pop_judgment(self, case_id: str, timeout: float) -> Optional[str]:
+        def pop(conn):
+            row = conn.execute(
+                "SELECT id, judgement FROM judgments WHERE case_id = ? ORDER BY id LIMIT 1", (case_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM judgments WHERE id = ?", (row[0],))
+            return row[1]
+
+        deadline = time.monotonic() + timeout
+        while True:
+            judgement = await asyncio.to_thread(self._execute, pop)
+            if judgement is not None:
+                return judgement
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+    async def sweep(self) -> int:
+        def sweep(conn):
+            now = time.time()
+            # A lease its worker stopped renewing does not keep a trial alive
+            expired = [row[0] for row in conn.execute(
+                "SELECT case_id FROM trials WHERE (lease_expires IS NULL OR lease_expires <= ?) AND updated_at < ?",
+                (now, now - self.ttl_seconds)
+            )]
+            conn.executemany("DELETE FROM trials WHERE case_id = ?", [(c,) for c in expired])
+            conn.executemany("DELETE FROM judgments WHERE case_id = ?", [(c,) for c in expired])
+            return len(expired)
+        return await asyncio.to_thread(self._execute, sweep)
+
+
+def create_trial_store() -> TrialStore:
+    if Config.TRIAL_STORE_BACKEND == "sqlite":
+        return SQLiteTrialStore(Config.TRIAL_STORE_PATH, Config.TRIAL_TTL_SECONDS)
+    return InMemoryTrialStore(Config.TRIAL_TTL_SECONDS)
+
+
+trial_store = create_trial_store()
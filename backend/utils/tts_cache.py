@@ -0,0 +1,156 @@
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+from config.settings import Config
+
+
+class TTSCache:
+    """Sharded on-disk cache for synthesized audio, keyed by content-hash filename.
+
+    Files live in root/<first two hex chars>/<name>. Writes go to a temp file
+    and are renamed into place off the event loop, so readers (including other
+    workers) never see partial files. Concurrent misses for the same name in
+    this process share one synthesis call. Entries are evicted by age and,
+    least recently used first (mtime is bumped on every hit), by total size.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 512 * 1024 * 1024, max_age_seconds: float = 7 * 24 * 3600):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._bytes = None  # unknown until the first eviction scan
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, root: str = None) -> "TTSCache":
+        return cls(root or Config.TTS_CACHE_DIR, Config.TTS_CACHE_MAX_BYTES, Config.TTS_CACHE_MAX_AGE_SECONDS)
+
+    def path_for(self, name: str) -> Path:
+        return self.root / name[:2] / name
+
+    def _lookup(self, name: str) -> Optional[Path]:
+        path = self.path_for(name)
+        try:
+            os.utime(path)  # bump recency for LRU eviction
+        except FileNotFoundError:
+            return None
+        return path
+
+    async def exists(self, name: str) -> bool:
+        return await asyncio.to_thread(self.path_for(name).exists)
+
+    async def touch(self, name: str) -> Optional[Path]:
+        """Path of a cached file (bumping its recency), without counting a lookup"""
+        return await asyncio.to_thread(self._lookup, name)
+
+    async def get(self, name: str) -> Optional[Path]:
+        path = await asyncio.to_thread(self._lookup, name)
+        if path is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return path
+
+    def _write_atomic(self, name: str, data: bytes) -> Path:
+        path = self.path_for(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path
+
+    async def put(self, name: str, data: bytes) -> Path:
+        path = await asyncio.to_thread(self._write_atomic, name, data)
+        if self._bytes is not None:
+            self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                await asyncio.to_thread(self.evict)
+        return path
+
+    async def get_or_create(self, name: str, create: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[Path]:
+        """Return the cached file, or run `create()` once for all concurrent callers and cache its bytes"""
+        path = await self.get(name)
+        if path is not None:
+            return path
+        if name in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[name])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            data = await create()
+            path = await self.put(name, data) if data else None
+            future.set_result(path)
+            return path
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters get the exception; nobody else is awaiting it otherwise
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(name, None)
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until under budget"""
+        now = time.time()
+        entries, removed = [], 0
+        for path in self.root.rglob("*"):
+            if not path.is_file():
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            stale_tmp = path.name.startswith(".tmp-") and now - stat.st_mtime > 3600
+            if stale_tmp or now - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            if not path.name.startswith(".tmp-"):
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._bytes = total
+        self.evictions += removed
+        return removed
+
+    async def run_sweeper(self, interval: float):
+        while True:
+            try:
+                removed = await asyncio.to_thread(self.evict)
+                if removed:
+                    print(f"[TTS CACHE] Evicted {removed} files")
+            except Exception as e:
+                print(f"[TTS CACHE] Eviction failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
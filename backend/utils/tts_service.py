@@ -1,17 +1,32 @@
 import os
+import re
+import json
+import asyncio
 import hashlib
-import httpx
 from pathlib import Path
+from typing import AsyncIterator, List, Optional
 from config.settings import Config
+from utils.http_pool import http_pool
+from utils.tts_cache import TTSCache
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+class ChunkedSpeechError(RuntimeError):
+    """A chunk of chunked speech failed or never arrived; the stream cannot go on"""
+
 
 class TTSService:
     """ElevenLabs Text-to-Speech service with caching to avoid redundant API calls"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: str = None):
         self.api_key = Config.ELEVENLABS_API_KEY
         self.base_url = "https://api.elevenlabs.io/v1"
-        self.cache_dir = Path("/tmp/unreliable_narrator_tts_cache")
-        self.cache_dir.mkdir(exist_ok=True)
+        # Sharded, size/age-bounded cache with atomic writes and single-flight misses
+        self.cache = TTSCache.from_config(cache_dir)
+        self.cache_dir = self.cache.root
+        # Chunked speech being synthesized by this worker: key -> [chunk tasks]
+        self._pending = {}
         
         # Voice IDs for prosecutor and defendant (using ElevenLabs premade voices)
         # These are professional-sounding voices from the ElevenLabs library
@@ -27,7 +42,7 @@ class TTSService:
     
     def _get_cache_path(self, cache_key: str) -> Path:
         """Get cache file path"""
-        return self.cache_dir / f"{cache_key}.mp3"
+        return self.cache.path_for(f"{cache_key}.mp3")
     
     async def generate_speech(self, text: str, agent: str) -> str:
         """
@@ -39,22 +54,22 @@ class TTSService:
         if agent not in ["prosecutor", "defendant"]:
             return None
             
-        # Check cache first
-        cache_key = self._get_cache_key(text, agent)
-        cache_path = self._get_cache_path(cache_key)
-        
-        if cache_path.exists():
-            print(f"[TTS] Using cached audio for {agent}: {cache_key}")
-            return str(cache_path)
-        
-        # Generate new audio
-        print(f"[TTS] Generating new audio for {agent}: {text[:50]}...")
-        
         voice_id = self.voices.get(agent)
         if not voice_id:
             print(f"[TTS] No voice configured for agent: {agent}")
             return None
         
+        cache_key = self._get_cache_key(text, agent)
+        # Concurrent requests for the same text share one ElevenLabs call
+        cache_path = await self.cache.get_or_create(
+            f"{cache_key}.mp3", lambda: self._synthesize(text, voice_id, cache_key)
+        )
+        return str(cache_path) if cache_path else None
+    
+    async def _synthesize(self, text: str, voice_id: str, cache_key: str) -> Optional[bytes]:
+        """Call ElevenLabs; returns the MP3 bytes or None on failure"""
+        print(f"[TTS] Generating new audio: {text[:50]}...")
+        
         url = f"{self.base_url}/text-to-speech/{voice_id}"
         
         headers = {
@@ -72,21 +87,113 @@ class TTSService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, json=data, headers=headers)
-                response.raise_for_status()
-                
-                # Save to cache
-                with open(cache_path, "wb") as f:
-                    f.write(response.content)
-                
-                print(f"[TTS] Audio generated and cached: {cache_key}")
-                return str(cache_path)
+            response = await http_pool.post(url, json=data, headers=headers, timeout=30.0)
+            response.raise_for_status()
+            print(f"[TTS] Audio generated and cached: {cache_key}")
+            return response.content
                 
         except Exception as e:
             print(f"[TTS] Error generating speech: {e}")
             return None
     
+    @staticmethod
+    def split_sentences(text: str, min_chars: int = None) -> List[str]:
+        """Split at sentence boundaries, merging short sentences up to `min_chars`"""
+        min_chars = Config.TTS_CHUNK_MIN_CHARS if min_chars is None else min_chars
+        chunks, current = [], ""
+        for sentence in _SENTENCE_END.split(text.strip()):
+            current = f"{current} {sentence}".strip()
+            if len(current) >= min_chars:
+                chunks.append(current)
+                current = ""
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _manifest_name(self, key: str) -> str:
+        return f"{key}.json"
+
+    async def start_chunked_speech(self, text: str, agent: str) -> Optional[str]:
+        """
+        Start synthesizing `text` sentence by sentence and return its stream key
+        right away. Chunks are synthesized concurrently (bounded by
+        TTS_CHUNK_CONCURRENCY) and each is cached under its own content hash.
+        """
+        if agent not in self.voices or not self.api_key:
+            return None
+        chunks = self.split_sentences(text)
+        if not chunks:
+            return None
+        key = self._get_cache_key(text, agent)
+        names = [self._get_cache_path(self._get_cache_key(chunk, agent)).name for chunk in chunks]
+        # The manifest lets any worker stream this audio, not just the one
+        # synthesizing it; chunks that fail are listed in it too
+        manifest = {"agent": agent, "chunks": names, "failed": []}
+        await self.cache.put(self._manifest_name(key), json.dumps(manifest).encode())
+
+        if key not in self._pending:
+            semaphore = asyncio.Semaphore(Config.TTS_CHUNK_CONCURRENCY)
+
+            async def synthesize(i: int, chunk: str) -> Optional[str]:
+                async with semaphore:
+                    try:
+                        path = await self.generate_speech(chunk, agent)
+                    except Exception as e:
+                        print(f"[TTS] Chunk {i + 1}/{len(chunks)} failed: {e}")
+                        path = None
+                if path is None:
+                    manifest["failed"].append(i)
+                    await self.cache.put(self._manifest_name(key), json.dumps(manifest).encode())
+                return path
+
+            tasks = [asyncio.create_task(synthesize(i, chunk)) for i, chunk in enumerate(chunks)]
+            self._pending[key] = tasks
+            asyncio.gather(*tasks, return_exceptions=True).add_done_callback(
+                lambda _: self._pending.pop(key, None)
+            )
+        return key
+
+    async def has_chunked_speech(self, key: str) -> bool:
+        return key in self._pending or await self.cache.exists(self._manifest_name(key))
+
+    async def _wait_for_chunk(self, path: Path, manifest_path: Path, index: int, deadline: float) -> Optional[str]:
+        """Wait for a chunk synthesized by another worker to land in the cache; None if it failed or timed out"""
+        loop = asyncio.get_running_loop()
+        while not await asyncio.to_thread(path.exists):
+            if loop.time() >= deadline:
+                return None
+            manifest = json.loads(await asyncio.to_thread(manifest_path.read_text))
+            if index in manifest.get("failed", []):
+                return None
+            await asyncio.sleep(0.1)
+        return str(path)
+
+    async def iter_chunked_audio(self, key: str, timeout: float = 60.0) -> AsyncIterator[bytes]:
+        """Yield the MP3 chunks of `key` in order, each as soon as it is ready.
+
+        Raises ChunkedSpeechError (ending the stream) at a chunk that failed
+        or did not arrive in time, rather than skipping its sentence.
+        """
+        tasks = self._pending.get(key)
+        manifest_path = self.cache.path_for(self._manifest_name(key))
+        manifest = json.loads(await asyncio.to_thread(manifest_path.read_text))
+        deadline = asyncio.get_running_loop().time() + timeout
+        for i, name in enumerate(manifest["chunks"]):
+            if tasks is not None:
+                path = await tasks[i]
+            else:
+                path = await self._wait_for_chunk(self.cache.path_for(name), manifest_path, i, deadline)
+            if not path:
+                print(f"[TTS] Chunked speech {key} is missing chunk {i + 1}/{len(manifest['chunks'])}, ending the stream")
+                raise ChunkedSpeechError(f"chunk {i + 1} of {key} is not available")
+            yield await asyncio.to_thread(Path(path).read_bytes)
+
+    def get_stream_url(self, key: str, case_id: str) -> Optional[str]:
+        """URL of the progressive (chunk by chunk) audio stream for `key`"""
+        if not key:
+            return None
+        return f"/api/trial/{case_id}/audio/stream/{key}"
+
     def get_audio_url(self, file_path: str, case_id: str) -> str:
         """Convert file path to URL that frontend can access"""
         if not file_path:
@@ -0,0 +1,185 @@
+"""
+Streaming file uploads.
+
+The multipart body is parsed as it arrives and the file part is written to
+disk chunk by chunk (never held in memory), hashed on the way in. Stored
+files are named by their SHA-256, so identical uploads share one file and,
+through state["content_hash"], cached claim extraction results.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import aiofiles
+from python_multipart.multipart import MultipartParser, parse_options_header
+from config.settings import Config
+
+# Form fields are small strings; anything bigger is not a form we sent
+MAX_FIELD_BYTES = 64 * 1024
+SAFE_EXTENSION = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+
+class UploadError(Exception):
+    """Malformed upload (bad multipart body, no file part, oversized field)"""
+
+
+class UploadTooLarge(UploadError):
+    """The file part exceeds the configured maximum size"""
+
+
+class MultipartStream:
+    """Incremental multipart/form-data parser.
+
+    `feed()` returns the file bytes contained in each body chunk; form fields
+    are collected in `fields`. Only one file part is accepted.
+    """
+
+    def __init__(self, content_type: str):
+        ctype, params = parse_options_header(content_type or "")
+        if ctype != b"multipart/form-data" or b"boundary" not in params:
+            raise UploadError("Expected a multipart/form-data body")
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self._file_data: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._part_name: Optional[str] = None
+        self._part_is_file = False
+        self._value = bytearray()
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._value = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._part_name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._part_is_file = b"filename" in options
+        if self._part_is_file:
+            if self.filename is not None:
+                raise UploadError("Only one file per upload is supported")
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._part_is_file:
+            self._file_data.append(data[start:end])
+            return
+        self._value += data[start:end]
+        if len(self._value) > MAX_FIELD_BYTES:
+            raise UploadError(f"Form field '{self._part_name}' is too large")
+
+    def _on_part_end(self):
+        if not self._part_is_file:
+            self.fields[self._part_name] = self._value.decode("utf-8", "replace")
+
+    def feed(self, chunk: bytes) -> bytes:
+        self._parser.write(chunk)
+        data, self._file_data = b"".join(self._file_data), []
+        return data
+
+    def finish(self):
+        self._parser.finalize()
+
+
+class UploadStore:
+    """Content-addressed directory of uploaded files"""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.deduplicated = 0
+
+    @classmethod
+    def from_config(cls) -> "UploadStore":
+        return cls(Config.UPLOAD_DIR, Config.MAX_UPLOAD_BYTES)
+
+    def rejects_length(self, content_length: Optional[str]) -> bool:
+        """True if a declared Content-Length can't possibly fit (checked before reading the body)"""
+        try:
+            # Allow for multipart framing and form fields around the file
+            return int(content_length) > self.max_bytes + MAX_FIELD_BYTES
+        except (TypeError, ValueError):
+            return False
+
+    def _commit(self, tmp: str, path: Path) -> bool:
+        if path.exists():
+            os.unlink(tmp)
+            os.utime(path)
+            return True
+        os.replace(tmp, path)
+        return False
+
+    async def receive(self, body: AsyncIterator[bytes], content_type: str) -> Tuple[Dict[str, str], Dict]:
+        """Stream a multipart body to disk.
+
+        Returns (form fields, upload) where upload has path, filename, sha256,
+        size and deduplicated. Raises UploadTooLarge as soon as the file part
+        passes max_bytes.
+        """
+        parser = MultipartStream(content_type)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        os.close(fd)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(tmp, "wb") as f:
+                async for chunk in body:
+                    data = parser.feed(chunk)
+                    if not data:
+                        continue
+                    size += len(data)
+                    if size > self.max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+                    digest.update(data)
+                    await f.write(data)
+            parser.finish()
+            if parser.filename is None:
+                raise UploadError("No file in upload")
+
+            extension = os.path.splitext(parser.filename)[1].lower()
+            if not SAFE_EXTENSION.match(extension):
+                extension = ""
+            sha256 = digest.hexdigest()
+            path = self.root / f"{sha256}{extension}"
+            deduplicated = await asyncio.to_thread(self._commit, tmp, path)
+        except BaseException:
+            await asyncio.to_thread(lambda: Path(tmp).unlink(missing_ok=True))
+            raise
+
+        if deduplicated:
+            self.deduplicated += 1
+        return parser.fields, {
+            "path": str(path),
+            "filename": parser.filename,
+            "sha256": sha256,
+            "size": size,
+            "deduplicated": deduplicated,
+        }
+
+
+upload_store = UploadStore.from_config()
@@ -1,18 +1,25 @@
 from langgraph.graph import StateGraph, END
+from langgraph.config import get_stream_writer
+from langgraph.types import interrupt
 from config.state import TrialState
 from config.settings import Config
 from agents.claim_extractor import claim_extractor
 from agents.claim_triage import claim_triage
-from agents.investigator import investigator
-from agents.prosecutor import prosecutor_turn
-from agents.defendant import defendant_turn
-from agents.jury import jury_update, jury_verdict
+from agents.investigator import investigate, evidence_card
+from agents.jury import jury_update, jury_verdict, start_jury_update, jury_update_result
 from agents.verdict import verdict_aggregator, termination_check, score_calculator
 from agents.education import education_generator, report_generator
 from agents.awareness_scorer import awareness_scorer
+from round_executor import run_round
 from utils.blackboard import blackboard
+from utils.claim_index import claim_index
+from utils.trial_store import trial_store
+import asyncio
 import uuid
 
+# case_id -> latest background jury-notes task (chained per round); per process
+_jury_tasks = {}
+
 def create_initial_state(raw_input: str, input_type: str = "text") -> TrialState:
     """Create initial trial state"""
     case_id = str(uuid.uuid4())
@@ -21,6 +28,7 @@ def create_initial_state(raw_input: str, input_type: str = "text") -> TrialState
         "case_id": case_id,
         "input_type": input_type,
         "raw_input": raw_input,
+        "content_hash": None,
         "claims": [],
         "selected_claims": [],
         "investigator_evidence": [],
@@ -57,8 +65,133 @@ async def setup_case(state: TrialState) -> TrialState:
     await blackboard.create_collection(state["case_id"])
     return state
 
+async def restore_blackboard(state: TrialState):
+    """Rebuild a case's Blackboard collection from its checkpointed state.
+
+    The Blackboard is per process; a trial resumed on another worker (or
+    after a restart) finds it empty. Juror notes come back as the latest
+    note per juror.
+    """
+    case_id = state["case_id"]
+    await blackboard.create_collection(case_id)
+    for e in state["investigator_evidence"]:
+        await blackboard.store_evidence(case_id, "investigator", e)
+    for agent in ("prosecutor", "defendant"):
+        for e in state[f"{agent}_revealed_evidence"]:
+            await blackboard.store_evidence(case_id, agent, e)
+    for t in state["trial_transcript"]:
+        await blackboard.store_evidence(case_id, "trial_transcript", {
+            "agent": t["agent"], "round": t["round"], "text": t["argument_text"]
+        })
+    for juror in state["jury_members"]:
+        if juror.get("notes"):
+            await blackboard.store_evidence(case_id, f"jury_notes/juror_{juror['juror_id']}", {
+                "round": state["current_round"], "notes": juror["notes"]
+            })
+
+async def extract_claims(state: TrialState) -> TrialState:
+    emit = get_stream_writer()
+    emit({'phase': 'claim_extraction', 'status': 'running'})
+    state = await claim_extractor(state)
+    emit({'phase': 'claim_extraction', 'claims': state.get('claims', [])})
+    return state
+
+async def investigation(state: TrialState) -> TrialState:
+    """Investigator, streaming evidence per claim"""
+    emit = get_stream_writer()
+    emit({'phase': 'investigation', 'status': 'running'})
+    async for event in investigate(state):
+        emit(event)
+    evidence = state.get('investigator_evidence', [])
+    emit({'phase': 'investigation', 'evidence_count': len(evidence), 'evidence': [evidence_card(e) for e in evidence]})
+    return state
+
+async def trial_round(state: TrialState) -> TrialState:
+    """Prosecutor and defendant turns; TTS overlaps the next LLM call.
+
+    Afterwards the jurors' notes start in the background: no graph step
+    waits for them (a parallel node would hold the next step back), only
+    deliberation. Notes finished by the time the next round starts are
+    copied into the state here, so they are checkpointed.
+    """
+    case_id = state["case_id"]
+    previous = _jury_tasks.get(case_id)
+    if previous is not None:
+        jurors = jury_update_result(previous)
+        if jurors is not None:
+            state["jury_members"] = jurors
+    emit = get_stream_writer()
+    async for event in run_round(state):
+        emit(event)
+    _jury_tasks[case_id] = start_jury_update(state, previous)
+    return state
+
+async def finish_jury_notes(state: TrialState):
+    """Wait for the background note updates, or catch up on notes this worker never started"""
+    task = _jury_tasks.pop(state["case_id"], None)
+    if task is not None:
+        if not task.done():
+            await asyncio.gather(task, return_exceptions=True)
+        jurors = jury_update_result(task)
+        if jurors is not None:
+            state["jury_members"] = jurors
+            return
+    if any(j.get("notes_round") != state["current_round"] for j in state["jury_members"]):
+        # Resumed on another worker (or the update failed): the last round has no notes yet
+        try:
+            await jury_update(state)
+        except Exception as e:
+            print(f"[JURY] Note update for round {state['current_round']} failed: {e}")
+
+def user_judgment(state: TrialState) -> dict:
+    """CHECKPOINT: pause the trial until the user judges the round.
+
+    Resumed with Command(resume=judgement); the whole node re-runs then, so
+    nothing may precede the interrupt.
+    """
+    judgement = interrupt({'phase': 'awaiting_judgment', 'round': state["current_round"]})
+    return {"user_judgements": state["user_judgements"] + [judgement]}
+
+async def deliberation(state: TrialState) -> TrialState:
+    get_stream_writer()({'phase': 'deliberation', 'status': 'jury_deliberating'})
+    await finish_jury_notes(state)
+    return await jury_verdict(state)
+
+async def aggregate_verdict(state: TrialState) -> TrialState:
+    state = verdict_aggregator(state)
+    get_stream_writer()({'phase': 'verdict', 'verdict': state.get('aggregated_verdict')})
+    # Remember the outcome per claim for future cases; SQLite can wait on
+    # other workers' writes, so keep it off the event loop
+    for claim in state.get("selected_claims", []):
+        await asyncio.to_thread(claim_index.record_verdict, claim["text"], state["aggregated_verdict"]["score"])
+    return state
+
+async def score_prediction(state: TrialState) -> TrialState:
+    # The prediction may have been POSTed to another worker while we ran
+    record = await trial_store.get(state["case_id"])
+    if record and record.get("user_prediction"):
+        state["user_prediction"] = record["user_prediction"]
+    return score_calculator(state)
+
+async def awareness(state: TrialState) -> TrialState:
+    state = await awareness_scorer(state)
+    get_stream_writer()({'phase': 'awareness_score', 'awareness_score': state.get('awareness_score_result')})
+    return state
+
+async def education(state: TrialState) -> TrialState:
+    state = await education_generator(state)
+    get_stream_writer()({'phase': 'education', 'education': state.get('education_panel')})
+    return state
+
+def cancel_jury_notes(case_id: str):
+    """Drop the case's background note update (trial finished, failed or expired)"""
+    task = _jury_tasks.pop(case_id, None)
+    if task is not None:
+        task.cancel()
+
 async def cleanup_case(state: TrialState) -> TrialState:
     """Delete Blackboard collection"""
+    cancel_jury_notes(state["case_id"])
     await blackboard.delete_collection(state["case_id"])
     return state
 
@@ -74,24 +207,29 @@ def should_continue_trial(state: TrialState) -> str:
     return "continue"
 
 # Build the graph
-def create_trial_graph():
+def create_trial_graph(checkpointer):
+    """Courtroom trial graph.
+
+    Nodes stream SSE payloads as custom events (stream_mode="custom"). Each
+    round ends at the user_judgment interrupt, which needs `checkpointer`;
+    jurors update their notes in the background meanwhile (see trial_round).
+    """
     workflow = StateGraph(TrialState)
     
     # Add nodes
     workflow.add_node("setup", setup_case)
-    workflow.add_node("claim_extractor", claim_extractor)
+    workflow.add_node("claim_extractor", extract_claims)
     workflow.add_node("claim_triage", claim_triage)
-    workflow.add_node("investigator", investigator)
-    workflow.add_node("prosecutor_turn", prosecutor_turn)
-    workflow.add_node("defendant_turn", defendant_turn)
-    workflow.add_node("jury_update", jury_update)
+    workflow.add_node("investigator", investigation)
+    workflow.add_node("trial_round", trial_round)
+    workflow.add_node("user_judgment", user_judgment)
     workflow.add_node("termination_check", termination_check)
     workflow.add_node("increment_round", increment_round)
-    workflow.add_node("jury_verdict", jury_verdict)
-    workflow.add_node("verdict_aggregator", verdict_aggregator)
-    workflow.add_node("score_calculator", score_calculator)
-    workflow.add_node("awareness_scorer", awareness_scorer)
-    workflow.add_node("education_generator", education_generator)
+    workflow.add_node("jury_verdict", deliberation)
+    workflow.add_node("verdict_aggregator", aggregate_verdict)
+    workflow.add_node("score_calculator", score_prediction)
+    workflow.add_node("awareness_scorer", awareness)
+    workflow.add_node("education_generator", education)
     workflow.add_node("report_generator", report_generator)
     workflow.add_node("cleanup", cleanup_case)
     
@@ -100,11 +238,11 @@ def create_trial_graph():
     workflow.add_edge("setup", "claim_extractor")
     workflow.add_edge("claim_extractor", "claim_triage")
     workflow.add_edge("claim_triage", "investigator")
-    workflow.add_edge("investigator", "prosecutor_turn")
+    workflow.add_edge("investigator", "trial_round")
     
     # Trial loop
-    workflow.add_edge("prosecutor_turn", "defendant_turn")
-    workflow.add_edge("defendant_turn", "termination_check")
+    workflow.add_edge("trial_round", "user_judgment")
+    workflow.add_edge("user_judgment", "termination_check")
     
     # Conditional: continue or end trial
     workflow.add_conditional_edges(
@@ -115,7 +253,7 @@ def create_trial_graph():
             "verdict": "jury_verdict"
         }
     )
-    workflow.add_edge("increment_round", "prosecutor_turn")
+    workflow.add_edge("increment_round", "trial_round")
     
     # Verdict flow
     workflow.add_edge("jury_verdict", "verdict_aggregator")
@@ -126,7 +264,4 @@ def create_trial_graph():
     workflow.add_edge("report_generator", "cleanup")
     workflow.add_edge("cleanup", END)
     
-    return workflow.compile()
-
-# Create the compiled graph
-trial_graph = create_trial_graph()
+    return workflow.compile(checkpointer=checkpointer)
@@ -36,6 +36,10 @@ const Courtroom = ({ caseId, originalContent }) => {
   const [audioQueue, setAudioQueue] = useState([]);
   const [isPlayingAudio, setIsPlayingAudio] = useState(false);
   const currentAudioRef = useRef(null); // Track currently playing audio
+  const lastEventIdRef = useRef(null); // Replay point for reconnects
+  const streamEndRef = useRef(null); // 'suspended' (awaiting our judgment), 'finished' or null
+  const judgementPendingRef = useRef(false); // Judgment posted before the trial suspended
+  const resumeStreamRef = useRef(null);
 
   // Stop all audio playback and clear queue
   const stopAllAudio = () => {
@@ -136,10 +140,15 @@ const Courtroom = ({ caseId, originalContent }) => {
     let mounted = true;
 
     const connectStream = () => {
-      eventSource = new EventSource(`http://localhost:8000/api/trial/${caseId}/stream`);
+      // Reconnects replay only the events after the last one we saw
+      streamEndRef.current = null;
+      const lastEventId = lastEventIdRef.current;
+      const query = lastEventId ? `?last_event_id=${encodeURIComponent(lastEventId)}` : '';
+      eventSource = new EventSource(`http://localhost:8000/api/trial/${caseId}/stream${query}`);
 
       eventSource.onmessage = (event) => {
         if (!mounted) return;
+        if (event.lastEventId) lastEventIdRef.current = event.lastEventId;
         const data = JSON.parse(event.data);
         console.log('SSE Data received:', data);
 
@@ -162,8 +171,18 @@ const Courtroom = ({ caseId, originalContent }) => {
             setEvidence(data.sources);
             setInvestigationReady(true);
           }
-          // Backend sends evidence_count instead of evidence array
-          if (data.evidence_count !== undefined) {
+          // Per-claim results stream in as each claim's search lands
+          if (data.new_evidence) {
+            setEvidence(prev => [
+              ...prev,
+              ...data.new_evidence.filter(item => !prev.some(e => e.source && e.source === item.source))
+            ]);
+            if (data.new_evidence.length > 0) {
+              setInvestigationReady(true);
+            }
+          }
+          // Older backends send only evidence_count instead of the evidence array
+          if (data.evidence_count !== undefined && !data.evidence) {
             console.log('Evidence count received:', data.evidence_count);
             // Create placeholder evidence based on count
             const placeholderEvidence = Array.from({ length: data.evidence_count }, (_, i) => ({
@@ -174,23 +193,48 @@ const Courtroom = ({ caseId, originalContent }) => {
             setEvidence(placeholderEvidence);
             setInvestigationReady(true);
           }
+        } else if (data.phase === 'trial_delta') {
+          // Streamed argument text; the complete 'trial' event follows
+          setTranscript(prev => {
+            const exists = prev.some(e => e.agent === data.agent && e.round === data.round);
+            if (!exists) {
+              return [...prev, {
+                agent: data.agent,
+                round: data.round,
+                argument: data.delta,
+                confidence: null,
+                audio_url: null,
+                streaming: true
+              }];
+            }
+            return prev.map(e =>
+              e.agent === data.agent && e.round === data.round && e.streaming
+                ? { ...e, argument: e.argument + data.delta }
+                : e
+            );
+          });
         } else if (data.phase === 'trial') {
           console.log('Trial data:', data);
           // Buffer trial arguments
           setTranscript(prev => {
-            const exists = prev.some(e =>
+            const existing = prev.find(e =>
               e.agent === data.agent &&
               e.round === data.round
             );
-            if (exists) return prev;
+            if (existing && !existing.streaming) return prev;
 
-            const newTranscript = [...prev, {
+            const entry = {
               agent: data.agent,
               round: data.round,
               argument: data.argument,
               confidence: data.confidence,
-              audio_url: data.audio_url  // Store audio URL from backend
-            }];
+              audio_url: data.audio_url || existing?.audio_url || null,  // Store audio URL from backend
+              streaming: false
+            };
+            // Replace the streamed draft in place, or append
+            const newTranscript = existing
+              ? prev.map(e => (e === existing ? entry : e))
+              : [...prev, entry];
 
             // Set ready flags based on what we received
             if (data.agent === 'prosecutor') {
@@ -209,6 +253,16 @@ const Courtroom = ({ caseId, originalContent }) => {
 
             return newTranscript;
           });
+        } else if (data.phase === 'trial_audio') {
+          // Audio is synthesized after the argument is sent and arrives in argument order
+          setTranscript(prev => prev.map(e =>
+            e.agent === data.agent && e.round === data.round
+              ? { ...e, audio_url: data.audio_url }
+              : e
+          ));
+          if (data.audio_url) {
+            playAudio(data.audio_url, data.agent);
+          }
         } else if (data.phase === 'fasttrack') {
           // Fasttrack analysis phase - set flag to show loading
           console.log('Fasttrack analysis in progress:', data);
@@ -232,7 +286,17 @@ const Courtroom = ({ caseId, originalContent }) => {
           if (data.awareness_score) {
             setAwarenessScore(data.awareness_score);
           }
-        } else if (data.phase === 'complete') {
+        } else if (data.phase === 'awaiting_judgment') {
+          // The trial is suspended until we judge the round; the server ends the stream
+          eventSource.close();
+          if (judgementPendingRef.current) {
+            judgementPendingRef.current = false;
+            connectStream();
+          } else {
+            streamEndRef.current = 'suspended';
+          }
+        } else if (data.phase === 'complete' || data.error) {
+          streamEndRef.current = 'finished';
           eventSource.close();
         }
       };
@@ -240,9 +304,14 @@ const Courtroom = ({ caseId, originalContent }) => {
       eventSource.onerror = (error) => {
         console.error('SSE Error:', error);
         eventSource.close();
+        // Dropped connection: reconnect and replay what we missed
+        if (mounted && streamEndRef.current === null) {
+          setTimeout(() => { if (mounted) connectStream(); }, 2000);
+        }
       };
     };
 
+    resumeStreamRef.current = connectStream;
     connectStream();
 
     return () => {
@@ -266,12 +335,12 @@ const Courtroom = ({ caseId, originalContent }) => {
         const prosecutorEntry = transcript.find(t =>
           t.agent === 'prosecutor' && t.round === currentEpoch + 1
         );
-        return prosecutorEntry !== undefined;
+        return prosecutorEntry !== undefined && !prosecutorEntry.streaming;
       case 'EPOCH_DEFENDER':
         const defenderEntry = transcript.find(t =>
           (t.agent === 'defendant' || t.agent === 'defender') && t.round === currentEpoch + 1
         );
-        return defenderEntry !== undefined;
+        return defenderEntry !== undefined && !defenderEntry.streaming;
       case 'FINAL_VERDICT':
         return verdictReady && verdict !== null;
       default:
@@ -336,6 +405,13 @@ const Courtroom = ({ caseId, originalContent }) => {
         body: JSON.stringify({ case_id: caseId, judgement })
       });
 
+      // Follow the resumed trial, or reconnect as soon as it suspends
+      if (streamEndRef.current === 'suspended') {
+        resumeStreamRef.current();
+      } else {
+        judgementPendingRef.current = true;
+      }
+
       setConversationHistory(prev => [...prev, {
         agent: 'user',
         round: currentEpoch + 1,
@@ -364,7 +440,8 @@ const Courtroom = ({ caseId, originalContent }) => {
           if (!exists) {
             return [...prev, entry];
           }
-          return prev;
+          // Keep streamed arguments up to date as more text arrives
+          return prev.map(e => (e.agent === agent && e.round === round ? entry : e));
         });
       }
     }